@@ -0,0 +1,81 @@
+"""缩写展开基准：每个按键的匹配耗时随缩写数量的变化
+
+用法:
+    python benchmarks/bench_abbrev.py [-n 1000000] [--counts 10 100 1000 10000]
+
+直接驱动 AbbrevMatcher，不需要 pynput 和图形会话。输入流模拟普通打字，
+其中约 1% 的片段以缩写前缀开头（部分为完整缩写，部分中途打断）。
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.abbrev import AbbrevMatcher, DEFAULT_PREFIX
+
+
+def make_abbreviations(count: int, rng: random.Random) -> list[str]:
+    """生成互不相同的缩写"""
+    abbreviations: set[str] = set()
+    while len(abbreviations) < count:
+        length = rng.randint(2, 8)
+        abbreviations.add(DEFAULT_PREFIX + "".join(rng.choices(string.ascii_lowercase, k=length)))
+    return sorted(abbreviations)
+
+
+def make_stream(count: int, abbreviations: list[str], rng: random.Random) -> str:
+    """生成输入字符流"""
+    alphabet = string.ascii_lowercase + " " * 5 + ".,;"
+    chunks: list[str] = []
+    size = 0
+    while size < count:
+        if rng.random() < 0.01:
+            abbrev = rng.choice(abbreviations)
+            chunk = abbrev if rng.random() < 0.5 else abbrev[:rng.randint(1, len(abbrev))] + " "
+        else:
+            chunk = "".join(rng.choices(alphabet, k=rng.randint(1, 12)))
+        chunks.append(chunk)
+        size += len(chunk)
+    return "".join(chunks)[:count]
+
+
+def run(matcher: AbbrevMatcher, stream: str) -> tuple[float, int]:
+    """回放字符流，返回 (每个按键的平均纳秒数, 命中次数)"""
+    feed = matcher.feed
+    hits = 0
+    start = time.perf_counter_ns()
+    for char in stream:
+        if feed(char) is not None:
+            hits += 1
+    return (time.perf_counter_ns() - start) / len(stream), hits
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--keys", type=int, default=1_000_000, help="每轮输入的按键数")
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 1000, 10000], help="缩写数量")
+    args = parser.parse_args()
+
+    print(f"{'abbreviations':>14}{'states':>10}{'build (ms)':>12}{'ns/key':>10}{'hits':>8}")
+    for count in args.counts:
+        rng = random.Random(count)
+        abbreviations = make_abbreviations(count, rng)
+        stream = make_stream(args.keys, abbreviations, rng)
+
+        start = time.perf_counter()
+        matcher = AbbrevMatcher(abbreviations)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        run(matcher, stream[:10_000])  # 预热转移缓存
+        matcher.reset()
+        ns, hits = run(matcher, stream)
+        print(f"{count:>14}{len(matcher):>10}{build_ms:>12.1f}{ns:>10.0f}{hits:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
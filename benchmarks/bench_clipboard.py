@@ -0,0 +1,123 @@
+"""大段选中文字包裹基准：旧的字符串路径与原始字节分段路径对比
+
+用法:
+    python benchmarks/bench_clipboard.py [--sizes 1K 64K 1M 10M 50M] [--real]
+
+默认只测量进程内的数据处理（不访问系统剪贴板）：
+- legacy: 两次读取剪贴板并解码、整串比较判断有无选中、切片拼接包裹文本、再编码写回
+- raw:    以序列号判断有无选中，选中文字保持 UTF-16 原始字节，模板分段后写入同一块缓冲区
+--real 时在 Windows 上额外测量真实剪贴板的写入与读取（pyperclip 与 src.core.clipboard）。
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.output import wrap_parts
+
+TEMPLATE = "+++info\r\n\r\n+++"
+OFFSET = 5
+UNITS = {"K": 1024, "M": 1024 * 1024}
+
+
+def parse_size(text: str) -> int:
+    """1K / 10M 形式的大小"""
+    unit = UNITS.get(text[-1].upper())
+    return int(text[:-1]) * unit if unit else int(text)
+
+
+def make_selection(size: int) -> str:
+    """生成约 size 字节（UTF-16）的多行文本"""
+    line = "2024-05-01 12:00:00 INFO 处理请求 /api/v1/items?id=42 耗时 12ms\n"
+    chars = size // 2
+    return (line * (chars // len(line) + 1))[:chars]
+
+
+def legacy(original_raw: bytes, selected_raw: bytes) -> int:
+    """旧路径：解码两次、整串比较、切片拼接、编码写回"""
+    original = original_raw.decode("utf-16-le")
+    selected = selected_raw.decode("utf-16-le")
+    if not (selected and selected != original):
+        return 0
+    insert_pos = len(TEMPLATE) - OFFSET
+    wrapped = TEMPLATE[:insert_pos] + selected + TEMPLATE[insert_pos:]
+    return len(wrapped.encode("utf-16-le"))
+
+
+def raw(original_raw: bytes, selected_raw: bytes) -> int:
+    """新路径：选中文字不解码，分段写入一块预先分配的缓冲区（对应 GlobalAlloc + memmove）"""
+    parts = [
+        part if isinstance(part, bytes) else part.encode("utf-16-le")
+        for part in wrap_parts(TEMPLATE, selected_raw, OFFSET)
+    ]
+    buffer = bytearray(sum(len(part) for part in parts) + 2)
+    view = memoryview(buffer)
+    offset = 0
+    for part in parts:
+        view[offset:offset + len(part)] = part
+        offset += len(part)
+    return len(buffer)
+
+
+def measure(func, *args, repeat: int) -> float:
+    """多次执行取中位数（毫秒）"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def measure_real(text: str, repeat: int) -> tuple[float, float]:
+    """真实剪贴板写入 + 读取（毫秒）：pyperclip 与原始字节接口"""
+    import pyperclip
+    from src.core import clipboard
+
+    def via_pyperclip():
+        pyperclip.copy(text)
+        pyperclip.paste()
+
+    encoded = text.encode("utf-16-le")
+
+    def via_raw():
+        clipboard.set_parts([encoded])
+        clipboard.get_raw()
+
+    return measure(via_pyperclip, repeat=repeat), measure(via_raw, repeat=repeat)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=["1K", "64K", "1M", "10M", "50M"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--real", action="store_true", help="同时测量真实剪贴板（仅 Windows）")
+    args = parser.parse_args()
+
+    header = f"{'size':>8}{'legacy (ms)':>14}{'raw (ms)':>12}{'speedup':>10}"
+    if args.real:
+        header += f"{'pyperclip (ms)':>16}{'native (ms)':>14}"
+    print(header)
+
+    for label in args.sizes:
+        size = parse_size(label)
+        selection = make_selection(size)
+        selected_raw = selection.encode("utf-16-le")
+        # 最坏情况：原剪贴板与选中文字只有最后一个字符不同
+        original_raw = (selection[:-1] + "#").encode("utf-16-le")
+
+        legacy_ms = measure(legacy, original_raw, selected_raw, repeat=args.repeat)
+        raw_ms = measure(raw, original_raw, selected_raw, repeat=args.repeat)
+        row = f"{label:>8}{legacy_ms:>14.2f}{raw_ms:>12.2f}{legacy_ms / max(raw_ms, 1e-6):>9.1f}x"
+        if args.real:
+            pyperclip_ms, native_ms = measure_real(selection, args.repeat)
+            row += f"{pyperclip_ms:>16.2f}{native_ms:>14.2f}"
+        print(row)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
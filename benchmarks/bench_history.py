@@ -0,0 +1,100 @@
+"""剪贴板历史基准：添加与搜索耗时，三元组索引与逐条扫描对比
+
+用法:
+    python benchmarks/bench_history.py [--entries 1000 5000 20000] [--large 1] [--capacity-mb 32]
+
+每轮用临时文件作为 mmap 存储，添加 N 条模拟复制内容（日志行、代码片段、长段落，
+其中 --large 百分比的条目超过内联上限、写入 mmap 文件），然后测量：
+- 每条添加的平均耗时（含去重、索引与淘汰）
+- 不同长度关键词的搜索耗时（取前 9 条，与弹出面板一致）
+- 对照组：对所有条目逐条小写化并查找子串
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.history import INLINE_LIMIT, ClipboardHistory
+
+QUERIES = ["a", "请求", "api", "items?id=4", "def handle", "不存在的内容xyz"]
+WORDS = ["处理请求", "api", "items", "handle", "error", "用户", "配置", "return", "self", "timeout"]
+
+
+def make_texts(count: int, large_percent: float, seed: int = 1) -> list[str]:
+    """生成 count 条互不相同的模拟复制内容"""
+    rng = random.Random(seed)
+    texts = []
+    for i in range(count):
+        kind = rng.random() * 100
+        if kind < large_percent:
+            line = f"{i} 2024-05-01 12:00:00 INFO 处理请求 /api/v1/items?id={i} 耗时 {rng.randint(1, 99)}ms\n"
+            texts.append(line * (INLINE_LIMIT // len(line.encode("utf-8")) + 2))
+        elif kind < 50:
+            texts.append(f"def handle_{i}(self, request):\n    return self.{rng.choice(WORDS)}(request, timeout={i})")
+        else:
+            words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 40)))
+            texts.append(f"{words} /api/v1/items?id={i}")
+    return texts
+
+
+def linear_search(texts: list[str], query: str, limit: int = 9) -> list[str]:
+    """对照组：逐条扫描"""
+    query = query.casefold()
+    result = []
+    for text in reversed(texts):
+        if query in text.casefold():
+            result.append(text)
+            if len(result) >= limit:
+                break
+    return result
+
+
+def measure(func, *args, repeat: int) -> float:
+    """多次执行取中位数（毫秒）"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--large", type=float, default=1.0, help="写入 mmap 文件的大条目百分比")
+    parser.add_argument("--capacity-mb", type=float, default=32)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in args.entries:
+            texts = make_texts(count, args.large)
+            history = ClipboardHistory(int(args.capacity_mb * 1024 * 1024), Path(tmp) / "history.bin")
+            start = time.perf_counter()
+            for text in texts:
+                history.add(text)
+            add_us = (time.perf_counter() - start) * 1e6 / count
+            kept = [history.text(entry) for entry in reversed(history.entries())]
+            print(
+                f"{count} entries: kept {len(history)} ({history.nbytes / 1024 / 1024:.1f} MB), "
+                f"add {add_us:.1f} us/entry"
+            )
+            print(f"  {'query':<20}{'hits':>6}{'index (ms)':>12}{'scan (ms)':>12}")
+            for query in QUERIES:
+                hits = len(history.search(query))
+                index_ms = measure(history.search, query, repeat=args.repeat)
+                scan_ms = measure(linear_search, kept, query, repeat=args.repeat)
+                print(f"  {query:<20}{hits:>6}{index_ms:>12.3f}{scan_ms:>12.3f}")
+            history.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
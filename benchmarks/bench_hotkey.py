@@ -0,0 +1,84 @@
+"""热键回调微基准：回放合成按键事件，统计每个事件的耗时
+
+用法:
+    python benchmarks/bench_hotkey.py [-n 1000000] [--bindings 3]
+
+事件流模拟普通打字：大部分为字母键，夹杂少量修饰键和热键组合。
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pynput.keyboard import Key, KeyCode
+
+from src.core.hotkey import HotkeyManager
+
+
+def make_events(count: int, seed: int = 0) -> list[tuple[bool, object]]:
+    """生成 (是否按下, 键) 序列"""
+    rng = random.Random(seed)
+    letters = [KeyCode.from_vk(ord(c.upper()), char=c) for c in "abcdefghijklmnopqrstuvwxyz"]
+    events: list[tuple[bool, object]] = []
+    while len(events) < count:
+        roll = rng.random()
+        if roll < 0.02:
+            # Ctrl + 字母（复制、保存等）
+            key = rng.choice(letters)
+            events += [(True, Key.ctrl_l), (True, key), (False, key), (False, Key.ctrl_l)]
+        elif roll < 0.05:
+            events += [(True, Key.shift_l), (False, Key.shift_l)]
+        elif roll < 0.15:
+            events += [(True, Key.space), (False, Key.space)]
+        else:
+            key = rng.choice(letters)
+            events += [(True, key), (False, key)]
+    return events[:count]
+
+
+def run(manager: HotkeyManager, events) -> float:
+    """回放事件，返回每个事件的平均纳秒数"""
+    # 直接驱动 pynput 后端的钩子回调
+    hook = manager.backend._filter
+    on_press = hook.on_press
+    on_release = hook.on_release
+    start = time.perf_counter_ns()
+    for pressed, key in events:
+        if pressed:
+            on_press(key)
+        else:
+            on_release(key)
+    return (time.perf_counter_ns() - start) / len(events)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--events", type=int, default=1_000_000)
+    parser.add_argument("--bindings", type=int, default=3, help="额外的直接模板绑定数量")
+    args = parser.parse_args()
+
+    manager = HotkeyManager(backend="pynput")
+    manager.set_bindings([
+        {"modifiers": ["ctrl", "alt"], "key": str(i % 10) if i < 10 else f"f{i % 12 + 1}",
+         "text": f"binding {i}", "offset": 0}
+        for i in range(args.bindings)
+    ])
+    # 不启动真实监听，直接驱动回调
+    manager._enabled = True
+    triggered = []
+    manager.triggered.connect(lambda: triggered.append(1))
+
+    events = make_events(args.events)
+    run(manager, events[:10_000])  # 预热
+    ns = run(manager, events)
+
+    print(f"events: {len(events)}  bindings: {args.bindings + 1}  "
+          f"{ns:.0f} ns/event  popup triggers: {len(triggered)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
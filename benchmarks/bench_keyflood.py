@@ -0,0 +1,99 @@
+"""按键洪泛测试：对比各热键后端下 GUI 事件循环的延迟
+
+用法:
+    python benchmarks/bench_keyflood.py [--rate 2000] [--seconds 5]
+
+通过 pynput Controller 注入真实的系统按键（右 Shift 按下/松开，不会输入字符），
+同时用 5ms 间隔的 QTimer 测量事件循环的调度延迟。需要图形会话（Windows 或 X11）。
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QCoreApplication, QTimer
+from pynput.keyboard import Controller, Key
+
+from src.core.hotkey import HotkeyManager
+
+TICK_MS = 5
+
+
+def flood(rate: int, stop: threading.Event):
+    """以指定速率注入按键"""
+    controller = Controller()
+    interval = 1 / rate
+    next_time = time.perf_counter()
+    while not stop.is_set():
+        controller.press(Key.shift_r)
+        controller.release(Key.shift_r)
+        next_time += interval * 2
+        delay = next_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def measure(app: QCoreApplication, backend: str, rate: int, seconds: float) -> dict:
+    """测量一种模式下的事件循环延迟"""
+    manager = HotkeyManager(backend=backend)
+    manager.start()
+    time.sleep(1)  # 等待钩子（或子进程）就绪
+
+    lateness: list[float] = []
+    last = [time.perf_counter()]
+
+    def on_tick():
+        now = time.perf_counter()
+        lateness.append(max(0.0, (now - last[0]) * 1000 - TICK_MS))
+        last[0] = now
+
+    timer = QTimer()
+    timer.setInterval(TICK_MS)
+    timer.timeout.connect(on_tick)
+
+    stop = threading.Event()
+    flooder = threading.Thread(target=flood, args=(rate, stop), daemon=True)
+
+    QTimer.singleShot(int(seconds * 1000), app.quit)
+    timer.start()
+    flooder.start()
+    app.exec()
+
+    stop.set()
+    flooder.join()
+    timer.stop()
+    manager.stop()
+
+    lateness.sort()
+    return {
+        "ticks": len(lateness),
+        "mean_ms": statistics.fmean(lateness) if lateness else 0.0,
+        "p99_ms": lateness[int(len(lateness) * 0.99)] if lateness else 0.0,
+        "max_ms": lateness[-1] if lateness else 0.0,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=int, default=2000, help="每秒注入的按键事件数")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument(
+        "--backends", nargs="+", default=["pynput", "process", "native"],
+        help="要对比的热键后端",
+    )
+    args = parser.parse_args()
+
+    app = QCoreApplication(sys.argv[:1])
+    print(f"{'backend':<16}{'ticks':>8}{'mean (ms)':>12}{'p99 (ms)':>12}{'max (ms)':>12}")
+    for backend in args.backends:
+        r = measure(app, backend, args.rate, args.seconds)
+        print(f"{backend:<16}{r['ticks']:>8}{r['mean_ms']:>12.2f}{r['p99_ms']:>12.2f}{r['max_ms']:>12.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
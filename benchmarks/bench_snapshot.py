@@ -0,0 +1,80 @@
+"""剪贴板快照基准：10 MB 图片的保存与恢复耗时
+
+用法:
+    python benchmarks/bench_snapshot.py [--mb 1 10 50] [--repeat 5] [--offscreen]
+
+每种大小先把一张 ARGB32 图片（附带一段 HTML 与文本）放进剪贴板，然后测量：
+- deep:     逐个格式复制字节、复制图片（深拷贝后再写回）
+- snapshot: src.core.clipboard_snapshot 的 capture / restore（隐式共享，只增加引用）
+--offscreen 使用 Qt 的 offscreen 平台（进程内剪贴板，不涉及系统剪贴板，适合无桌面环境）。
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WIDTH = 1920
+
+
+def measure(func, repeat: int) -> float:
+    """多次执行取中位数（毫秒）"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mb", nargs="+", type=int, default=[1, 10, 50])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--offscreen", action="store_true")
+    args = parser.parse_args()
+
+    if args.offscreen:
+        os.environ["QT_QPA_PLATFORM"] = "offscreen"
+
+    from PySide6.QtCore import QByteArray, QMimeData
+    from PySide6.QtGui import QColor, QGuiApplication, QImage
+
+    from src.core.clipboard_snapshot import ClipboardSnapshot
+
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv)
+    clipboard = app.clipboard()
+
+    def deep_copy():
+        mime = clipboard.mimeData()
+        formats = {fmt: bytes(mime.data(fmt).data()) for fmt in mime.formats()}
+        image = mime.imageData().copy() if mime.hasImage() else None
+        copy = QMimeData()
+        for fmt, data in formats.items():
+            copy.setData(fmt, QByteArray(data))
+        if image is not None:
+            copy.setImageData(image)
+        clipboard.setMimeData(copy)
+
+    print(f"{'size':>6}{'deep (ms)':>12}{'capture (ms)':>14}{'restore (ms)':>14}{'held (MB)':>11}")
+    for mb in args.mb:
+        image = QImage(WIDTH, mb * 1024 * 1024 // (WIDTH * 4), QImage.Format_ARGB32)
+        image.fill(QColor("#9333ea"))
+        source = QMimeData()
+        source.setImageData(image)
+        source.setHtml("<b>shokaX</b>")
+        source.setText("shokaX")
+        clipboard.setMimeData(source)
+
+        deep_ms = measure(deep_copy, args.repeat)
+        snapshot = ClipboardSnapshot.capture()
+        capture_ms = measure(ClipboardSnapshot.capture, args.repeat)
+        restore_ms = measure(snapshot.restore, args.repeat)
+        print(f"{mb:>5}M{deep_ms:>12.2f}{capture_ms:>14.2f}{restore_ms:>14.2f}{snapshot.nbytes / 1e6:>11.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
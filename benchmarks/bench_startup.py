@@ -0,0 +1,127 @@
+"""启动性能测试：对比默认启动与托盘模式的热键就绪时间和内存占用
+
+用法:
+    python benchmarks/bench_startup.py [-n 10] [--exe "dist/shokaX plugin.exe"]
+    python benchmarks/bench_startup.py --exe "onefile=dist/shokaX plugin.exe" \
+        --exe "onedir=dist/shokaX plugin/shokaX plugin.exe"
+
+每轮启动一个进程并传入 --startup-report，进程在热键就绪后输出指标并退出。
+--exe 可以给出多次（"名称=路径"），用于对比不同的打包方式（见 build.spec 的 BUILD_PROFILE）；
+同时列出各自的打包体积与文件数，以及第一次启动（磁盘缓存未预热）的耗时。
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODES = {
+    "window": [],
+    "tray": ["--tray"],
+}
+
+
+def run_once(base_cmd: list[str], extra: list[str]) -> dict | None:
+    """启动一次并解析输出的指标"""
+    proc = subprocess.run(
+        base_cmd + extra + ["--startup-report"],
+        capture_output=True,
+        text=True,
+        timeout=60,
+        cwd=ROOT,
+    )
+    for line in reversed(proc.stdout.splitlines()):
+        line = line.strip()
+        if line.startswith("{"):
+            return json.loads(line)
+    print(proc.stderr, file=sys.stderr)
+    return None
+
+
+def bundle_size(exe: str) -> tuple[float, int]:
+    """打包体积（MB）与文件数：目录版统计 exe 所在目录，单文件版只统计 exe"""
+    app_dir = os.path.dirname(os.path.abspath(exe))
+    if not os.path.isdir(os.path.join(app_dir, "_internal")):
+        return round(os.path.getsize(exe) / 1024 / 1024, 1), 1
+    total = count = 0
+    for root, _dirs, files in os.walk(app_dir):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+            count += 1
+    return round(total / 1024 / 1024, 1), count
+
+
+def summarize(samples: list[dict]) -> dict:
+    """汇总多轮结果（中位数）"""
+    def median_of(getter):
+        values = [v for v in map(getter, samples) if v is not None]
+        return round(statistics.median(values), 1) if values else None
+
+    first = samples[0] if samples else {}
+    return {
+        "runs": len(samples),
+        "first_uptime_ms": round(first["uptime_ms"], 1) if first.get("uptime_ms") is not None else None,
+        "hotkey_ready_ms": median_of(lambda s: s["marks_ms"].get("hotkey_ready")),
+        "process_uptime_ms": median_of(lambda s: s["uptime_ms"]),
+        "rss_mb": median_of(lambda s: s["rss_mb"]),
+    }
+
+
+def parse_target(value: str) -> tuple[str, str]:
+    """"名称=路径" 或路径（名称取 exe 所在目录与文件名）"""
+    label, sep, path = value.partition("=")
+    if sep and not os.path.exists(value):
+        return label, path
+    return os.path.relpath(value, ROOT), value
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--runs", type=int, default=10)
+    parser.add_argument(
+        "--exe", action="append", default=[],
+        help="测试打包后的可执行文件（可给出多次，格式 名称=路径），默认使用源码运行",
+    )
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    args = parser.parse_args()
+
+    targets = [parse_target(value) for value in args.exe]
+    if not targets:
+        targets = [("source", "")]
+
+    results = {}
+    for label, exe in targets:
+        base_cmd = [exe] if exe else [sys.executable, os.path.join(ROOT, "src", "main.py")]
+        results[label] = {}
+        for mode, extra in MODES.items():
+            samples = [s for s in (run_once(base_cmd, extra) for _ in range(args.runs)) if s]
+            results[label][mode] = summarize(samples)
+        if exe:
+            size_mb, files = bundle_size(exe)
+            results[label]["bundle"] = {"size_mb": size_mb, "files": files}
+
+    if args.json:
+        print(json.dumps(results if len(targets) > 1 else results[targets[0][0]], indent=2))
+        return 0
+
+    print(
+        f"{'build':<16}{'mode':<8}{'hotkey ready (ms)':>20}{'process uptime (ms)':>22}"
+        f"{'first run (ms)':>16}{'RSS (MB)':>10}"
+    )
+    for label, result in results.items():
+        for mode in MODES:
+            r = result[mode]
+            print(
+                f"{label:<16}{mode:<8}{r['hotkey_ready_ms']!s:>20}{r['process_uptime_ms']!s:>22}"
+                f"{r['first_uptime_ms']!s:>16}{r['rss_mb']!s:>10}"
+            )
+        if "bundle" in result:
+            print(f"{label:<16}bundle: {result['bundle']['size_mb']} MB, {result['bundle']['files']} files")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""逐行/逐段套用模板基准
+
+用法:
+    python benchmarks/bench_transform.py [--lines 1000 10000 100000] [--repeat 5]
+
+只测量进程内的数据处理（不访问剪贴板、不模拟按键）：
+- naive: splitlines 后逐行拼接新字符串，再用换行合并
+- stream: src.core.transform 的生成器，分段产出后一次 join（即写入剪贴板的内容）
+output 为一次写入剪贴板的数据量（UTF-16）。
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.transform import SEGMENT_LINE, SEGMENT_PARAGRAPH, apply_template
+
+TEMPLATE = "[]{.label .info}"
+OFFSET = 16
+PARAGRAPH_TEMPLATE = "+++info\r\n\r\n+++"
+PARAGRAPH_OFFSET = 5
+
+
+def make_selection(lines: int) -> str:
+    """生成多行文本，每 5 行一个空行分段"""
+    row = "2024-05-01 12:00:00 INFO 处理请求 /api/v1/items?id=42 耗时 12ms"
+    return "".join(row + ("\n\n" if i % 5 == 4 else "\n") for i in range(lines))
+
+
+def naive(selection: str) -> str:
+    """逐行拼接：每行生成一个新字符串"""
+    insert_pos = len(TEMPLATE) - OFFSET
+    head, tail = TEMPLATE[:insert_pos], TEMPLATE[insert_pos:]
+    return "\n".join(head + line + tail if line.strip() else line for line in selection.splitlines())
+
+
+def stream(selection: str, mode: str, template: str, offset: int) -> str:
+    return "".join(apply_template(template, offset, selection, mode))
+
+
+def measure(func, *args, repeat: int) -> float:
+    """多次执行取中位数（毫秒）"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", nargs="+", type=int, default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'lines':>8}{'naive (ms)':>12}{'line (ms)':>11}{'para (ms)':>11}{'output (MB)':>13}")
+    for lines in args.lines:
+        selection = make_selection(lines)
+        naive_ms = measure(naive, selection, repeat=args.repeat)
+        line_ms = measure(stream, selection, SEGMENT_LINE, TEMPLATE, OFFSET, repeat=args.repeat)
+        para_ms = measure(
+            stream, selection, SEGMENT_PARAGRAPH, PARAGRAPH_TEMPLATE, PARAGRAPH_OFFSET,
+            repeat=args.repeat,
+        )
+        size = len(stream(selection, SEGMENT_LINE, TEMPLATE, OFFSET).encode("utf-16-le")) / 1e6
+        print(f"{lines:>8}{naive_ms:>12.2f}{line_ms:>11.2f}{para_ms:>11.2f}{size:>13.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""无界面基准使用的假输入/剪贴板后端
+
+install() 在 sys.modules 中放入假的 pyautogui 与 pyperclip，必须在导入 src.core.output
+之前调用。模拟按键作用在 FakeEditor（带光标和选区的文本缓冲区）上，剪贴板是进程内的
+FakeClipboard，行为与常见编辑器一致：
+- Ctrl+C 有选区时复制，没有选区时不改变剪贴板
+- Ctrl+V / Ctrl+Shift+V / Shift+Insert 用剪贴板内容替换选区
+- left / right / home / end / backspace / delete / enter 移动光标或编辑
+"""
+import sys
+import types
+
+PASTE_CHORDS = {("ctrl", "v"), ("ctrl", "shift", "v"), ("shift", "insert")}
+
+
+class FakeClipboard:
+    """进程内剪贴板，sequence 每次写入递增"""
+
+    def __init__(self):
+        self.text = ""
+        self.sequence = 0
+
+    def copy(self, text: str):
+        self.text = str(text)
+        self.sequence += 1
+
+    def paste(self) -> str:
+        return self.text
+
+
+class FakeEditor:
+    """带光标和选区的文本编辑器缓冲区"""
+
+    def __init__(self, text: str = ""):
+        self.text = text
+        self.caret = len(text)
+        self.anchor = self.caret  # 与 caret 不同时表示有选区
+        self.keys = 0  # 收到的按键数
+
+    def load(self, text: str, select: tuple[int, int] | None = None):
+        """重置内容；select 为 (起点, 终点) 时选中该范围，光标在终点"""
+        self.text = text
+        if select is None:
+            self.caret = self.anchor = len(text)
+        else:
+            self.anchor, self.caret = select
+        self.keys = 0
+
+    @property
+    def selection(self) -> str:
+        start, end = sorted((self.anchor, self.caret))
+        return self.text[start:end]
+
+    def insert(self, value: str):
+        """替换选区（没有选区时在光标处插入）"""
+        start, end = sorted((self.anchor, self.caret))
+        self.text = self.text[:start] + value + self.text[end:]
+        self.caret = self.anchor = start + len(value)
+
+    def key(self, name: str):
+        """单个按键"""
+        self.keys += 1
+        start, end = sorted((self.anchor, self.caret))
+        if name == "left":
+            self.caret = start - 1 if start == end else start
+            self.caret = max(self.caret, 0)
+        elif name == "right":
+            self.caret = min(end + 1 if start == end else end, len(self.text))
+        elif name == "home":
+            self.caret = self.text.rfind("\n", 0, self.caret) + 1
+        elif name == "end":
+            newline = self.text.find("\n", self.caret)
+            self.caret = len(self.text) if newline < 0 else newline
+        elif name == "backspace":
+            if start == end and start > 0:
+                self.anchor = start - 1
+            self.insert("")
+            return
+        elif name == "delete":
+            if start == end and end < len(self.text):
+                self.caret = end + 1
+            self.insert("")
+            return
+        elif name in ("enter", "return"):
+            self.insert("\n")
+            return
+        elif len(name) == 1:
+            self.insert(name)
+            return
+        self.anchor = self.caret
+
+
+def _fake_pyautogui(editor: FakeEditor, clipboard: FakeClipboard) -> types.ModuleType:
+    module = types.ModuleType("pyautogui")
+    module.FAILSAFE = False
+    module.PAUSE = 0
+
+    def hotkey(*keys, **_kwargs):
+        chord = tuple(key.lower() for key in keys)
+        editor.keys += 1
+        if chord == ("ctrl", "c"):
+            if editor.selection:
+                clipboard.copy(editor.selection)
+        elif chord in PASTE_CHORDS:
+            editor.insert(clipboard.paste())
+
+    def press(keys, presses: int = 1, interval: float = 0.0, **_kwargs):
+        for _ in range(presses):
+            for key in [keys] if isinstance(keys, str) else keys:
+                editor.key(key.lower())
+
+    def write(message: str, interval: float = 0.0, **_kwargs):
+        for char in message:
+            editor.key("enter" if char == "\n" else char)
+
+    module.hotkey = hotkey
+    module.press = press
+    module.write = write
+    module.typewrite = write
+    return module
+
+
+def _fake_pyperclip(clipboard: FakeClipboard) -> types.ModuleType:
+    module = types.ModuleType("pyperclip")
+    module.copy = clipboard.copy
+    module.paste = clipboard.paste
+    return module
+
+
+def install() -> tuple[FakeEditor, FakeClipboard]:
+    """安装假后端，返回模拟的编辑器与剪贴板"""
+    if "src.core.output" in sys.modules:
+        raise RuntimeError("fakes.install() must run before src.core.output is imported")
+    editor = FakeEditor()
+    clipboard = FakeClipboard()
+    sys.modules["pyautogui"] = _fake_pyautogui(editor, clipboard)
+    sys.modules["pyperclip"] = _fake_pyperclip(clipboard)
+
+    # Windows 上 src.core.clipboard 直接调用系统剪贴板，改为走 pyperclip
+    from src.core import clipboard as system_clipboard
+    system_clipboard._win32 = lambda: None
+    return editor, clipboard
@@ -0,0 +1,245 @@
+"""回放会话记录：用真实的弹出面板与模板注册表重放一次插入过程
+
+用法:
+    python benchmarks/replay.py                            # 回放默认位置的 session.bin
+    python benchmarks/replay.py path/to/session.bin --speed recorded
+    python benchmarks/replay.py --dump                     # 只列出记录
+    python benchmarks/replay.py --cprofile replay.prof     # 回放时采集 cProfile
+
+记录由配置 "record_session": true 开启（见 src/core/recorder.py），只有事件类型、
+菜单序号、选中文字长度与耗时。回放时输入与剪贴板使用 benchmarks/fakes.py 模拟：
+弹出热键与面板按键送入真实的 PopupPanel（需要 PySide6，缺少时跳过面板事件，
+按记录的选择直接取模板），每次输出在 FakeEditor 上用记录长度的合成选中文字执行。
+--speed recorded 按记录的时间间隔回放（间隔上限见 --max-gap），max 不等待。
+默认不做剪贴板等待，只测量本程序自身的处理耗时；--with-waits 使用默认输出配置的等待时间。
+"""
+import argparse
+import cProfile
+import json
+import os
+import statistics
+import sys
+import time
+from collections import defaultdict, deque
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import fakes
+
+EDITOR, CLIPBOARD = fakes.install()
+
+from src.core import recorder
+from src.core.menu_config import MENU_ITEMS, get_output
+from src.core.output import output_text
+from src.core.profiles import DEFAULT_PROFILE, OutputProfile
+
+ZERO_WAIT = OutputProfile(name="replay", copy_ms=0, settle_ms=0, paste_ms=0, key_interval_ms=0)
+SELECTION_LINE = "2024-05-01 12:00:00 INFO 处理请求 /api/v1/items?id=42 耗时 12ms\n"
+QT_SPECIAL_KEY = 0x01000000
+
+
+def synthetic_selection(chars: int) -> str:
+    """指定长度的合成选中文字（记录中没有原文）"""
+    return (SELECTION_LINE * (chars // len(SELECTION_LINE) + 1))[:chars]
+
+
+class Replayer:
+    """按顺序执行记录中的事件，收集记录耗时与回放耗时"""
+
+    def __init__(self, profile: OutputProfile, speed: str, max_gap: float):
+        self._profile = profile
+        self._speed = speed
+        self._max_gap = max_gap
+        self._pending: deque[tuple[str, int, str]] = deque()  # 等待输出的 (文本, 偏移, 分段方式)
+        self._panel_selection: tuple[str, str] | None = None
+        self._last_timestamp: float | None = None
+        self.recorded: dict[str, list[float]] = defaultdict(list)
+        self.replayed: dict[str, list[float]] = defaultdict(list)
+        self.notes: dict[str, int] = defaultdict(int)
+
+        self._app = self._panel = None
+        try:
+            from PySide6.QtWidgets import QApplication
+            from src.ui.popup_panel import PopupPanel
+        except ImportError as e:
+            print(f"PySide6 unavailable ({e}), popup events are skipped", file=sys.stderr)
+            return
+        self._app = QApplication.instance() or QApplication([sys.argv[0]])
+        self._panel = PopupPanel()
+        self._panel.output_selected.connect(lambda text, offset, segment: self._pending.append((text, offset, segment)))
+        self._panel.template_selected.connect(lambda menu, sub: setattr(self, "_panel_selection", (menu, sub or None)))
+
+    def _wait_until(self, timestamp: float):
+        """按记录的时间间隔等待"""
+        if self._speed == "recorded" and self._last_timestamp is not None:
+            deadline = time.perf_counter() + min(max(timestamp - self._last_timestamp, 0.0), self._max_gap)
+            while time.perf_counter() < deadline:
+                if self._app is not None:
+                    self._app.processEvents()
+                time.sleep(0.001)
+        self._last_timestamp = timestamp
+
+    def run(self, records: list[recorder.Record]):
+        for record in records:
+            self._wait_until(record.timestamp)
+            handler = getattr(self, f"_on_{record.name}", None)
+            if handler is None:
+                self.notes["unknown event"] += 1
+                continue
+            handler(record)
+        if self._pending:
+            self.notes["selected but never output"] += len(self._pending)
+
+    # ---------- 事件 ----------
+
+    def _on_hotkey(self, record: recorder.Record):
+        if record.arg1 not in (recorder.HOTKEY_POPUP, recorder.HOTKEY_CHORD_STALLED) or self._panel is None:
+            return
+        menu_key = ""
+        if record.arg1 == recorder.HOTKEY_CHORD_STALLED and 0 < record.arg2 <= len(MENU_ITEMS):
+            menu_key = MENU_ITEMS[record.arg2 - 1].key
+        self._panel_selection = None
+        start = time.perf_counter()
+        self._panel.prepare()
+        self._panel.show_at_cursor(menu_key)
+        self.replayed["popup_shown"].append((time.perf_counter() - start) * 1000)
+        self._app.processEvents()
+
+    def _on_popup_shown(self, record: recorder.Record):
+        self.recorded["popup_shown"].append(record.value)
+
+    def _on_popup_key(self, record: recorder.Record):
+        if self._panel is None:
+            return
+        from PySide6.QtCore import Qt
+        from PySide6.QtTest import QTest
+
+        key = record.arg2 | (QT_SPECIAL_KEY if record.arg1 else 0)
+        if not self._panel.isVisible():
+            self.notes["key after popup closed"] += 1
+            return
+        start = time.perf_counter()
+        QTest.keyClick(self._panel, Qt.Key(key))
+        self.replayed["popup_key"].append((time.perf_counter() - start) * 1000)
+
+    def _on_select(self, record: recorder.Record):
+        keys = recorder.template_keys(record.arg1, record.arg2)
+        if self._panel_selection is not None:
+            # 面板中选择的模板已由 output_selected 放入队列，核对是否与记录一致
+            if keys != self._panel_selection:
+                self.notes["popup selection differs from record"] += 1
+            self._panel_selection = None
+            return
+        if keys is None:
+            text, offset = "x" * record.size, 0
+        else:
+            try:
+                text, offset = get_output(*keys)
+            except (KeyError, ValueError):
+                self.notes["template no longer exists"] += 1
+                return
+        self._pending.append((text, offset, ""))
+
+    def _on_queued(self, record: recorder.Record):
+        self.recorded["queued"].append(record.value)
+
+    def _on_copy(self, record: recorder.Record):
+        self.recorded["copy"].append(record.value)
+
+    def _on_output(self, record: recorder.Record):
+        self.recorded["output"].append(record.value)
+        if not self._pending:
+            self.notes["output without selection"] += 1
+            return
+        text, offset, segment = self._pending.popleft()
+        segment = recorder.SEGMENTS[record.arg1] if record.arg1 < len(recorder.SEGMENTS) else segment
+        erase = record.arg2
+        if erase:
+            EDITOR.load("x" * erase)
+        elif record.size:
+            selection = synthetic_selection(record.size)
+            EDITOR.load(selection, (0, len(selection)))
+        else:
+            EDITOR.load("")
+        CLIPBOARD.copy("original clipboard")
+        start = time.perf_counter()
+        output_text(text, offset, erase, segment, profile=self._profile)
+        self.replayed["output"].append((time.perf_counter() - start) * 1000)
+
+
+def summarize(values: list[float]) -> dict:
+    if not values:
+        return {}
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "median_ms": round(statistics.median(values), 3),
+        "p95_ms": round(values[min(len(values) - 1, int(len(values) * 0.95))], 3),
+        "max_ms": round(values[-1], 3),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", nargs="?", default=str(recorder.RECORD_PATH))
+    parser.add_argument("--speed", choices=("recorded", "max"), default="max")
+    parser.add_argument("--max-gap", type=float, default=2.0, help="按记录速度回放时单个间隔的上限（秒）")
+    parser.add_argument("--with-waits", action="store_true", help="使用默认输出配置的剪贴板等待时间")
+    parser.add_argument("--dump", action="store_true", help="只列出记录，不回放")
+    parser.add_argument("--cprofile", metavar="FILE", help="回放时采集 cProfile 并写入该文件")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    args = parser.parse_args()
+
+    try:
+        records = recorder.read_records(args.path)
+    except (OSError, ValueError) as e:
+        print(f"cannot read {args.path}: {e}", file=sys.stderr)
+        return 1
+
+    if args.dump:
+        start = records[0].timestamp if records else 0.0
+        for r in records:
+            print(f"{r.timestamp - start:10.3f}s  {r.name:<12} {r.arg1:>3} {r.arg2:>5} {r.size:>9} {r.value:10.2f}")
+        return 0
+
+    replayer = Replayer(DEFAULT_PROFILE if args.with_waits else ZERO_WAIT, args.speed, args.max_gap)
+    profiler = cProfile.Profile() if args.cprofile else None
+    if profiler is not None:
+        profiler.enable()
+    replayer.run(records)
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(args.cprofile)
+        print(f"profile written to {args.cprofile}", file=sys.stderr)
+
+    names = sorted(set(replayer.recorded) | set(replayer.replayed))
+    result = {
+        "records": len(records),
+        "metrics": {
+            name: {"recorded": summarize(replayer.recorded[name]), "replayed": summarize(replayer.replayed[name])}
+            for name in names
+        },
+        "notes": dict(replayer.notes),
+    }
+    if args.json:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+        return 0
+
+    print(f"{len(records)} records")
+    print(f"{'metric':<14}{'recorded median':>18}{'p95':>10}{'replayed median':>18}{'p95':>10}")
+    for name, stats in result["metrics"].items():
+        rec, rep = stats["recorded"], stats["replayed"]
+        print(
+            f"{name:<14}{rec.get('median_ms', '-'):>18}{rec.get('p95_ms', '-'):>10}"
+            f"{rep.get('median_ms', '-'):>18}{rep.get('p95_ms', '-'):>10}"
+        )
+    for note, count in result["notes"].items():
+        print(f"note: {note} x{count}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""空闲占用长时间验证：反复"使用 → 空闲"，检查空闲时的常驻内存、唤醒频率与内存增长
+
+用法:
+    python benchmarks/soak.py                          # 默认运行 10 分钟
+    python benchmarks/soak.py --duration 60 --idle-after 2
+    python benchmarks/soak.py --rss-mb 80 --wakeups 2 --max-growth-mb 5 --json
+
+在 Qt offscreen 平台上运行，输入与剪贴板由 benchmarks/fakes.py 模拟。每一轮先模拟一次使用
+（打开主窗口、弹出面板按键导航并选择模板、在假编辑器上输出），然后运行事件循环等待
+IdleMonitor 进入空闲（释放主窗口与面板菜单页、清理缓存），并在空闲期间测量：
+- 常驻内存（RSS）
+- 界面线程事件循环每秒唤醒次数，以及进程每秒主动上下文切换次数（需要 psutil）
+- tracemalloc 统计的 Python 内存
+任一轮空闲占用超出预算，或最后一轮相对第一轮的内存增长超过 --max-growth-mb 时以退出码 1 结束。
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import fakes
+
+EDITOR, CLIPBOARD = fakes.install()
+
+from PySide6.QtCore import QEventLoop, Qt, QTimer
+from PySide6.QtTest import QTest
+from PySide6.QtWidgets import QApplication
+
+from src.core.idle import DEFAULT_RSS_BUDGET_MB, DEFAULT_WAKEUP_BUDGET, IdleMonitor, WakeupCounter, footprint
+from src.core.output import output_text
+from src.core.profiles import OutputProfile
+from src.ui.popup_panel import PopupPanel
+
+ZERO_WAIT = OutputProfile(name="soak", copy_ms=0, settle_ms=0, paste_ms=0, key_interval_ms=0)
+SELECTION = "2024-05-01 12:00:00 INFO 处理请求 /api/v1/items?id=42 耗时 12ms\n" * 200
+NAVIGATION = [Qt.Key_Down, Qt.Key_Down, Qt.Key_Tab, Qt.Key_Up, Qt.Key_Return, Qt.Key_Down, Qt.Key_Return]
+
+
+def run_loop(seconds: float):
+    """运行真正的事件循环（空闲测量必须在事件循环中进行，processEvents 轮询本身会产生唤醒）"""
+    loop = QEventLoop()
+    QTimer.singleShot(round(seconds * 1000), loop.quit)
+    loop.exec()
+
+
+class Session:
+    """与 App 相同的空闲释放组合：主窗口按需创建，面板菜单页空闲时释放"""
+
+    def __init__(self, idle_after: float):
+        self.panel = PopupPanel()
+        self.panel.output_selected.connect(self._output)
+        self.main_window = None
+        self.idle = IdleMonitor(idle_after)
+        self.idle.add_release(self._release_main_window)
+        self.idle.add_release(self.panel.release)
+
+    def _output(self, text: str, offset: int, segment: str):
+        EDITOR.load(SELECTION, (0, len(SELECTION)))
+        output_text(text, offset, segment=segment, profile=ZERO_WAIT)
+
+    def _release_main_window(self):
+        if self.main_window is not None and not self.main_window.isVisible():
+            self.main_window.deleteLater()
+            self.main_window = None
+
+    def use(self):
+        """模拟一次使用"""
+        from src.ui.main_window import MainWindow
+
+        self.idle.touch()
+        if self.main_window is None:
+            self.main_window = MainWindow()
+        self.main_window.show_window()
+        QApplication.processEvents()
+        self.main_window.hide()
+
+        self.panel.prepare()
+        self.panel.show_at_cursor()
+        for key in NAVIGATION:
+            if not self.panel.isVisible():
+                break
+            QTest.keyClick(self.panel, key)
+        self.panel.hide()
+        QApplication.processEvents()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=600, help="总运行时间（秒）")
+    parser.add_argument("--idle-after", type=float, default=2.0, help="进入空闲的时间（秒）")
+    parser.add_argument("--idle-measure", type=float, default=3.0, help="每轮空闲期间的测量时间（秒）")
+    parser.add_argument("--rss-mb", type=float, default=DEFAULT_RSS_BUDGET_MB, help="空闲常驻内存预算")
+    parser.add_argument("--wakeups", type=float, default=DEFAULT_WAKEUP_BUDGET, help="空闲每秒唤醒次数预算")
+    parser.add_argument("--max-growth-mb", type=float, default=5.0, help="首轮到末轮允许的内存增长")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([sys.argv[0]])
+    tracemalloc.start()
+    session = Session(args.idle_after)
+    counter = WakeupCounter()
+
+    rounds = []
+    deadline = time.monotonic() + args.duration
+    while not rounds or time.monotonic() < deadline:
+        session.use()
+        # 等待进入空闲（含释放与缓存清理）
+        run_loop(args.idle_after + 0.5)
+        if not session.idle.is_idle:
+            print("idle mode was not entered", file=sys.stderr)
+            return 1
+        before = footprint(None, args.rss_mb, args.wakeups)
+        counter.start()
+        run_loop(args.idle_measure)
+        loop_wakeups = counter.stop()
+        after = footprint(before, args.rss_mb, args.wakeups)
+        rounds.append({
+            "rss_mb": after["rss_mb"],
+            "tracemalloc_mb": after.get("tracemalloc_mb"),
+            "loop_wakeups_per_s": round(loop_wakeups, 2),
+            "wakeups_per_s": after["wakeups_per_s"],
+            "over_budget": after["over_budget"] + (["loop_wakeups_per_s"] if loop_wakeups > args.wakeups else []),
+        })
+        if not args.json:
+            r = rounds[-1]
+            print(
+                f"round {len(rounds):>3}: rss {r['rss_mb']} MB, python {r['tracemalloc_mb']} MB, "
+                f"loop {r['loop_wakeups_per_s']}/s, ctx {r['wakeups_per_s']}/s"
+            )
+
+    failures = [f"round {i + 1}: {', '.join(r['over_budget'])}" for i, r in enumerate(rounds) if r["over_budget"]]
+    # 首轮之后各缓存已就绪，用第二轮作为增长的起点（只有一轮时与自身比较）
+    base = rounds[1] if len(rounds) > 2 else rounds[0]
+    growth = {}
+    for key in ("rss_mb", "tracemalloc_mb"):
+        if base.get(key) is not None and rounds[-1].get(key) is not None:
+            growth[key] = round(rounds[-1][key] - base[key], 2)
+            if growth[key] > args.max_growth_mb:
+                failures.append(f"{key} grew by {growth[key]} MB")
+
+    result = {
+        "rounds": len(rounds),
+        "budget": {"rss_mb": args.rss_mb, "wakeups_per_s": args.wakeups, "max_growth_mb": args.max_growth_mb},
+        "max_rss_mb": max((r["rss_mb"] for r in rounds if r["rss_mb"] is not None), default=None),
+        "max_loop_wakeups_per_s": max(r["loop_wakeups_per_s"] for r in rounds),
+        "growth_mb": growth,
+        "failures": failures,
+    }
+    if args.json:
+        print(json.dumps({**result, "per_round": rounds}, indent=2))
+    else:
+        print(json.dumps(result, indent=2))
+    for line in failures:
+        print(f"OVER BUDGET {line}", file=sys.stderr)
+    app.processEvents()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,332 @@
+"""无界面基准套件：热键分派、弹出面板、缩写、插入与包裹，结果与 JSON 基线对比
+
+用法:
+    python benchmarks/suite.py                         # 运行并与基线对比
+    python benchmarks/suite.py --save                  # 运行并把结果写为新基线
+    python benchmarks/suite.py -k wrap --threshold 0.3 # 只运行名称包含 wrap 的场景
+
+在 Qt offscreen 平台上运行，输入、剪贴板和目标编辑器都由 benchmarks/fakes.py 模拟，
+不需要图形会话。每个场景重复多轮取中位数；与基线相比变慢超过阈值（默认 25%）时
+以退出码 1 结束。基线与机器相关，应在同一台机器上生成和对比。
+需要 Qt 的场景在没有 PySide6 时跳过。
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Callable
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import fakes
+
+EDITOR, CLIPBOARD = fakes.install()
+
+from src.core.output import output_text
+from src.core.profiles import OutputProfile
+from src.core.abbrev import DEFAULT_PREFIX, AbbrevMatcher, default_abbreviations, template_conflicts
+from src.core.menu_config import get_output, template_texts
+from src.core.selection import FakeSelectionProvider
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_THRESHOLD = 0.25
+
+# 不等待：只测量本程序自身的处理耗时
+ZERO_WAIT = OutputProfile(name="bench", copy_ms=0, settle_ms=0, paste_ms=0, key_interval_ms=0)
+
+# 直接读取假编辑器选区的提供者，对应 UI Automation / AT-SPI
+EDITOR_SELECTION = FakeSelectionProvider(lambda: EDITOR.selection)
+
+SELECTION_LINE = "2024-05-01 12:00:00 INFO 处理请求 /api/v1/items?id=42 耗时 12ms\n"
+WRAP_SIZES = {"1K": 1024, "64K": 64 * 1024, "1M": 1024 * 1024, "10M": 10 * 1024 * 1024}
+
+
+class Skip(Exception):
+    """场景在当前环境下无法运行"""
+
+
+# ---------- 场景 ----------
+# 每个场景是一个返回 (单次操作函数, 每次调用包含的操作数) 的准备函数，
+# 结果按"每个操作的毫秒数"记录。
+
+SCENARIOS: dict[str, Callable[[], tuple[Callable[[], None], int]]] = {}
+
+
+def scenario(name: str):
+    def register(func):
+        SCENARIOS[name] = func
+        return func
+    return register
+
+
+def _qt_app():
+    try:
+        from PySide6.QtWidgets import QApplication
+    except ImportError as e:
+        raise Skip(f"PySide6 unavailable ({e})")
+    return QApplication.instance() or QApplication([sys.argv[0]])
+
+
+@scenario("hotkey.dispatch")
+def hotkey_dispatch():
+    """假后端触发热键到信号分派（含未绑定的按键、直接绑定与弹出热键）"""
+    _qt_app()
+    from src.core.hotkey import HotkeyManager
+
+    manager = HotkeyManager(backend="fake", coalesce_ms=0)
+    manager.set_hotkey(["ctrl"], "space")
+    manager.set_bindings([
+        {"modifiers": ["ctrl", "alt"], "key": str(i), "menu": "fold", "sub": "info"} for i in range(1, 6)
+    ])
+    manager.start()
+    fired = [0]
+    manager.triggered.connect(lambda: fired.__setitem__(0, fired[0] + 1))
+    manager.binding_triggered.connect(lambda _b: fired.__setitem__(0, fired[0] + 1))
+    backend = manager.backend
+    events = [
+        (["ctrl"], "space"), (["ctrl", "alt"], "3"), (["ctrl"], "s"), (["ctrl", "alt"], "9"),
+    ] * 250
+
+    def run():
+        for modifiers, key in events:
+            backend.fire(modifiers, key)
+
+    return run, len(events)
+
+
+@scenario("popup.open")
+def popup_open():
+    """预热后显示、隐藏弹出面板"""
+    app = _qt_app()
+    from src.ui.popup_panel import PopupPanel
+
+    panel = PopupPanel()
+
+    def run():
+        panel.prepare()
+        panel.show_at_cursor()
+        app.processEvents()
+        panel.hide()
+
+    return run, 1
+
+
+@scenario("popup.navigate")
+def popup_navigate():
+    """弹出面板中的按键导航：上下移动、进入子菜单、返回、切换分段方式"""
+    app = _qt_app()
+    from PySide6.QtCore import Qt
+    from PySide6.QtTest import QTest
+    from src.ui.popup_panel import PopupPanel
+
+    panel = PopupPanel()
+    panel.output_selected.connect(lambda *_args: None)
+    keys = [Qt.Key_Down, Qt.Key_Down, Qt.Key_Up, Qt.Key_Return, Qt.Key_Down, Qt.Key_Backspace,
+            Qt.Key_Tab, Qt.Key_Tab, Qt.Key_Tab]
+
+    def run():
+        panel.show_at_cursor()
+        for key in keys:
+            QTest.keyClick(panel, key)
+        panel.hide()
+        app.processEvents()
+
+    return run, len(keys)
+
+
+def _check(expected: str):
+    if EDITOR.text != expected:
+        raise AssertionError(f"editor mismatch: {EDITOR.text[:60]!r} != {expected[:60]!r}")
+
+
+@scenario("abbrev.template_syntax")
+def abbrev_template_syntax():
+    """手写所有模板语法（含卡片 ;;;id）时默认缩写不会误触发，也不是任何模板的开头"""
+    abbreviations = list(default_abbreviations())
+    texts = template_texts()
+    for abbrev in abbreviations:
+        for text in texts:
+            if text.startswith(abbrev):
+                raise AssertionError(f"abbreviation {abbrev!r} starts template {text[:20]!r}")
+    conflicts = template_conflicts(abbreviations)
+    if conflicts:
+        raise AssertionError(f"abbreviations clash with templates: {conflicts}")
+    # 卡片 id 取自缩写名时最容易误触发
+    ids = [abbrev[len(DEFAULT_PREFIX):] for abbrev in abbreviations]
+    stream = "".join(texts) + "".join(f";;;{card_id} 标题\n\n;;;\n" for card_id in ids)
+    matcher = AbbrevMatcher(abbreviations)
+
+    def run() -> int:
+        matcher.reset()
+        return sum(matcher.feed(char) is not None for char in stream)
+
+    hits = run()
+    if hits:
+        raise AssertionError(f"{hits} abbreviations fired while typing template syntax")
+    return run, len(stream)
+
+
+@scenario("output.insert")
+def output_insert():
+    """没有选中文字时插入模板并定位光标"""
+    text, offset = get_output("reminder", "warning")
+
+    def run():
+        EDITOR.load("")
+        output_text(text, offset, profile=ZERO_WAIT)
+
+    run()
+    _check(text)
+    if EDITOR.caret != len(text) - offset:
+        raise AssertionError(f"caret at {EDITOR.caret}, expected {len(text) - offset}")
+    return run, 1
+
+
+def _wrap_scenario(size: int, provider: FakeSelectionProvider | None = None):
+    def prepare():
+        text, offset = get_output("fold", "info")
+        chars = size // 2
+        selection = (SELECTION_LINE * (chars // len(SELECTION_LINE) + 1))[:chars]
+        insert_pos = len(text) - offset
+
+        def run():
+            EDITOR.load(selection, (0, len(selection)))
+            CLIPBOARD.copy("original clipboard")
+            output_text(text, offset, profile=ZERO_WAIT, selection=provider)
+
+        run()
+        _check(text[:insert_pos] + selection + text[insert_pos:])
+        return run, 1
+    return prepare
+
+
+for _label, _size in WRAP_SIZES.items():
+    SCENARIOS[f"output.wrap.{_label}"] = _wrap_scenario(_size)
+SCENARIOS["output.wrap.native.1M"] = _wrap_scenario(WRAP_SIZES["1M"], EDITOR_SELECTION)
+
+
+@scenario("output.wrap.same_clip")
+def output_wrap_same_clipboard():
+    """选中文字与剪贴板内容相同：比较剪贴板内容的方式会误判为没有选中，提供者不会"""
+    text, offset = get_output("reminder", "info")
+    selection = SELECTION_LINE * 4
+    insert_pos = len(text) - offset
+
+    def run():
+        EDITOR.load(selection, (0, len(selection)))
+        CLIPBOARD.copy(selection)
+        output_text(text, offset, profile=ZERO_WAIT, selection=EDITOR_SELECTION)
+
+    run()
+    _check(text[:insert_pos] + selection + text[insert_pos:])
+    return run, 1
+
+
+@scenario("output.lines.100k")
+def output_lines():
+    """10 万行选中文字逐行套用模板"""
+    text, offset = get_output("rainbow")
+    selection = SELECTION_LINE * 100_000
+
+    def run():
+        EDITOR.load(selection, (0, len(selection)))
+        output_text(text, offset, segment="line", profile=ZERO_WAIT)
+
+    run()
+    tail = text[len(text) - offset:] if offset else text
+    if EDITOR.text.count(tail) != 100_000:
+        raise AssertionError("not every line was wrapped")
+    return run, 1
+
+
+# ---------- 运行与对比 ----------
+
+def run_scenario(prepare, repeat: int) -> dict:
+    """运行场景，返回每个操作的耗时统计（毫秒）"""
+    func, ops = prepare()
+    func()  # 预热
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000 / ops)
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "min_ms": round(samples[0], 4),
+        "max_ms": round(samples[-1], 4),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """返回超过阈值的退化场景说明"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        ratio = result["median_ms"] / max(base["median_ms"], 1e-9)
+        if ratio > 1 + threshold:
+            regressions.append(f"{name}: {base['median_ms']:.4f} -> {result['median_ms']:.4f} ms ({ratio:.2f}x)")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-k", "--filter", default="", help="只运行名称包含该字符串的场景")
+    parser.add_argument("-r", "--repeat", type=int, default=7)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="允许的变慢比例")
+    parser.add_argument("--save", action="store_true", help="把本次结果写为基线")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f).get("scenarios", {})
+
+    results = {}
+    skipped = {}
+    for name, prepare in SCENARIOS.items():
+        if args.filter not in name:
+            continue
+        try:
+            results[name] = run_scenario(prepare, args.repeat)
+        except Skip as e:
+            skipped[name] = str(e)
+            continue
+        if not args.json:
+            base = baseline.get(name, {}).get("median_ms")
+            delta = f"{results[name]['median_ms'] / base:>8.2f}x" if base else f"{'-':>9}"
+            print(f"{name:<22}{results[name]['median_ms']:>12.4f} ms{delta}")
+
+    if args.json:
+        print(json.dumps({"scenarios": results, "skipped": skipped}, indent=2))
+    for name, reason in skipped.items():
+        print(f"skipped {name}: {reason}", file=sys.stderr)
+
+    if args.save:
+        data = {
+            "machine": {"platform": platform.platform(), "python": platform.python_version()},
+            "scenarios": {**baseline, **results},
+        }
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        print(f"baseline saved to {args.baseline}", file=sys.stderr)
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
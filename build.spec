@@ -6,6 +6,70 @@ block_cipher = None
 # 从环境变量获取版本号
 version = os.environ.get('APP_VERSION', '0.0.0')
 
+# 打包方式（环境变量 BUILD_PROFILE）:
+#   onefile  单文件 exe（默认），每次启动都要把整个包解压到临时目录
+#   onedir   目录形式 dist/shokaX plugin/，启动时直接加载，不解压、不使用 UPX
+profile = os.environ.get('BUILD_PROFILE', 'onefile')
+if profile not in ('onefile', 'onedir'):
+    raise SystemExit(f'unknown BUILD_PROFILE: {profile}')
+
+# 裁剪未使用的 Qt 模块、插件与 pyautogui 的截图/消息框依赖（环境变量 BUILD_PRUNE=1/0，
+# onedir 默认开启）。程序只用到 QtCore / QtGui / QtWidgets / QtNetwork，
+# pyautogui 只用到按键模拟，缺少 pyscreeze / pymsgbox 等模块时它会在调用相关函数时才报错。
+prune = os.environ.get('BUILD_PRUNE', '1' if profile == 'onedir' else '0') == '1'
+
+PRUNED_MODULES = [
+    'tkinter',
+    # pyautogui 的可选依赖
+    'PIL',
+    'pyscreeze',
+    'pymsgbox',
+    'mouseinfo',
+    'pygetwindow',
+    'pyrect',
+    # 未使用的 Qt 模块
+    'PySide6.Qt3DAnimation', 'PySide6.Qt3DCore', 'PySide6.Qt3DExtras', 'PySide6.Qt3DInput',
+    'PySide6.Qt3DLogic', 'PySide6.Qt3DRender',
+    'PySide6.QtBluetooth', 'PySide6.QtCharts', 'PySide6.QtConcurrent', 'PySide6.QtDataVisualization',
+    'PySide6.QtDesigner', 'PySide6.QtGraphs', 'PySide6.QtHelp', 'PySide6.QtHttpServer',
+    'PySide6.QtLocation', 'PySide6.QtMultimedia', 'PySide6.QtMultimediaWidgets', 'PySide6.QtNfc',
+    'PySide6.QtOpenGL', 'PySide6.QtOpenGLWidgets', 'PySide6.QtPdf', 'PySide6.QtPdfWidgets',
+    'PySide6.QtPositioning', 'PySide6.QtPrintSupport', 'PySide6.QtQml', 'PySide6.QtQuick',
+    'PySide6.QtQuick3D', 'PySide6.QtQuickControls2', 'PySide6.QtQuickWidgets',
+    'PySide6.QtRemoteObjects', 'PySide6.QtScxml', 'PySide6.QtSensors', 'PySide6.QtSerialBus',
+    'PySide6.QtSerialPort', 'PySide6.QtSpatialAudio', 'PySide6.QtSql', 'PySide6.QtStateMachine',
+    'PySide6.QtSvg', 'PySide6.QtSvgWidgets', 'PySide6.QtTest', 'PySide6.QtTextToSpeech',
+    'PySide6.QtUiTools', 'PySide6.QtWebChannel', 'PySide6.QtWebEngineCore',
+    'PySide6.QtWebEngineQuick', 'PySide6.QtWebEngineWidgets', 'PySide6.QtWebSockets',
+    'PySide6.QtXml',
+]
+
+# 随 PySide6 收集但用不到的文件（按打包内路径前缀 / 文件名匹配）
+PRUNED_PREFIXES = (
+    'PySide6/translations/',
+    'PySide6/qml/',
+    'PySide6/plugins/qmltooling/',
+    'PySide6/plugins/multimedia/',
+    'PySide6/plugins/position/',
+    'PySide6/plugins/sqldrivers/',
+    'PySide6/plugins/printsupport/',
+    'PySide6/plugins/designer/',
+)
+PRUNED_FILES = {
+    'opengl32sw.dll',  # 软件 OpenGL，程序不使用 OpenGL
+    'Qt6Pdf.dll',
+    'Qt6Qml.dll',
+    'Qt6QmlModels.dll',
+    'Qt6Quick.dll',
+    'Qt6VirtualKeyboard.dll',
+}
+
+
+def keep(entry) -> bool:
+    dest = entry[0].replace('\\', '/')
+    return not dest.startswith(PRUNED_PREFIXES) and os.path.basename(dest) not in PRUNED_FILES
+
+
 a = Analysis(
     ['src/main.py'],
     pathex=[],
@@ -18,29 +82,24 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=PRUNED_MODULES if prune else [],
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
     noarchive=False,
 )
 
+if prune:
+    a.binaries = [entry for entry in a.binaries if keep(entry)]
+    a.datas = [entry for entry in a.datas if keep(entry)]
+
 pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
 
-exe = EXE(
-    pyz,
-    a.scripts,
-    a.binaries,
-    a.zipfiles,
-    a.datas,
-    [],
+exe_options = dict(
     name='shokaX plugin',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
     console=False,
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -49,3 +108,37 @@ exe = EXE(
     entitlements_file=None,
     version='file_version_info.txt',
 )
+
+if profile == 'onefile':
+    exe = EXE(
+        pyz,
+        a.scripts,
+        a.binaries,
+        a.zipfiles,
+        a.datas,
+        [],
+        upx=True,
+        upx_exclude=[],
+        runtime_tmpdir=None,
+        **exe_options,
+    )
+else:
+    # UPX 压缩过的 Qt DLL 每次加载都要解压，而且容易被杀毒软件拦截，目录形式不使用 UPX
+    exe = EXE(
+        pyz,
+        a.scripts,
+        [],
+        exclude_binaries=True,
+        upx=False,
+        **exe_options,
+    )
+    coll = COLLECT(
+        exe,
+        a.binaries,
+        a.zipfiles,
+        a.datas,
+        strip=False,
+        upx=False,
+        upx_exclude=[],
+        name='shokaX plugin',
+    )
@@ -1,14 +1,33 @@
 """应用控制器"""
 import sys
+import time
+from typing import TYPE_CHECKING
 from PySide6.QtWidgets import QApplication
 from PySide6.QtCore import QTimer
 from PySide6.QtGui import QIcon, QPixmap, QPainter, QColor
 
-from src.ui.main_window import MainWindow
 from src.ui.popup_panel import PopupPanel
+from src.ui.tray import TrayIcon
 from src.core.hotkey import HotkeyManager
-from src.core.output import output_text
-from src.core.config import load_config, save_config
+from src.core.output_queue import OutputQueue, OutputTiming
+from src.core.profiles import ProfileResolver
+from src.core.commands import parse_insert, parse_insert_raw, resolve_binding
+from src.core import config
+from src.core.ipc import SingleInstance
+from src.core import metrics
+
+# 可选子系统（使用统计、输出时间学习、会话记录、卡顿检测、空闲释放、剪贴板历史、
+# 选中文字提供者）在对应的 _apply_* / _ensure_* 中按配置导入，关闭时不加载
+if TYPE_CHECKING:
+    from src.ui.main_window import MainWindow
+    from src.ui.update_dialog import UpdateDialog
+    from src.core.history import ClipboardHistory
+    from src.core.idle import IdleMonitor
+    from src.core.recorder import SessionRecorder
+    from src.core.selection import SelectionProvider
+    from src.core.timing import TimingModel
+    from src.core.usage import UsageStats
+    from src.core.watchdog import StallWatchdog
 
 
 def create_default_icon() -> QIcon:
@@ -36,32 +55,116 @@ def create_default_icon() -> QIcon:
 class App:
     """应用程序"""
 
-    def __init__(self):
+    # 启动后延迟检查更新，避开启动阶段的 CPU/IO 高峰
+    UPDATE_CHECK_DELAY_MS = 5000
+    # 空闲时预热弹出面板（注册式热键后端看不到修饰键，无法提前预热）
+    POPUP_WARMUP_DELAY_MS = 2000
+    # 使用统计延迟写盘，连续插入只写一次
+    USAGE_FLUSH_DELAY_MS = 5000
+    # 只读查询命令，不算作操作（不会退出空闲状态）
+    QUERY_COMMANDS = ("ping", "metrics", "timing", "stalls", "footprint")
+    # 密码管理器等程序标记不应被记录的剪贴板内容
+    SENSITIVE_CLIPBOARD_FORMATS = (
+        "ExcludeClipboardContentFromMonitorProcessing",
+        "Clipboard Viewer Ignore",
+        "x-kde-passwordManagerHint",
+    )
+
+    def __init__(
+        self,
+        instance: SingleInstance,
+        commands: list[str],
+        startup_report: bool = False,
+    ):
+        """
+        Args:
+            instance: 已取得锁的单实例保护（入口在导入本模块前完成检查）
+            commands: 启动后要执行的命令（托盘模式为 start，只创建托盘、热键和弹出面板，主窗口按需创建）
+            startup_report: 热键就绪后输出启动指标并退出（用于启动性能测试）
+        """
+        self._commands = commands
+        self._startup_report = startup_report
+
         self._app = QApplication(sys.argv)
         self._app.setQuitOnLastWindowClosed(False)
 
-        self._config = load_config()
+        self._instance = instance
+        self._instance.listen()
+
+        self._config = config.load_config()
+        self._icon = create_default_icon()
 
-        self._main_window = MainWindow()
+        self._main_window: "MainWindow | None" = None
+        self._update_dialog: "UpdateDialog | None" = None
+        self._tray = TrayIcon(self._icon)
         self._popup = PopupPanel()
-        self._hotkey = HotkeyManager()
+        self._hotkey = HotkeyManager(
+            backend=self._config.get("hotkey_backend", config.DEFAULT_HOTKEY_BACKEND),
+            coalesce_ms=self._config.get("hotkey_coalesce_ms", config.DEFAULT_HOTKEY_COALESCE_MS),
+            chord_delay_ms=self._config.get("chord_delay_ms", config.DEFAULT_CHORD_DELAY_MS),
+        )
+        self._output = OutputQueue()
+        self._profiles = ProfileResolver()
+        self._output.set_profiles(self._profiles)
+        self._timing: "TimingModel | None" = None
+        self._recorder: "SessionRecorder | None" = None
+        self._watchdog: "StallWatchdog | None" = None
+        self._history: "ClipboardHistory | None" = None
+        self._history_bytes = 0
+        self._selection: "SelectionProvider | None" = None
+        self._selection_kind = ""
+        self._idle: "IdleMonitor | None" = None
+        self._footprint: dict | None = None  # 上一次 footprint 命令的结果，用于计算唤醒频率
+
+        # 使用统计在第一次插入或开启排序时才读取
+        self._usage: "UsageStats | None" = None
+        self._usage_timer = QTimer()
+        self._usage_timer.setSingleShot(True)
+        self._usage_timer.setInterval(self.USAGE_FLUSH_DELAY_MS)
+        self._usage_timer.timeout.connect(self._flush_usage)
 
         self._setup_connections()
-        self._setup_icon()
         self._apply_config()
+        self._tray.show()
+
+        if not startup_report:
+            QTimer.singleShot(self.UPDATE_CHECK_DELAY_MS, self._check_update)
+            QTimer.singleShot(self.POPUP_WARMUP_DELAY_MS, self._popup.prepare)
 
     def _setup_connections(self):
         """设置信号连接"""
-        self._main_window.start_requested.connect(self._start)
-        self._main_window.stop_requested.connect(self._stop)
-        self._main_window.hotkey_changed.connect(self._on_hotkey_changed)
+        # 先标记操作（退出空闲状态），再交给各自的处理函数
+        for signal in (
+            self._hotkey.triggered,
+            self._hotkey.chord_stalled,
+            self._hotkey.prepare_requested,
+            self._hotkey.binding_triggered,
+            self._hotkey.abbreviation_triggered,
+            self._tray.show_requested,
+        ):
+            signal.connect(lambda *_args: self._touch())
+        self._tray.toggle_requested.connect(self._toggle)
+        self._tray.show_requested.connect(self._show_main_window)
+        self._tray.check_update_requested.connect(lambda: self._check_update(manual=True))
+        self._tray.stalls_requested.connect(self._show_stalls)
+        self._tray.quit_requested.connect(self._app.quit)
         self._hotkey.triggered.connect(self._on_hotkey)
+        self._hotkey.chord_stalled.connect(self._on_hotkey)
+        self._hotkey.prepare_requested.connect(self._prepare_popup)
+        self._app.clipboard().dataChanged.connect(self._on_clipboard_changed)
+        self._hotkey.binding_triggered.connect(self._on_binding)
+        self._hotkey.abbreviation_triggered.connect(self._on_abbreviation)
         self._popup.output_selected.connect(self._on_output)
-
-    def _setup_icon(self):
-        """设置图标"""
-        icon = create_default_icon()
-        self._main_window.set_icon(icon)
+        self._popup.template_selected.connect(self._record_usage)
+        self._popup.key_pressed.connect(self._on_popup_key)
+        self._popup.history_selected.connect(self._on_history_selected)
+        self._app.aboutToQuit.connect(self._flush_usage)
+        self._app.aboutToQuit.connect(self._output.shutdown)
+        self._app.aboutToQuit.connect(self._close_recorder)
+        self._app.aboutToQuit.connect(self._stop_watchdog)
+        self._app.aboutToQuit.connect(self._close_history)
+        self._app.aboutToQuit.connect(self._close_selection)
+        self._instance.command_received.connect(self._on_command)
 
     def _apply_config(self):
         """应用配置"""
@@ -70,38 +173,488 @@ class App:
             hotkey.get("modifiers", ["ctrl"]),
             hotkey.get("key", "space")
         )
-        self._main_window.set_hotkey(hotkey)
+        self._hotkey.set_bindings(self._config.get("bindings", config.DEFAULT_BINDINGS))
+        self._apply_abbreviations()
+        self._profiles.configure(self._config.get("output_profiles", config.DEFAULT_OUTPUT_PROFILES))
+        self._apply_timing()
+        self._apply_recording()
+        self._apply_watchdog()
+        self._apply_history()
+        self._apply_selection()
+        self._apply_idle()
+        ranking = self._config.get("popup_ranking", config.DEFAULT_POPUP_RANKING)
+        self._popup.set_ranking(
+            ranking,
+            self._ensure_usage() if ranking != "off" else self._usage,
+            self._config.get("popup_recent_count", config.DEFAULT_POPUP_RECENT_COUNT),
+        )
+
+    def _apply_timing(self):
+        """按配置开启或关闭按目标程序调整输出等待时间"""
+        enabled = self._config.get("adaptive_timing", config.DEFAULT_ADAPTIVE_TIMING)
+        if enabled and self._timing is None:
+            from src.core.timing import TimingModel
+
+            self._timing = TimingModel()
+        elif not enabled and self._timing is not None:
+            self._timing.flush()
+            self._timing = None
+        self._output.set_timing(self._timing)
+
+    def _apply_idle(self):
+        """按配置开启或关闭空闲释放（0 表示不启用）"""
+        idle_after_s = self._config.get("idle_after_s", config.DEFAULT_IDLE_AFTER_S)
+        if self._idle is None:
+            if idle_after_s <= 0:
+                return
+            from src.core.idle import IdleMonitor
+
+            self._idle = IdleMonitor(idle_after_s)
+            self._idle.add_release(self._release_main_window)
+            self._idle.add_release(self._release_update_dialog)
+            self._idle.add_release(self._popup.release)
+            self._idle.idle_changed.connect(self._on_idle_changed)
+        else:
+            self._idle.set_timeout(idle_after_s)
+
+    def _touch(self):
+        """标记一次操作（退出空闲状态）"""
+        if self._idle is not None:
+            self._idle.touch()
+
+    def _ensure_usage(self) -> "UsageStats":
+        """按需读取使用统计"""
+        if self._usage is None:
+            from src.core.usage import UsageStats
+
+            self._usage = UsageStats(half_life_days=self._config.get("usage_half_life_days", config.DEFAULT_USAGE_HALF_LIFE_DAYS))
+        return self._usage
+
+    def _flush_usage(self):
+        """使用统计写盘"""
+        if self._usage is not None:
+            self._usage.flush()
+
+    def _apply_recording(self):
+        """按配置开启或关闭会话记录"""
+        if not self._config.get("record_session", config.DEFAULT_RECORD_SESSION):
+            self._close_recorder()
+            return
+        if self._recorder is None:
+            from src.core.recorder import SessionRecorder
+
+            try:
+                self._recorder = SessionRecorder()
+            except (OSError, ValueError) as e:
+                print(f"打开会话记录失败: {e}")
+        self._output.set_recorder(self._recorder)
+
+    def _close_recorder(self):
+        """停止会话记录"""
+        self._output.set_recorder(None)
+        if self._recorder is not None:
+            self._recorder.close()
+            self._recorder = None
+
+    def _apply_watchdog(self):
+        """按配置开启或关闭界面卡顿检测（阈值改变时重新开始统计）"""
+        threshold = self._config.get("stall_threshold_ms", config.DEFAULT_STALL_THRESHOLD_MS)
+        if not self._config.get("stall_watchdog", config.DEFAULT_STALL_WATCHDOG):
+            self._stop_watchdog()
+            return
+        if self._watchdog is not None and self._watchdog.threshold_ms != threshold:
+            self._stop_watchdog()
+        if self._watchdog is None:
+            from src.core.watchdog import StallWatchdog
+
+            self._watchdog = StallWatchdog(threshold)
+            self._watchdog.start()
+
+    def _stop_watchdog(self):
+        """停止界面卡顿检测"""
+        if self._watchdog is not None:
+            self._watchdog.stop()
+            self._watchdog = None
+
+    def _apply_history(self):
+        """按配置开启或关闭剪贴板历史（容量改变时清空重建）"""
+        max_bytes = int(self._config.get("clipboard_history_mb", config.DEFAULT_CLIPBOARD_HISTORY_MB) * 1024 * 1024)
+        if not self._config.get("clipboard_history", config.DEFAULT_CLIPBOARD_HISTORY):
+            self._close_history()
+            return
+        if self._history is not None and self._history_bytes != max_bytes:
+            self._close_history()
+        if self._history is None:
+            from src.core.history import ClipboardHistory
+
+            self._history = ClipboardHistory(max_bytes)
+            self._history_bytes = max_bytes
+            self._popup.set_history(self._history)
+
+    def _close_history(self):
+        """清空剪贴板历史"""
+        self._popup.set_history(None)
+        if self._history is not None:
+            self._history.close()
+            self._history = None
+
+    def _apply_selection(self):
+        """按配置创建选中文字提供者"""
+        kind = self._config.get("selection_provider", config.DEFAULT_SELECTION_PROVIDER)
+        if kind == self._selection_kind:
+            return
+        self._close_selection()
+        self._selection_kind = kind
+        from src.core.selection import create_provider
+
+        try:
+            self._selection = create_provider(kind)
+        except ValueError as e:
+            print(f"选中文字提供者配置无效: {e}")
+        self._output.set_selection(self._selection)
+
+    def _close_selection(self):
+        """停止选中文字提供者"""
+        self._output.set_selection(None)
+        if self._selection is not None:
+            self._selection.close()
+            self._selection = None
+        self._selection_kind = ""
+
+    def _on_clipboard_changed(self):
+        """记录用户复制的文本（输出过程中借用剪贴板写入的内容不记录）"""
+        if self._history is None or self._output.owns_clipboard:
+            return
+        mime = self._app.clipboard().mimeData()
+        if mime is None or not mime.hasText():
+            return
+        formats = mime.formats()
+        if any(hint in fmt for fmt in formats for hint in self.SENSITIVE_CLIPBOARD_FORMATS):
+            return
+        self._history.add(mime.text())
+
+    def _on_history_selected(self, text: str):
+        """原样插入剪贴板历史"""
+        self._output.submit(text, 0, delay_ms=self._profiles.default.focus_ms, wrap=False)
+        self._record_raw(text)
+
+    def _on_idle_changed(self, idle: bool):
+        """空闲期间暂停卡顿检测（心跳是空闲时唯一的周期性唤醒）"""
+        if self._watchdog is None:
+            return
+        if idle:
+            self._watchdog.stop()
+        else:
+            self._watchdog.start()
+
+    def _release_main_window(self):
+        """空闲时释放隐藏的主窗口，下次显示时重建"""
+        if self._main_window is not None and not self._main_window.isVisible():
+            self._main_window.deleteLater()
+            self._main_window = None
+
+    def _release_update_dialog(self):
+        """空闲时释放没有进行中任务的更新流程（含网络管理器），下次检查时重建"""
+        # 模态提示框运行在嵌套事件循环中，其调用者可能就是更新流程，此时不能释放
+        if QApplication.activeModalWidget() is not None:
+            return
+        if self._update_dialog is not None and not self._update_dialog.is_busy:
+            self._update_dialog.deleteLater()
+            self._update_dialog = None
+
+    def _show_stalls(self):
+        """托盘显示卡顿统计摘要，完整统计写入 stalls.json"""
+        if self._watchdog is None:
+            self._tray.show_stalls("卡顿检测未开启（配置 stall_watchdog）")
+            return
+        try:
+            report = self._watchdog.dump()
+        except OSError as e:
+            print(f"保存卡顿统计失败: {e}")
+            report = self._watchdog.report()
+        if not report["stalls"]:
+            self._tray.show_stalls(f"没有超过 {report['threshold_ms']} ms 的卡顿")
+            return
+        lines = [f"{report['stalls']} 次，最长 {report['max_ms']:.0f} ms，合计 {report['total_ms']:.0f} ms"]
+        for stack in report["top_stacks"][:3]:
+            where = stack["stack"][-1] if stack["stack"] else "?"
+            lines.append(f"{stack['count']} 次 / {stack['total_ms']:.0f} ms: {where}")
+        self._tray.show_stalls("\n".join(lines))
+
+    def _record_raw(self, text: str):
+        """记录一次直接给出文本的插入（未开启会话记录时忽略）"""
+        if self._recorder is not None:
+            from src.core import recorder
+
+            self._recorder.record(recorder.EVENT_SELECT, recorder.RAW_TEMPLATE, size=len(text))
+
+    def _apply_abbreviations(self):
+        """应用缩写展开配置"""
+        if not self._config.get("abbrev_enabled", config.DEFAULT_ABBREV_ENABLED):
+            self._hotkey.set_abbreviations({})
+            return
+        if not self._hotkey.backend.sees_all_keys:
+            print("缩写展开需要 pynput 或 process 热键后端，当前后端无法使用")
+            return
+        from src.core.abbrev import default_abbreviations, template_conflicts
+
+        prefix = self._config.get("abbrev_prefix", config.DEFAULT_ABBREV_PREFIX)
+        abbreviations = default_abbreviations(prefix)
+        abbreviations.update(self._config.get("abbreviations", {}))
+        conflicts = template_conflicts([abbrev for abbrev, binding in abbreviations.items() if binding], prefix)
+        if conflicts:
+            print(f"以下缩写会在输入模板语法时误触发: {', '.join(conflicts)}")
+        self._hotkey.set_abbreviations({
+            abbrev: binding for abbrev, binding in abbreviations.items() if abbrev and binding
+        })
+
+    def _ensure_main_window(self) -> "MainWindow":
+        """按需创建主窗口"""
+        if self._main_window is None:
+            from src.ui.main_window import MainWindow
+
+            window = MainWindow()
+            window.set_icon(self._icon)
+            window.set_hotkey(self._config.get("hotkey", {}))
+            window.set_running(self._hotkey.is_running)
+            window.start_requested.connect(self._start)
+            window.stop_requested.connect(self._stop)
+            window.hotkey_changed.connect(self._on_hotkey_changed)
+            window.minimized_to_tray.connect(self._tray.notify_minimized)
+            self._main_window = window
+            metrics.mark("main_window_built")
+        return self._main_window
+
+    def _show_main_window(self):
+        """显示主窗口"""
+        self._ensure_main_window().show_window()
+
+    def _check_update(self, manual: bool = False):
+        """检查更新"""
+        if self._update_dialog is None:
+            from src.ui.update_dialog import UpdateDialog
+            self._update_dialog = UpdateDialog()
+        self._update_dialog.check(manual=manual)
 
     def _on_hotkey_changed(self, hotkey: dict):
         """快捷键变更"""
         self._config["hotkey"] = hotkey
-        save_config(self._config)
+        config.save_config(self._config)
         self._hotkey.set_hotkey(
             hotkey.get("modifiers", ["ctrl"]),
             hotkey.get("key", "space")
         )
 
+    def _toggle(self):
+        """切换启动/停止状态"""
+        if self._hotkey.is_running:
+            self._stop()
+        else:
+            self._start()
+
+    def _set_running(self, running: bool):
+        """同步运行状态到托盘和主窗口"""
+        self._tray.set_running(running)
+        if self._main_window is not None:
+            self._main_window.set_running(running)
+
     def _start(self):
         """启动服务"""
         self._hotkey.start()
-        self._main_window.set_running(True)
+        self._set_running(True)
+        metrics.mark("hotkey_ready")
 
     def _stop(self):
         """停止服务"""
         self._hotkey.stop()
-        self._main_window.set_running(False)
+        self._set_running(False)
+
+    def _prepare_popup(self):
+        """弹出热键即将触发：预热面板"""
+        self._popup.prepare()
 
-    def _on_hotkey(self):
-        """热键触发"""
-        # 使用QTimer延迟显示，避免和热键冲突
-        QTimer.singleShot(50, self._popup.show_at_cursor)
+    def _on_hotkey(self, menu_key: str = ""):
+        """
+        热键触发
 
-    def _on_output(self, text: str, offset: int):
+        Args:
+            menu_key: 和弦已选中的主菜单，非空时直接显示其子菜单
+        """
+        # 面板已显示时合并重复触发
+        if self._popup.isVisible():
+            metrics.incr("hotkey.coalesced")
+            return
+        start = time.perf_counter()
+        session = self._recorder
+        if session is not None:
+            from src.core import recorder
+
+            if menu_key:
+                session.record(
+                    recorder.EVENT_HOTKEY, recorder.HOTKEY_CHORD_STALLED, recorder.menu_index(menu_key) + 1
+                )
+            else:
+                session.record(recorder.EVENT_HOTKEY, recorder.HOTKEY_POPUP)
+        # 预热过的面板只需移动并显示
+        self._popup.prepare()
+        self._popup.show_at_cursor(menu_key)
+        if session is not None:
+            shown_ms = (time.perf_counter() - start) * 1000
+            session.record(recorder.EVENT_POPUP_SHOWN, 1 if menu_key else 0, value=shown_ms)
+
+    def _on_popup_key(self, key: int):
+        """记录弹出面板中的按键（剪贴板历史页中输入的是搜索文字，不记录）"""
+        if self._recorder is None or self._popup.in_history:
+            return
+        from src.core import recorder
+
+        self._recorder.record(recorder.EVENT_POPUP_KEY, 1 if key & 0x01000000 else 0, key & 0xFFFF)
+
+    def _on_binding(self, binding: dict):
+        """直接模板绑定触发，跳过弹出面板"""
+        try:
+            text, offset = resolve_binding(binding)
+        except ValueError as e:
+            print(f"热键绑定无效: {e}")
+            return
+        if self._recorder is not None:
+            from src.core import recorder
+
+            self._recorder.record(recorder.EVENT_HOTKEY, recorder.HOTKEY_BINDING)
+        self._output.submit(text, offset, segment=binding.get("segment", ""))
+        if "menu" in binding:
+            self._record_usage(binding["menu"], binding.get("sub") or "")
+        else:
+            self._record_raw(text)
+
+    def _on_abbreviation(self, binding: dict, length: int):
+        """缩写输入完成，删除缩写后输出模板"""
+        try:
+            text, offset = resolve_binding(binding)
+        except ValueError as e:
+            print(f"缩写配置无效: {e}")
+            return
+        if self._recorder is not None:
+            from src.core import recorder
+
+            self._recorder.record(recorder.EVENT_HOTKEY, recorder.HOTKEY_ABBREVIATION, size=length)
+        self._output.submit(text, offset, erase=length)
+        if "menu" in binding:
+            self._record_usage(binding["menu"], binding.get("sub") or "")
+        else:
+            self._record_raw(text)
+
+    def _record_usage(self, menu_key: str, sub_key: str):
+        """记录模板使用，延迟写盘"""
+        if self._recorder is not None:
+            from src.core import recorder
+
+            self._recorder.record(recorder.EVENT_SELECT, recorder.menu_index(menu_key), recorder.sub_index(sub_key))
+        self._ensure_usage().record(menu_key, sub_key or None)
+        self._popup.invalidate_ranking()
+        if not self._usage_timer.isActive():
+            self._usage_timer.start()
+
+    def _on_output(self, text: str, offset: int, segment: str = ""):
         """输出文本"""
-        # 延迟输出，确保面板已隐藏
-        QTimer.singleShot(100, lambda: output_text(text, offset))
+        # 延迟输出，确保面板已隐藏（此时前台仍是本程序，目标程序未知，上限取默认输出配置）
+        self._output.submit(text, offset, delay_ms=self._profiles.default.focus_ms, segment=segment)
+
+    def _on_command(self, command: str, reply):
+        """处理本地命令"""
+        name, _, args = command.partition(" ")
+        name = name.lower()
+        if name not in self.QUERY_COMMANDS:
+            self._touch()
+        if name in ("insert", "insert-raw"):
+            try:
+                text, offset = parse_insert(args) if name == "insert" else parse_insert_raw(args)
+            except ValueError as e:
+                reply(f"error {e}")
+                return
+            self._output.submit(text, offset, callback=lambda t: self._reply_timing(reply, t))
+        elif name == "show":
+            self._show_main_window()
+            reply("ok")
+        elif name == "start":
+            if not self._hotkey.is_running:
+                self._start()
+            reply("ok")
+        elif name == "stop":
+            self._stop()
+            reply("ok")
+        elif name == "ping":
+            reply("ok")
+        elif name == "metrics":
+            import json
+            reply(f"ok {json.dumps(metrics.snapshot())}")
+        elif name == "timing":
+            import json
+            reply(f"ok {json.dumps(self._timing.describe() if self._timing is not None else {})}")
+        elif name == "footprint":
+            import json
+            from src.core.idle import footprint
+
+            budget = self._config.get("idle_budget", config.DEFAULT_IDLE_BUDGET)
+            report = footprint(
+                self._footprint,
+                budget.get("rss_mb", config.DEFAULT_IDLE_BUDGET["rss_mb"]),
+                budget.get("wakeups_per_s", config.DEFAULT_IDLE_BUDGET["wakeups_per_s"]),
+            )
+            self._footprint = report
+            report = {
+                **report,
+                "idle": self._idle is not None and self._idle.is_idle,
+                "hotkey_backend": type(self._hotkey.backend).__name__,
+                "sees_all_keys": self._hotkey.backend.sees_all_keys,
+                "history_entries": len(self._history) if self._history is not None else None,
+                "history_mb": round(self._history.nbytes / 1024 / 1024, 2) if self._history is not None else None,
+                "selection_provider": self._selection.name if self._selection is not None else None,
+            }
+            reply(f"ok {json.dumps(report)}")
+        elif name == "stalls":
+            import json
+            if self._watchdog is None:
+                reply("error stall watchdog disabled")
+            else:
+                reply(f"ok {json.dumps(self._watchdog.report())}")
+        elif name == "output-failed":
+            app = self._output.report_failure()
+            reply(f"ok {app}" if app else "error no recent output to an identified application")
+        elif name == "quit":
+            reply("ok")
+            QTimer.singleShot(0, self._app.quit)
+        else:
+            reply(f"error unknown command: {name}")
+
+    @staticmethod
+    def _reply_timing(reply, timing: OutputTiming):
+        """回复插入命令的耗时"""
+        if timing.error:
+            reply(f"error {timing.error}")
+        else:
+            reply(
+                f"ok queue={timing.queued_ms:.1f} output={timing.output_ms:.1f} "
+                f"total={timing.total_ms:.1f}"
+            )
+
+    def _report_startup(self):
+        """输出启动指标后退出"""
+        import json
+
+        if not self._hotkey.is_running:
+            self._start()
+        metrics.mark("event_loop_running")
+        print(json.dumps(metrics.snapshot()), flush=True)
+        self._app.quit()
 
     def run(self) -> int:
         """运行应用"""
-        self._main_window.show()
-        return self._app.exec()
+        for command in self._commands:
+            self._on_command(command, lambda text: None)
+        if self._startup_report:
+            QTimer.singleShot(0, self._report_startup)
+        try:
+            return self._app.exec()
+        finally:
+            self._instance.release()
@@ -0,0 +1,101 @@
+"""本地命令客户端
+
+向正在运行的 shokaX plugin 发送命令，可用于脚本插入和吞吐/延迟测试。
+
+示例:
+    python src/cli.py insert reminder warning
+    python src/cli.py insert-raw "[]{.rainbow}" 11
+    python src/cli.py --file commands.txt --repeat 100
+"""
+import argparse
+import statistics
+import sys
+import os
+import time
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QCoreApplication
+
+from src.core.ipc import send_commands
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(prog="shokax-cli", description="向运行中的实例发送命令")
+    parser.add_argument("command", nargs="*", help="要发送的命令（多个单词拼接为一条命令）")
+    parser.add_argument("-f", "--file", help="从文件读取命令（每行一条），'-' 表示标准输入")
+    parser.add_argument("-n", "--repeat", type=int, default=1, help="命令批次重复次数")
+    parser.add_argument("-t", "--timeout", type=int, default=10000, help="等待每条回复的超时（毫秒）")
+    parser.add_argument("-q", "--quiet", action="store_true", help="只输出统计信息")
+    return parser.parse_args(argv)
+
+
+def read_commands(args: argparse.Namespace) -> list[str]:
+    """收集要发送的命令"""
+    commands = []
+    if args.command:
+        commands.append(" ".join(args.command))
+    if args.file:
+        stream = sys.stdin if args.file == "-" else open(args.file, encoding="utf-8")
+        with stream:
+            commands.extend(line.strip() for line in stream if line.strip())
+    return commands * max(args.repeat, 1)
+
+
+def parse_timing(reply: str) -> float | None:
+    """从回复中提取 total 耗时"""
+    for field in reply.split()[1:]:
+        name, _, value = field.partition("=")
+        if name == "total":
+            try:
+                return float(value)
+            except ValueError:
+                return None
+    return None
+
+
+def print_summary(replies: list[str], elapsed: float):
+    """输出吞吐和延迟统计"""
+    totals = sorted(t for t in map(parse_timing, replies) if t is not None)
+    errors = sum(1 for reply in replies if not reply.startswith("ok"))
+    print(f"requests: {len(replies)}  errors: {errors}  elapsed: {elapsed:.2f}s  "
+          f"throughput: {len(replies) / elapsed if elapsed > 0 else 0:.1f}/s")
+    if totals:
+        p95 = totals[min(len(totals) - 1, int(len(totals) * 0.95))]
+        print(f"latency ms  min: {totals[0]:.1f}  median: {statistics.median(totals):.1f}  "
+              f"p95: {p95:.1f}  max: {totals[-1]:.1f}")
+
+
+def main() -> int:
+    args = parse_args(sys.argv[1:])
+    commands = read_commands(args)
+    if not commands:
+        print("没有要发送的命令", file=sys.stderr)
+        return 2
+
+    app = QCoreApplication(sys.argv[:1])  # noqa: F841  QLocalSocket 需要应用实例
+
+    start = time.perf_counter()
+    replies = send_commands(commands, timeout_ms=args.timeout)
+    elapsed = time.perf_counter() - start
+
+    if replies is None:
+        print("无法连接到运行中的实例", file=sys.stderr)
+        return 1
+
+    if not args.quiet:
+        for command, reply in zip(commands, replies):
+            print(f"{command}\t{reply}")
+    if len(commands) > 1 or args.quiet:
+        print_summary(replies, elapsed)
+
+    if len(replies) < len(commands):
+        print(f"等待回复超时（{len(replies)}/{len(commands)}）", file=sys.stderr)
+        return 1
+    return 0 if all(reply.startswith("ok") for reply in replies) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
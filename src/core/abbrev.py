@@ -0,0 +1,148 @@
+"""缩写展开
+
+在任意位置输入缩写（如 ,,warn）即展开为对应模板。键盘钩子把每个输入字符交给
+AbbrevMatcher，自动机每个字符前进一步，与缩写数量无关。本模块不依赖 Qt 和 pynput，
+可在钩子线程或钩子子进程中使用。
+"""
+from collections import deque
+
+from src.core.config import DEFAULT_ABBREV_PREFIX
+from src.core.menu_config import MENU_ITEMS, SUB_MENU_ITEMS, template_texts
+
+DEFAULT_PREFIX = DEFAULT_ABBREV_PREFIX
+
+
+def default_abbreviations(prefix: str = DEFAULT_PREFIX) -> dict[str, dict]:
+    """
+    由模板注册表生成默认缩写
+
+    缩写为 前缀 + 菜单缩写 + 子菜单缩写，如 ,,warn（提醒 → warning）、,,finfo（折叠 → info）。
+
+    Returns:
+        {缩写: 绑定配置}，绑定配置可交给 resolve_binding
+    """
+    abbreviations: dict[str, dict] = {}
+    for item in MENU_ITEMS:
+        if not item.has_submenu:
+            abbreviations[prefix + item.abbrev] = {"menu": item.key}
+            continue
+        for sub_item in SUB_MENU_ITEMS:
+            abbreviations[prefix + item.abbrev + sub_item.abbrev] = {"menu": item.key, "sub": sub_item.key}
+    return abbreviations
+
+
+def template_conflicts(abbreviations: list[str], prefix: str = DEFAULT_PREFIX) -> list[str]:
+    """
+    找出输入模板语法时会误触发的缩写
+
+    模板中出现缩写前缀时（如卡片模板 ;;;[id] 与前缀 ;;），在文档中手写该语法，
+    前缀之后接的内容就可能凑成缩写；缩写是某个模板的开头或出现在模板中同理。
+
+    Returns:
+        冲突的缩写，前缀本身冲突时所有以它开头的缩写都算在内
+    """
+    texts = template_texts()
+    prefix_clash = bool(prefix) and any(prefix in text for text in texts)
+    return [
+        abbrev for abbrev in abbreviations
+        if (prefix_clash and abbrev.startswith(prefix)) or any(abbrev in text for text in texts)
+    ]
+
+
+class AbbrevMatcher:
+    """
+    Aho-Corasick 多模式匹配自动机
+
+    状态转移在首次经过时沿失败链计算并缓存到转移表中，之后每个字符只需一次字典查找。
+    某个缩写输入完成时立即命中，命中后从头开始匹配。
+    """
+
+    def __init__(self, patterns: list[str]):
+        """
+        Args:
+            patterns: 缩写列表，命中时返回在列表中的序号
+        """
+        # 字典树：_delta[状态] = {字符: 下一状态}，之后也用作转移缓存
+        delta: list[dict[str, int]] = [{}]
+        output: list[int] = [-1]
+        for index, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                nxt = delta[state].get(char)
+                if nxt is None:
+                    nxt = len(delta)
+                    delta[state][char] = nxt
+                    delta.append({})
+                    output.append(-1)
+                state = nxt
+            if pattern:
+                output[state] = index
+
+        # 按层计算失败链，并让每个状态继承其失败状态上的命中（较短的缩写是后缀时）
+        fail = [0] * len(delta)
+        queue = deque(delta[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in delta[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and char not in delta[f]:
+                    f = fail[f]
+                target = delta[f].get(char, 0)
+                fail[nxt] = target if target != nxt else 0
+                if output[nxt] < 0:
+                    output[nxt] = output[fail[nxt]]
+
+        self._delta = delta
+        self._fail = fail
+        self._output = output
+        self._state = 0
+        # 之前的状态，用于退格；只需保留最长缩写的长度
+        self._history: deque[int] = deque(maxlen=max((len(p) for p in patterns), default=0))
+
+    def __len__(self) -> int:
+        """状态数"""
+        return len(self._delta)
+
+    def reset(self):
+        """清空已输入的内容（光标移动、快捷键等）"""
+        self._state = 0
+        self._history.clear()
+
+    def back(self):
+        """退格"""
+        self._state = self._history.pop() if self._history else 0
+
+    def feed(self, char: str) -> int | None:
+        """
+        输入一个字符
+
+        Returns:
+            命中的缩写序号，未命中返回 None
+        """
+        state = self._state
+        nxt = self._delta[state].get(char)
+        if nxt is None:
+            nxt = self._resolve(state, char)
+        match = self._output[nxt]
+        if match >= 0:
+            self.reset()
+            return match
+        self._history.append(state)
+        self._state = nxt
+        return None
+
+    def _resolve(self, state: int, char: str) -> int:
+        """沿失败链计算转移并缓存"""
+        delta = self._delta
+        f = state
+        while True:
+            f = self._fail[f]
+            nxt = delta[f].get(char)
+            if nxt is not None:
+                break
+            if f == 0:
+                nxt = 0
+                break
+        delta[state][char] = nxt
+        return nxt
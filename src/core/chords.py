@@ -0,0 +1,51 @@
+"""和弦快捷输入
+
+熟练用户按下弹出热键后紧接着输入菜单序号（如 Ctrl+空格、2、3 即"提醒 → warning"），
+直接得到输出，不必等待弹出面板。本模块只做序号解析，不依赖 Qt，可在热键线程中调用。
+"""
+from src.core.menu_config import MENU_ITEMS, SUB_MENU_ITEMS
+
+
+class ChordResolver:
+    """
+    和弦序号解析
+
+    第一个数字选择主菜单项，带子菜单的项再用第二个数字选择子菜单项，
+    序号与弹出面板中显示的一致（从 1 开始）。
+    """
+
+    def __init__(self):
+        self._menu_key = ""
+
+    @property
+    def menu_key(self) -> str:
+        """已选中、正在等待子菜单序号的主菜单项（未选中为空串）"""
+        return self._menu_key
+
+    def reset(self):
+        """开始新的和弦"""
+        self._menu_key = ""
+
+    def feed(self, digit: int) -> dict | str | None:
+        """
+        输入一个序号
+
+        Returns:
+            完成时返回绑定配置 {"menu": ..., "sub": ...}（可交给 resolve_binding）；
+            还需要子菜单序号时返回主菜单 key；序号无效返回 None
+        """
+        index = digit - 1
+        if not self._menu_key:
+            if not 0 <= index < len(MENU_ITEMS):
+                return None
+            item = MENU_ITEMS[index]
+            if not item.has_submenu:
+                return {"menu": item.key}
+            self._menu_key = item.key
+            return item.key
+
+        if not 0 <= index < len(SUB_MENU_ITEMS):
+            return None
+        binding = {"menu": self._menu_key, "sub": SUB_MENU_ITEMS[index].key}
+        self._menu_key = ""
+        return binding
@@ -0,0 +1,154 @@
+"""系统剪贴板访问
+
+Windows 上直接调用剪贴板 API：读取时保留 UTF-16 原始字节，写入时把多段内容依次拷贝到
+同一块全局内存中，几十 MB 的选中文字不需要解码、拼接再编码。
+其他平台使用 pyperclip，原始表示即 str。
+"""
+import ctypes
+import sys
+import time
+from contextlib import contextmanager
+
+import pyperclip
+
+CF_UNICODETEXT = 13
+GMEM_MOVEABLE = 0x0002
+# 剪贴板被其他程序占用时的重试
+OPEN_RETRIES = 20
+OPEN_RETRY_DELAY = 0.01
+
+_win = None
+
+
+def _win32():
+    """加载并声明 Windows 剪贴板 API，非 Windows 返回 None"""
+    global _win
+    if _win is not None or sys.platform != "win32":
+        return _win
+    from ctypes import wintypes
+
+    user32 = ctypes.windll.user32
+    kernel32 = ctypes.windll.kernel32
+    user32.OpenClipboard.argtypes = [wintypes.HWND]
+    user32.OpenClipboard.restype = wintypes.BOOL
+    user32.CloseClipboard.restype = wintypes.BOOL
+    user32.EmptyClipboard.restype = wintypes.BOOL
+    user32.GetClipboardData.argtypes = [wintypes.UINT]
+    user32.GetClipboardData.restype = wintypes.HANDLE
+    user32.SetClipboardData.argtypes = [wintypes.UINT, wintypes.HANDLE]
+    user32.SetClipboardData.restype = wintypes.HANDLE
+    user32.GetClipboardSequenceNumber.restype = wintypes.DWORD
+    kernel32.GlobalAlloc.argtypes = [wintypes.UINT, ctypes.c_size_t]
+    kernel32.GlobalAlloc.restype = wintypes.HGLOBAL
+    kernel32.GlobalLock.argtypes = [wintypes.HGLOBAL]
+    kernel32.GlobalLock.restype = wintypes.LPVOID
+    kernel32.GlobalUnlock.argtypes = [wintypes.HGLOBAL]
+    kernel32.GlobalSize.argtypes = [wintypes.HGLOBAL]
+    kernel32.GlobalSize.restype = ctypes.c_size_t
+    kernel32.GlobalFree.argtypes = [wintypes.HGLOBAL]
+    kernel32.GlobalFree.restype = wintypes.HGLOBAL
+    _win = (user32, kernel32)
+    return _win
+
+
+@contextmanager
+def _opened(user32):
+    """打开剪贴板，被占用时短暂重试"""
+    for _ in range(OPEN_RETRIES):
+        if user32.OpenClipboard(None):
+            break
+        time.sleep(OPEN_RETRY_DELAY)
+    else:
+        raise OSError("剪贴板被其他程序占用")
+    try:
+        yield
+    finally:
+        user32.CloseClipboard()
+
+
+def sequence_number() -> int | None:
+    """剪贴板序列号（内容每次变化都会递增），平台不支持时返回 None"""
+    win = _win32()
+    if win is None:
+        return None
+    return win[0].GetClipboardSequenceNumber()
+
+
+def get_raw() -> bytes | str:
+    """
+    读取剪贴板文本的原始表示
+
+    Returns:
+        Windows 上为 UTF-16LE 字节（不含结尾的 NUL），其他平台为 str
+    """
+    win = _win32()
+    if win is None:
+        return pyperclip.paste()
+
+    user32, kernel32 = win
+    with _opened(user32):
+        handle = user32.GetClipboardData(CF_UNICODETEXT)
+        if not handle:
+            return b""
+        size = kernel32.GlobalSize(handle)
+        ptr = kernel32.GlobalLock(handle)
+        if not ptr:
+            return b""
+        try:
+            data = ctypes.string_at(ptr, size)
+        finally:
+            kernel32.GlobalUnlock(handle)
+
+    # 截断到第一个按 2 字节对齐的 NUL
+    end = data.find(b"\x00\x00")
+    while end != -1 and end % 2:
+        end = data.find(b"\x00\x00", end + 1)
+    return data if end == -1 else data[:end]
+
+
+def to_text(raw: bytes | str) -> str:
+    """把 get_raw() 返回的原始表示解码为 str"""
+    return raw.decode("utf-16-le", errors="replace") if isinstance(raw, bytes) else raw
+
+
+def set_parts(parts: list[bytes | str]):
+    """
+    把多段文本依次写入剪贴板
+
+    Args:
+        parts: str，或 get_raw() 返回的原始表示
+    """
+    win = _win32()
+    if win is None:
+        pyperclip.copy("".join(parts))
+        return
+
+    user32, kernel32 = win
+    encoded = [part if isinstance(part, bytes) else part.encode("utf-16-le") for part in parts]
+    total = sum(len(part) for part in encoded) + 2
+    handle = kernel32.GlobalAlloc(GMEM_MOVEABLE, total)
+    if not handle:
+        raise MemoryError("GlobalAlloc 失败")
+    ptr = kernel32.GlobalLock(handle)
+    if not ptr:
+        kernel32.GlobalFree(handle)
+        raise MemoryError("GlobalLock 失败")
+    try:
+        offset = 0
+        for part in encoded:
+            ctypes.memmove(ptr + offset, part, len(part))
+            offset += len(part)
+        ctypes.memset(ptr + offset, 0, 2)
+    finally:
+        kernel32.GlobalUnlock(handle)
+
+    try:
+        with _opened(user32):
+            user32.EmptyClipboard()
+            if not user32.SetClipboardData(CF_UNICODETEXT, handle):
+                raise OSError("SetClipboardData 失败")
+    except OSError:
+        # 所有权没有交给系统，需要自己释放
+        kernel32.GlobalFree(handle)
+        raise
+
@@ -0,0 +1,67 @@
+"""剪贴板完整快照
+
+输出模板要借用剪贴板，之前只保存和恢复文本，图片、HTML、文件列表会丢失。
+这里通过 QClipboard/QMimeData 保存所有格式：QByteArray 与 QImage 都是隐式共享的，
+保存和恢复只增加引用计数，不复制数据（从系统剪贴板取出数据本身的那一次读取无法避免）。
+必须在 GUI 线程中使用。
+"""
+import time
+
+from PySide6.QtCore import QByteArray, QMimeData
+from PySide6.QtGui import QGuiApplication, QImage
+
+# 图片另外以 QImage 保存；这些格式是 Qt 由图片临时编码出来的，读取它们会把整张图编码一遍
+_SYNTHESIZED_IMAGE_FORMATS = {"application/x-qt-image"}
+
+
+class ClipboardSnapshot:
+    """剪贴板所有格式的快照"""
+
+    def __init__(self, formats: dict[str, QByteArray], image: QImage | None = None):
+        self._formats = formats
+        self._image = image
+        self.capture_ms = 0.0  # 保存耗时，供基准与统计使用
+
+    @classmethod
+    def capture(cls) -> "ClipboardSnapshot":
+        """保存当前剪贴板"""
+        start = time.perf_counter()
+        formats: dict[str, QByteArray] = {}
+        image = None
+        mime = QGuiApplication.clipboard().mimeData()
+        if mime is not None:
+            if mime.hasImage():
+                data = mime.imageData()
+                image = data.toImage() if hasattr(data, "toImage") else data  # 可能是 QPixmap
+            for fmt in mime.formats():
+                if image is not None and fmt in _SYNTHESIZED_IMAGE_FORMATS:
+                    continue
+                formats[fmt] = mime.data(fmt)
+        snapshot = cls(formats, image if isinstance(image, QImage) and not image.isNull() else None)
+        snapshot.capture_ms = (time.perf_counter() - start) * 1000
+        return snapshot
+
+    @property
+    def is_empty(self) -> bool:
+        return not self._formats and self._image is None
+
+    @property
+    def nbytes(self) -> int:
+        """快照引用的数据量（字节）"""
+        size = sum(data.size() for data in self._formats.values())
+        if self._image is not None:
+            size += self._image.sizeInBytes()
+        return size
+
+    def restore(self):
+        """把快照写回剪贴板（剪贴板接管新的 QMimeData，数据仍是共享的）"""
+        clipboard = QGuiApplication.clipboard()
+        if self.is_empty:
+            clipboard.clear()
+            return
+        mime = QMimeData()
+        for fmt, data in self._formats.items():
+            mime.setData(fmt, data)
+        if self._image is not None:
+            mime.setImageData(self._image)
+        clipboard.setMimeData(mime)
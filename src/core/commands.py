@@ -0,0 +1,101 @@
+"""本地命令与模板绑定解析"""
+from src.core.menu_config import MENU_ITEMS, SUB_MENU_ITEMS, get_output
+
+_MENU_ITEMS = {item.key: item for item in MENU_ITEMS}
+_SUB_KEYS = frozenset(item.key for item in SUB_MENU_ITEMS)
+
+# insert-raw 文本中支持的转义
+_ESCAPES = {"n": "\n", "r": "\r", "t": "\t", "s": " ", "\\": "\\"}
+
+
+def unescape(text: str) -> str:
+    """还原命令行中的转义字符（\\n \\r \\t \\s \\\\）"""
+    if "\\" not in text:
+        return text
+    result = []
+    chars = iter(text)
+    for ch in chars:
+        if ch == "\\":
+            nxt = next(chars, "")
+            result.append(_ESCAPES.get(nxt, "\\" + nxt))
+        else:
+            result.append(ch)
+    return "".join(result)
+
+
+def resolve_template(menu_key: str, sub_key: str | None = None) -> tuple[str, int]:
+    """
+    解析菜单模板，子菜单 key 必须属于该菜单项的子菜单
+
+    Returns:
+        (输出文本, 光标左移偏移量)
+
+    Raises:
+        ValueError: 模板不存在
+    """
+    item = _MENU_ITEMS.get(menu_key)
+    text, offset = "", 0
+    if item is not None and (not sub_key or (item.has_submenu and sub_key in _SUB_KEYS)):
+        text, offset = get_output(menu_key, sub_key)
+    if not text:
+        raise ValueError(f"unknown template: {menu_key} {sub_key or ''}".rstrip())
+    return text, offset
+
+
+def parse_insert(args: str) -> tuple[str, int]:
+    """
+    解析 insert 命令: insert <menu_key> [sub_key]
+
+    Returns:
+        (输出文本, 光标左移偏移量)
+
+    Raises:
+        ValueError: 参数错误或模板不存在
+    """
+    parts = args.split()
+    if not 1 <= len(parts) <= 2:
+        raise ValueError("usage: insert <menu> [sub]")
+    return resolve_template(*parts)
+
+
+def parse_insert_raw(args: str) -> tuple[str, int]:
+    """
+    解析 insert-raw 命令: insert-raw <text> <offset>
+
+    文本可以包含空格，最后一个参数为光标偏移量。
+
+    Raises:
+        ValueError: 参数错误
+    """
+    parts = args.rsplit(maxsplit=1)
+    if len(parts) != 2:
+        raise ValueError("usage: insert-raw <text> <offset>")
+    try:
+        offset = int(parts[1])
+    except ValueError:
+        raise ValueError(f"invalid offset: {parts[1]}") from None
+    text = unescape(parts[0])
+    if offset < 0 or offset > len(text):
+        raise ValueError(f"offset out of range: {offset}")
+    return text, offset
+
+
+def resolve_binding(binding: dict) -> tuple[str, int]:
+    """
+    解析热键绑定对应的输出
+
+    绑定可以引用菜单模板 {"menu": "fold", "sub": "info"}，
+    也可以直接给出文本 {"text": "...", "offset": 0}。
+
+    Raises:
+        ValueError: 绑定无效
+    """
+    if "menu" in binding:
+        return resolve_template(binding["menu"], binding.get("sub"))
+    if "text" in binding:
+        text = binding["text"]
+        offset = int(binding.get("offset", 0))
+        if offset < 0 or offset > len(text):
+            raise ValueError(f"offset out of range: {offset}")
+        return text, offset
+    raise ValueError("binding needs 'menu' or 'text'")
@@ -6,6 +6,87 @@ CONFIG_PATH = Path.home() / ".shoka-plugin" / "config.json"
 
 DEFAULT_HOTKEY = {"modifiers": ["ctrl"], "key": "space"}
 
+# 直接模板绑定示例:
+# {"modifiers": ["ctrl", "alt"], "key": "1", "menu": "fold", "sub": "info"}
+# {"modifiers": ["ctrl", "alt"], "key": "r", "text": "[]{.rainbow}", "offset": 11}
+DEFAULT_BINDINGS: list[dict] = []
+
+# 热键后端: auto（系统注册式热键，不可用时回退 pynput）/ pynput / process（pynput 钩子放到子进程）
+DEFAULT_HOTKEY_BACKEND = "auto"
+
+# 同一热键在该窗口（毫秒）内的多次触发合并为一次，0 表示不合并
+DEFAULT_HOTKEY_COALESCE_MS = 150
+
+# 弹出热键后等待和弦序号（如 2、3 直接输出"提醒 → warning"）的时间（毫秒），0 表示不启用。
+# 启用后每次弹出都要先等这段时间，并在等待期间全局抓取数字键，默认不启用
+DEFAULT_CHORD_DELAY_MS = 0
+
+# 缩写展开（需要 pynput / process 热键后端）。缩写由模板注册表按前缀生成，
+# "abbreviations" 中可以追加或覆盖，值为 null 表示禁用该缩写:
+# {",,todo": {"text": "- [ ] ", "offset": 0}, ",,rb": null}
+DEFAULT_ABBREV_ENABLED = False
+# 前缀不能出现在任何模板中（卡片模板以 ;;; 开头），否则手写模板语法时会误触发
+DEFAULT_ABBREV_PREFIX = ",,"
+
+# 弹出面板排序: off（固定顺序）/ reorder（按使用热度排序）/ recent（主菜单末尾追加最常用的模板）
+DEFAULT_POPUP_RANKING = "off"
+DEFAULT_POPUP_RECENT_COUNT = 4
+# 使用热度的半衰期（天）
+DEFAULT_USAGE_HALF_LIFE_DAYS = 7.0
+
+# 按前台程序进程名覆盖输出方式（在内置配置之上合并，null 表示禁用内置配置，"default" 覆盖默认值）:
+# {"mintty.exe": {"paste_keys": ["shift", "insert"], "newline": "lf"}, "mstsc.exe": {"settle_ms": 300}}
+DEFAULT_OUTPUT_PROFILES: dict = {}
+
+# 按目标程序测得的延迟自动缩短输出配置中的等待时间，失败时退避
+DEFAULT_ADAPTIVE_TIMING = True
+
+# 记录插入过程（事件类型、菜单序号、选中文字长度与耗时，不含文本）到 session.bin，供离线回放
+DEFAULT_RECORD_SESSION = False
+
+# 界面线程卡顿检测：超过阈值（毫秒）未响应时记录时长与调用栈，可在托盘菜单"卡顿统计"中查看
+DEFAULT_STALL_WATCHDOG = False
+DEFAULT_STALL_THRESHOLD_MS = 200
+
+# 多久没有操作后进入空闲状态（秒，0 表示不启用）：释放隐藏的主窗口与弹出面板的菜单页并清理缓存。
+# footprint 命令按预算（常驻内存 MB、每秒唤醒次数）报告当前占用
+DEFAULT_IDLE_AFTER_S = 300
+DEFAULT_IDLE_BUDGET = {"rss_mb": 80, "wakeups_per_s": 2.0}
+
+# 剪贴板历史（弹出面板按 0 打开，输入文字搜索）与容量上限（MB，按内容总大小而不是条数计算）。
+# 会保存复制过的所有文本，默认不启用
+DEFAULT_CLIPBOARD_HISTORY = False
+DEFAULT_CLIPBOARD_HISTORY_MB = 32
+
+# 读取选中文字的方式: auto（Windows UI Automation / Linux AT-SPI，读不到时模拟 Ctrl+C）/ uia / atspi / off（只用 Ctrl+C）
+DEFAULT_SELECTION_PROVIDER = "auto"
+
+
+def default_settings() -> dict:
+    """除快捷键外所有配置项的默认值（每次返回新的副本）"""
+    return {
+        "bindings": list(DEFAULT_BINDINGS),
+        "hotkey_backend": DEFAULT_HOTKEY_BACKEND,
+        "hotkey_coalesce_ms": DEFAULT_HOTKEY_COALESCE_MS,
+        "chord_delay_ms": DEFAULT_CHORD_DELAY_MS,
+        "abbrev_enabled": DEFAULT_ABBREV_ENABLED,
+        "abbrev_prefix": DEFAULT_ABBREV_PREFIX,
+        "abbreviations": {},
+        "popup_ranking": DEFAULT_POPUP_RANKING,
+        "popup_recent_count": DEFAULT_POPUP_RECENT_COUNT,
+        "usage_half_life_days": DEFAULT_USAGE_HALF_LIFE_DAYS,
+        "output_profiles": dict(DEFAULT_OUTPUT_PROFILES),
+        "adaptive_timing": DEFAULT_ADAPTIVE_TIMING,
+        "record_session": DEFAULT_RECORD_SESSION,
+        "stall_watchdog": DEFAULT_STALL_WATCHDOG,
+        "stall_threshold_ms": DEFAULT_STALL_THRESHOLD_MS,
+        "idle_after_s": DEFAULT_IDLE_AFTER_S,
+        "idle_budget": dict(DEFAULT_IDLE_BUDGET),
+        "clipboard_history": DEFAULT_CLIPBOARD_HISTORY,
+        "clipboard_history_mb": DEFAULT_CLIPBOARD_HISTORY_MB,
+        "selection_provider": DEFAULT_SELECTION_PROVIDER,
+    }
+
 
 def load_config() -> dict:
     """加载配置"""
@@ -13,10 +94,12 @@ def load_config() -> dict:
         try:
             data = json.loads(CONFIG_PATH.read_text(encoding="utf-8"))
             if "hotkey" in data:
+                for key, value in default_settings().items():
+                    data.setdefault(key, value)
                 return data
         except (json.JSONDecodeError, KeyError):
             pass
-    return {"hotkey": DEFAULT_HOTKEY.copy()}
+    return {"hotkey": DEFAULT_HOTKEY.copy(), **default_settings()}
 
 
 def save_config(config: dict):
@@ -0,0 +1,245 @@
+"""剪贴板历史
+
+按内容哈希去重、按总字节数（而不是条数）限制容量的历史记录，最旧的条目先被淘汰。
+超过 INLINE_LIMIT 的大条目不留在内存中，而是写入 ~/.shoka-plugin/history.bin：
+这是一个与容量等大、通过 mmap 访问的环形文件，写满后从头覆盖，被覆盖的条目随之淘汰。
+历史只在本次运行中有效：close() 时清空并删除该文件，上次异常退出留下的文件在创建时删除。
+
+搜索使用增量维护的三元组倒排索引（每个条目只索引前 MAX_KEY_CHARS 个字符，不区分大小写），
+添加和淘汰时同步更新，几千条历史中过滤也只需检查候选条目。本模块不依赖 Qt。
+"""
+import hashlib
+import mmap
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+from src.core.config import CONFIG_PATH, DEFAULT_CLIPBOARD_HISTORY_MB
+
+HISTORY_SPILL_PATH = CONFIG_PATH.parent / "history.bin"
+
+DEFAULT_MAX_BYTES = DEFAULT_CLIPBOARD_HISTORY_MB * 1024 * 1024
+# 超过该大小（UTF-8 字节）的条目写入 mmap 文件
+INLINE_LIMIT = 64 * 1024
+# 建索引与搜索的前缀长度（字符）
+MAX_KEY_CHARS = 1024
+PREVIEW_CHARS = 48
+# 候选条目不超过该数量时按新旧排序后检查，否则按新旧顺序遍历全部条目
+SORT_CANDIDATES = 256
+
+_EMPTY: frozenset[int] = frozenset()
+
+
+@dataclass(eq=False)
+class HistoryEntry:
+    """一条剪贴板历史"""
+    id: int
+    digest: bytes
+    size: int  # UTF-8 字节数
+    preview: str  # 第一行非空内容（截断）
+    key: str  # 小写化的前缀，用于搜索
+    timestamp: float
+    seq: int  # 最近一次添加的序号，越大越新
+    text: str | None = None  # 内联内容，写入 mmap 时为 None
+    offset: int = -1  # 在 mmap 文件中的位置
+
+
+def _trigrams(key: str) -> set[str]:
+    return {key[i:i + 3] for i in range(len(key) - 2)}
+
+
+def _preview(text: str) -> str:
+    for line in text.splitlines():
+        line = " ".join(line.split())
+        if line:
+            return line if len(line) <= PREVIEW_CHARS else line[:PREVIEW_CHARS - 1] + "…"
+    return "(空白)"
+
+
+class ClipboardHistory:
+    """剪贴板历史环"""
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        spill_path: Path = HISTORY_SPILL_PATH,
+        inline_limit: int = INLINE_LIMIT,
+    ):
+        self._max_bytes = max(max_bytes, 1)
+        self._spill_path = spill_path
+        self._inline_limit = inline_limit
+        self._entries: OrderedDict[bytes, HistoryEntry] = OrderedDict()  # 最新的在末尾
+        self._by_id: dict[int, HistoryEntry] = {}
+        self._postings: dict[str, set[int]] = {}
+        self._bytes = 0
+        self._next_id = 0
+        self._seq = 0
+        # mmap 环形文件，第一次写入大条目时创建
+        self._file = None
+        self._map: mmap.mmap | None = None
+        self._head = 0
+        self._spilled: OrderedDict[int, HistoryEntry] = OrderedDict()  # 按写入顺序
+        self._remove_spill_file()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        """历史内容的总字节数（含 mmap 中的条目）"""
+        return self._bytes
+
+    def add(self, text: str) -> HistoryEntry | None:
+        """
+        添加一条历史（内容相同的条目移到最前）
+
+        Returns:
+            对应的条目，空白内容或超过总容量时返回 None
+        """
+        if not text or text.isspace():
+            return None
+        data = text.encode("utf-8", errors="surrogatepass")
+        if len(data) > self._max_bytes:
+            return None
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        self._seq += 1
+        entry = self._entries.get(digest)
+        if entry is not None:
+            entry.timestamp = time.time()
+            entry.seq = self._seq
+            self._entries.move_to_end(digest)
+            return entry
+
+        self._next_id += 1
+        key = text[:MAX_KEY_CHARS].casefold()
+        entry = HistoryEntry(self._next_id, digest, len(data), _preview(text), key, time.time(), self._seq)
+        if len(data) > self._inline_limit:
+            try:
+                self._spill(entry, data)
+            except (OSError, ValueError) as e:
+                print(f"剪贴板历史写入失败: {e}")
+                return None
+        else:
+            entry.text = text
+
+        self._entries[digest] = entry
+        self._by_id[entry.id] = entry
+        self._bytes += entry.size
+        for gram in _trigrams(key):
+            self._postings.setdefault(gram, set()).add(entry.id)
+        while self._bytes > self._max_bytes:
+            self.remove(next(iter(self._entries.values())))
+        return entry
+
+    def remove(self, entry: HistoryEntry):
+        """删除一条历史"""
+        if self._entries.pop(entry.digest, None) is None:
+            return
+        del self._by_id[entry.id]
+        self._spilled.pop(entry.id, None)
+        self._bytes -= entry.size
+        for gram in _trigrams(entry.key):
+            ids = self._postings.get(gram)
+            if ids is not None:
+                ids.discard(entry.id)
+                if not ids:
+                    del self._postings[gram]
+
+    def clear(self):
+        """清空历史"""
+        self._entries.clear()
+        self._by_id.clear()
+        self._postings.clear()
+        self._spilled.clear()
+        self._bytes = 0
+        self._head = 0
+
+    def close(self):
+        """清空历史，关闭并删除 mmap 文件（复制的内容不留在磁盘上）"""
+        self.clear()
+        if self._map is not None:
+            self._map.close()
+            try:
+                self._file.truncate(0)
+            except OSError:
+                pass
+            self._file.close()
+            self._map = self._file = None
+        self._remove_spill_file()
+
+    def _remove_spill_file(self):
+        try:
+            self._spill_path.unlink(missing_ok=True)
+        except OSError as e:
+            print(f"删除剪贴板历史文件失败: {e}")
+
+    def text(self, entry: HistoryEntry) -> str:
+        """条目的完整内容"""
+        if entry.text is not None:
+            return entry.text
+        return bytes(self._map[entry.offset:entry.offset + entry.size]).decode("utf-8", errors="surrogatepass")
+
+    def entries(self, limit: int | None = None) -> list[HistoryEntry]:
+        """最新的在前"""
+        result = []
+        for entry in reversed(self._entries.values()):
+            if limit is not None and len(result) >= limit:
+                break
+            result.append(entry)
+        return result
+
+    def search(self, query: str, limit: int = 9) -> list[HistoryEntry]:
+        """
+        按子串搜索（不区分大小写，只匹配每条的前 MAX_KEY_CHARS 个字符）
+
+        Returns:
+            最新的在前，最多 limit 条
+        """
+        query = query.casefold()
+        if not query:
+            return self.entries(limit)
+        if len(query) < 3:
+            candidates = reversed(self._entries.values())
+        else:
+            postings = sorted((self._postings.get(gram, _EMPTY) for gram in _trigrams(query)), key=len)
+            ids = postings[0]
+            if not ids:
+                return []
+            if len(ids) <= SORT_CANDIDATES:
+                candidates = sorted((self._by_id[i] for i in ids), key=lambda e: e.seq, reverse=True)
+            else:
+                # 常见的关键词：从最新的条目开始检查，找满 limit 条即停止
+                candidates = (e for e in reversed(self._entries.values()) if e.id in ids)
+        result = []
+        for entry in candidates:
+            if query in entry.key:
+                result.append(entry)
+                if len(result) >= limit:
+                    break
+        return result
+
+    # ---------- mmap 环形文件 ----------
+
+    def _spill(self, entry: HistoryEntry, data: bytes):
+        """把大条目写入环形文件，覆盖区域内的旧条目被淘汰"""
+        if self._map is None:
+            self._spill_path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self._spill_path, "w+b")
+            try:
+                self._file.truncate(self._max_bytes)
+                self._map = mmap.mmap(self._file.fileno(), self._max_bytes)
+            except (OSError, ValueError):
+                self._file.close()
+                self._file = None
+                raise
+        size = len(data)
+        if self._head + size > self._max_bytes:
+            self._head = 0
+        start, end = self._head, self._head + size
+        for old in [e for e in self._spilled.values() if e.offset < end and start < e.offset + e.size]:
+            self.remove(old)
+        self._map[start:end] = data
+        entry.offset = start
+        self._head = end
+        self._spilled[entry.id] = entry
@@ -0,0 +1,195 @@
+"""独立进程键盘钩子
+
+全局键盘钩子会在用户的每一次按键时唤醒解释器。把钩子放到子进程中，
+GUI 进程只会在热键命中时收到一条消息，不再与 Qt 绘制争抢 GIL。
+本模块不导入 Qt，子进程保持精简。
+"""
+import multiprocessing as mp
+import threading
+import time
+from typing import Callable
+
+from src.core.keymatch import HotkeyFilter
+
+
+def worker_main(cmd_conn, event_conn):
+    """
+    子进程入口
+
+    cmd_conn 接收 ("compile", entries) / ("abbrev", abbreviations) / ("start",) / ("stop",)，
+    event_conn 发送命中的绑定序号。父进程退出时管道关闭，子进程随之退出。
+    """
+    from pynput import keyboard
+
+    hook = HotkeyFilter(event_conn.send)
+    listener = None
+    try:
+        while True:
+            message = cmd_conn.recv()
+            kind = message[0]
+            if kind == "compile":
+                hook.compile(message[1])
+            elif kind == "abbrev":
+                hook.set_abbreviations(message[1])
+            elif kind == "start":
+                if listener is None:
+                    listener = keyboard.Listener(
+                        on_press=hook.on_press,
+                        on_release=hook.on_release,
+                    )
+                    listener.start()
+            elif kind == "stop":
+                break
+    except (EOFError, OSError):
+        pass
+    finally:
+        if listener is not None:
+            listener.stop()
+
+
+class HookProcess:
+    """
+    钩子子进程及其监护
+
+    读取线程阻塞在事件管道上，子进程意外退出时自动重启；
+    短时间内重启次数过多则放弃，由调用方回退到进程内监听。
+    """
+
+    MAX_RESTARTS = 5  # RESTART_WINDOW 秒内允许的最大重启次数
+    RESTART_WINDOW = 60
+    RESTART_DELAY = 0.5
+
+    def __init__(self, on_trigger: Callable[[int], None], on_failed: Callable[[], None] | None = None):
+        """
+        Args:
+            on_trigger: 命中回调（在读取线程中调用），参数为绑定序号或 REPEAT_DROPPED
+            on_failed: 重启次数耗尽时的回调（在读取线程中调用）
+        """
+        self._on_trigger = on_trigger
+        self._on_failed = on_failed
+        self._entries: list = []
+        self._abbreviations: list[str] = []
+        self._process: mp.Process | None = None
+        self._cmd_conn = None
+        self._reader: threading.Thread | None = None
+        self._running = False
+        self._restarts: list[float] = []
+        self._lock = threading.Lock()
+
+    def start(self, entries: list):
+        """启动子进程"""
+        with self._lock:
+            self._entries = entries
+            if self._running:
+                return
+            self._running = True
+            self._restarts.clear()
+            self._spawn()
+
+    def compile(self, entries: list):
+        """更新绑定"""
+        with self._lock:
+            self._entries = entries
+            if self._running:
+                self._send(("compile", entries))
+
+    def set_abbreviations(self, abbreviations: list[str]):
+        """更新缩写"""
+        with self._lock:
+            self._abbreviations = abbreviations
+            if self._running:
+                self._send(("abbrev", abbreviations))
+
+    def stop(self):
+        """停止子进程"""
+        with self._lock:
+            self._running = False
+            self._send(("stop",))
+            if self._cmd_conn is not None:
+                self._cmd_conn.close()
+                self._cmd_conn = None
+            process = self._process
+            self._process = None
+        if process is not None:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+
+    @property
+    def is_alive(self) -> bool:
+        """子进程是否在运行"""
+        return self._process is not None and self._process.is_alive()
+
+    def _send(self, message):
+        if self._cmd_conn is None:
+            return
+        try:
+            self._cmd_conn.send(message)
+        except (EOFError, OSError):
+            pass
+
+    def _spawn(self):
+        """创建子进程和读取线程（调用方持有锁）"""
+        ctx = mp.get_context("spawn")
+        cmd_recv, cmd_send = ctx.Pipe(duplex=False)
+        event_recv, event_send = ctx.Pipe(duplex=False)
+        process = ctx.Process(
+            target=worker_main,
+            args=(cmd_recv, event_send),
+            name="shokax-hotkey-hook",
+            daemon=True,
+        )
+        process.start()
+        # 子进程持有的一端在父进程中关闭，子进程退出时读取端才能收到 EOF
+        cmd_recv.close()
+        event_send.close()
+
+        self._process = process
+        self._cmd_conn = cmd_send
+        self._send(("compile", self._entries))
+        if self._abbreviations:
+            self._send(("abbrev", self._abbreviations))
+        self._send(("start",))
+
+        self._reader = threading.Thread(
+            target=self._read_loop,
+            args=(event_recv, process),
+            name="shokax-hook-reader",
+            daemon=True,
+        )
+        self._reader.start()
+
+    def _read_loop(self, conn, process: mp.Process):
+        """读取子进程事件，子进程退出后负责重启"""
+        try:
+            while True:
+                self._on_trigger(conn.recv())
+        except (EOFError, OSError):
+            pass
+        finally:
+            conn.close()
+
+        with self._lock:
+            if not self._running or process is not self._process:
+                return
+            now = time.monotonic()
+            self._restarts = [t for t in self._restarts if now - t < self.RESTART_WINDOW]
+            if len(self._restarts) >= self.MAX_RESTARTS:
+                print("热键子进程多次异常退出，停止重启")
+                self._running = False
+                self._process = None
+                failed = True
+            else:
+                self._restarts.append(now)
+                failed = False
+
+        if failed:
+            if self._on_failed is not None:
+                self._on_failed()
+            return
+
+        print("热键子进程异常退出，正在重启")
+        time.sleep(self.RESTART_DELAY)
+        with self._lock:
+            if self._running and process is self._process:
+                self._spawn()
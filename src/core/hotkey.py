@@ -1,99 +1,287 @@
 """全局热键管理"""
-from pynput import keyboard
-from PySide6.QtCore import QObject, Signal
+import threading
+import time
 
+from PySide6.QtCore import QObject, Qt, Signal
 
-# 修饰键映射
-MODIFIER_MAP = {
-    "ctrl": (keyboard.Key.ctrl_l, keyboard.Key.ctrl_r),
-    "alt": (keyboard.Key.alt_l, keyboard.Key.alt_r),
-    "shift": (keyboard.Key.shift_l, keyboard.Key.shift_r),
-}
+from src.core import metrics
+from src.core.chords import ChordResolver
+from src.core.hotkey_backend import (
+    HotkeyBackend, BackendUnavailable, PynputBackend, REPEAT_DROPPED, PREPARE, CHORD_KEY_BASE,
+    ABBREV_BASE, create_backend,
+)
 
-# 特殊键映射
-KEY_MAP = {
-    "space": keyboard.Key.space,
-    "tab": keyboard.Key.tab,
-    "grave": "`",
-}
+# 弹出面板对应的动作
+POPUP_ACTION = "popup"
+# 两次预热通知的最小间隔（秒），Ctrl 等修饰键按得很频繁
+PREPARE_INTERVAL = 1.0
 
 
 class HotkeyManager(QObject):
-    """热键管理器"""
+    """
+    热键管理器
 
-    triggered = Signal()  # 热键触发信号
+    具体的按键监听由后端完成（见 hotkey_backend），默认优先使用系统注册式热键，
+    不可用时回退到 pynput 低级键盘钩子。
 
-    def __init__(self):
+    按住不放产生的重复按下由后端丢弃；同一绑定在合并窗口内的多次触发只分派一次。
+    丢弃与合并的次数记录在 metrics 计数器 hotkey.repeat_dropped / hotkey.coalesced 中。
+
+    后端支持时，弹出热键之后在和弦等待时间内输入的菜单序号（见 chords）直接在
+    热键线程中解析为模板输出，超时没有输入才弹出面板。
+
+    能看到完整按键流的后端在弹出热键的修饰键按齐时发出 prepare_requested，
+    和弦等待期间也会发出，供界面提前预热弹出面板。这类后端还支持缩写展开（见 abbrev）。
+    """
+
+    triggered = Signal()  # 热键触发信号（弹出面板）
+    prepare_requested = Signal()  # 弹出热键即将触发，预热弹出面板
+    chord_stalled = Signal(str)  # 和弦选中主菜单后超时，参数为主菜单 key（弹出面板并进入子菜单）
+    binding_triggered = Signal(dict)  # 直接模板绑定或和弦触发，参数为绑定配置
+    abbreviation_triggered = Signal(dict, int)  # 缩写输入完成，参数为绑定配置和缩写长度
+    _backend_failed = Signal()  # 后端运行中失效，排队到主线程处理
+
+    def __init__(self, backend: str = "auto", coalesce_ms: int = 150, chord_delay_ms: int = 0):
+        """
+        Args:
+            backend: 热键后端类型，见 create_backend
+            coalesce_ms: 触发合并窗口（毫秒），0 表示不合并
+            chord_delay_ms: 和弦等待时间（毫秒），0 表示不启用和弦
+        """
         super().__init__()
-        self._listener: keyboard.Listener | None = None
+        self._backend_failed.connect(self._on_backend_failed_queued, Qt.QueuedConnection)
+        self._backend: HotkeyBackend = create_backend(backend, self._dispatch, self._on_backend_failed)
         self._enabled = False
-        self._pressed_modifiers: set[str] = set()
+        self._coalesce = coalesce_ms / 1000
+        # 绑定序号 -> 上次分派的时间
+        self._last_fired: dict[int, float] = {}
+        self._last_prepare = 0.0
+
+        self._chord_delay = chord_delay_ms / 1000
+        self._chord = ChordResolver()
+        self._chord_timer: threading.Timer | None = None
+        self._chord_lock = threading.Lock()
 
         # 默认快捷键: Ctrl+空格
-        self._modifiers = {"ctrl"}
-        self._trigger_key = keyboard.Key.space
+        self._modifiers = ["ctrl"]
+        self._trigger_key = "space"
+        self._bindings: list[dict] = []
+
+        # 绑定序号 -> 动作（POPUP_ACTION 或绑定配置）
+        self._actions: list = []
+        self._entries: list[tuple[list[str], str, bool]] = []
+        # (缩写, 绑定配置)，序号即缩写的 sink 序号
+        self._abbreviations: list[tuple[str, dict]] = []
+        self._compile()
+
+    @property
+    def backend(self) -> HotkeyBackend:
+        """当前使用的后端"""
+        return self._backend
 
     def set_hotkey(self, modifiers: list[str], key: str):
         """设置快捷键"""
-        self._modifiers = set(modifiers)
-        self._trigger_key = KEY_MAP.get(key, key)
+        self._modifiers = list(modifiers)
+        self._trigger_key = key
+        self._compile()
+
+    def set_bindings(self, bindings: list[dict]):
+        """
+        设置直接模板绑定
+
+        每个绑定形如 {"modifiers": [...], "key": "1", "menu": "fold", "sub": "info"}
+        或 {"modifiers": [...], "key": "r", "text": "...", "offset": 0}。
+        没有修饰键的绑定会被忽略，避免拦截正常输入。
+        """
+        self._bindings = [b for b in bindings if b.get("modifiers") and b.get("key")]
+        self._compile()
+
+    def set_abbreviations(self, abbreviations: dict[str, dict]):
+        """
+        设置缩写展开
+
+        Args:
+            abbreviations: {缩写: 绑定配置}，空字典表示关闭。
+                           只有能看到完整按键流的后端（pynput / process）支持
+        """
+        self._abbreviations = list(abbreviations.items())
+        self._backend.set_abbreviations([abbrev for abbrev, _ in self._abbreviations])
+
+    def _compile(self):
+        """编译绑定列表交给后端"""
+        # 直接输出需要等修饰键松开，否则粘贴时会变成 Ctrl+Alt+V 之类的组合
+        self._actions = list(self._bindings)
+        self._entries = [(b["modifiers"], b["key"], True) for b in self._bindings]
+        # 弹出面板热键放在最后，冲突时优先
+        self._actions.append(POPUP_ACTION)
+        self._entries.append((self._modifiers, self._trigger_key, False))
+        self._last_fired.clear()
+
+        try:
+            self._backend.compile(self._entries)
+        except BackendUnavailable as e:
+            self._fallback(str(e))
 
     def start(self):
         """启动热键监听"""
-        if self._listener is not None:
+        if self._enabled:
             return
         self._enabled = True
-        self._listener = keyboard.Listener(
-            on_press=self._on_press,
-            on_release=self._on_release,
-        )
-        self._listener.start()
+        try:
+            self._backend.start(self._entries)
+        except BackendUnavailable as e:
+            self._fallback(str(e))
 
     def stop(self):
         """停止热键监听"""
         self._enabled = False
-        if self._listener is not None:
-            self._listener.stop()
-            self._listener = None
-        self._pressed_modifiers.clear()
-
-    def _on_press(self, key):
-        """按键按下事件"""
-        if not self._enabled:
+        with self._chord_lock:
+            self._end_chord()
+        self._backend.stop()
+
+    def _fallback(self, reason: str):
+        """当前后端不可用时回退到进程内 pynput 钩子"""
+        if isinstance(self._backend, PynputBackend):
             return
+        print(f"热键后端 {self._backend.name} 不可用（{reason}），回退到 pynput")
+        with self._chord_lock:
+            self._end_chord()
+        self._backend.stop()
+        self._backend = PynputBackend(self._dispatch)
+        self._backend.set_abbreviations([abbrev for abbrev, _ in self._abbreviations])
+        if self._enabled:
+            self._backend.start(self._entries)
+        else:
+            self._backend.compile(self._entries)
 
-        # 检查修饰键
-        for mod_name, mod_keys in MODIFIER_MAP.items():
-            if key in mod_keys:
-                self._pressed_modifiers.add(mod_name)
+    def _on_backend_failed(self):
+        """后端运行中失效（在后台线程中调用），回退交给主线程执行"""
+        self._backend_failed.emit()
+
+    def _on_backend_failed_queued(self):
+        """在主线程中回退，不与 start / stop / set_hotkey 等调用并发替换后端"""
+        self._fallback("运行中失效")
+
+    def set_coalesce_ms(self, coalesce_ms: int):
+        """设置触发合并窗口（毫秒），0 表示不合并"""
+        self._coalesce = max(0, coalesce_ms) / 1000
+
+    def set_chord_delay_ms(self, chord_delay_ms: int):
+        """设置和弦等待时间（毫秒），0 表示不启用和弦"""
+        self._chord_delay = max(0, chord_delay_ms) / 1000
+
+    @property
+    def chords_enabled(self) -> bool:
+        """当前后端下和弦是否可用"""
+        return self._chord_delay > 0 and self._backend.supports_chords
+
+    def _begin_chord(self):
+        """弹出热键命中后开始等待和弦序号（调用方持有 _chord_lock）"""
+        self._chord.reset()
+        self._backend.capture_chord(self._modifiers)
+        self._restart_chord_timer()
+
+    def _restart_chord_timer(self):
+        """重新开始和弦超时计时（调用方持有 _chord_lock）"""
+        if self._chord_timer is not None:
+            self._chord_timer.cancel()
+        self._chord_timer = threading.Timer(self._chord_delay, self._on_chord_timeout)
+        self._chord_timer.daemon = True
+        self._chord_timer.start()
+
+    def _end_chord(self) -> bool:
+        """结束和弦等待，返回之前是否在等待（调用方持有 _chord_lock）"""
+        if self._chord_timer is None:
+            return False
+        self._chord_timer.cancel()
+        self._chord_timer = None
+        self._backend.capture_chord(None)
+        return True
+
+    def _on_chord_timeout(self):
+        """和弦超时：用户犹豫时弹出面板（在计时器线程中调用）"""
+        with self._chord_lock:
+            if self._chord_timer is None or threading.current_thread() is not self._chord_timer:
+                return
+            self._end_chord()
+            menu_key = self._chord.menu_key
+        if menu_key:
+            self.chord_stalled.emit(menu_key)
+        else:
+            self.triggered.emit()
+
+    def _on_chord_key(self, digit: int):
+        """处理和弦序号（在后端线程中调用）"""
+        with self._chord_lock:
+            if self._chord_timer is None:
+                return
+            result = self._chord.feed(digit)
+            if isinstance(result, str):
+                self._restart_chord_timer()
                 return
+            self._end_chord()
+            menu_key = self._chord.menu_key
 
-        # 检查触发键
-        if self._pressed_modifiers == self._modifiers:
-            if self._match_key(key):
+        if result is None:
+            # 序号无效，按犹豫处理
+            if menu_key:
+                self.chord_stalled.emit(menu_key)
+            else:
                 self.triggered.emit()
+            return
+        metrics.incr("hotkey.chord")
+        self.binding_triggered.emit(result)
 
-    def _on_release(self, key):
-        """按键释放事件"""
-        for mod_name, mod_keys in MODIFIER_MAP.items():
-            if key in mod_keys:
-                self._pressed_modifiers.discard(mod_name)
-                return
+    def _request_prepare(self):
+        """通知预热弹出面板（限制频率）"""
+        now = time.monotonic()
+        if now - self._last_prepare < PREPARE_INTERVAL:
+            return
+        self._last_prepare = now
+        self.prepare_requested.emit()
 
-    def _match_key(self, key) -> bool:
-        """检查是否匹配触发键"""
-        if self._trigger_key == key:
-            return True
-        # 处理字符键
-        if hasattr(key, "char") and key.char == self._trigger_key:
-            return True
-        # 使用虚拟键码匹配（Ctrl+字母 时 char 为空，需要用 vk）
-        if hasattr(key, "vk") and isinstance(self._trigger_key, str) and len(self._trigger_key) == 1:
-            if key.vk == ord(self._trigger_key.upper()):
-                return True
-        return False
+    def _dispatch(self, index: int):
+        """分派命中的绑定（在后端线程中调用）"""
+        if index == REPEAT_DROPPED:
+            metrics.incr("hotkey.repeat_dropped")
+            return
+        if index == PREPARE:
+            if self._enabled:
+                self._request_prepare()
+            return
+        if index <= ABBREV_BASE:
+            n = ABBREV_BASE - index
+            if self._enabled and n < len(self._abbreviations):
+                abbrev, binding = self._abbreviations[n]
+                metrics.incr("hotkey.abbreviation")
+                self.abbreviation_triggered.emit(binding, len(abbrev))
+            return
+        if index <= CHORD_KEY_BASE:
+            self._on_chord_key(CHORD_KEY_BASE - index)
+            return
+        if not self._enabled or index >= len(self._actions):
+            return
+
+        now = time.monotonic()
+        last = self._last_fired.get(index)
+        if last is not None and now - last < self._coalesce:
+            metrics.incr("hotkey.coalesced")
+            return
+        self._last_fired[index] = now
+
+        action = self._actions[index]
+        if action is POPUP_ACTION:
+            if self.chords_enabled:
+                with self._chord_lock:
+                    self._begin_chord()
+                # 用户犹豫时面板要立即出现，利用等待时间预热
+                self._request_prepare()
+                return
+            self.triggered.emit()
+        else:
+            self.binding_triggered.emit(action)
 
     @property
     def is_running(self) -> bool:
         """是否正在监听"""
-        return self._listener is not None and self._enabled
+        return self._enabled
@@ -0,0 +1,237 @@
+"""热键后端
+
+HotkeyManager 通过后端接收热键。后端接收编译好的绑定列表
+[(修饰键名列表, 键名, 是否等修饰键松开后触发)]，命中时以绑定序号调用 sink。
+
+- native: 向系统注册热键（Windows RegisterHotKey / X11 XGrabKey），系统只投递绑定的组合键
+- pynput: 进程内低级键盘钩子，能看到所有按键，作为回退
+- process: 低级键盘钩子放在子进程中运行
+- fake: 不依赖系统输入，用于无界面的测试和基准
+"""
+import os
+import sys
+from typing import Callable
+
+
+# 后端交给 sink 的特殊序号：按住不放产生的重复按下已被丢弃（用于计数）
+REPEAT_DROPPED = -1
+# 立即触发的绑定（弹出面板）的修饰键刚刚全部按下，可以预热弹出面板
+PREPARE = -2
+# 捕获和弦期间按下的数字键以 CHORD_KEY_BASE - 数字 交给 sink
+CHORD_KEY_BASE = -10
+CHORD_DIGITS = range(1, 10)
+
+
+# 命中第 n 个缩写时以 ABBREV_BASE - n 交给 sink
+ABBREV_BASE = -100
+
+
+def chord_key_index(digit: int) -> int:
+    """和弦数字键对应的 sink 序号"""
+    return CHORD_KEY_BASE - digit
+
+
+def abbrev_index(n: int) -> int:
+    """缩写对应的 sink 序号"""
+    return ABBREV_BASE - n
+
+
+class BackendUnavailable(RuntimeError):
+    """当前环境无法使用该后端"""
+
+
+class HotkeyBackend:
+    """热键后端接口"""
+
+    name = "base"
+    # 是否能看到所有按键（依赖完整按键流的功能在其他后端上不可用）
+    sees_all_keys = False
+    # 是否支持捕获和弦数字键（需要能独占按键，不让其传给前台程序）
+    supports_chords = False
+
+    def __init__(self, sink: Callable[[int], None], on_failed: Callable[[], None] | None = None):
+        """
+        Args:
+            sink: 命中回调，参数为绑定序号或 REPEAT_DROPPED（可能在后台线程中调用）
+            on_failed: 后端运行中失效时的回调
+        """
+        self._sink = sink
+        self._on_failed = on_failed
+
+    def start(self, entries: list):
+        """
+        开始接收热键
+
+        Raises:
+            BackendUnavailable: 无法启动（如组合键已被其他程序占用）
+        """
+        raise NotImplementedError
+
+    def compile(self, entries: list):
+        """更新绑定（运行中也可调用）"""
+        raise NotImplementedError
+
+    def stop(self):
+        """停止接收热键"""
+        raise NotImplementedError
+
+    def capture_chord(self, modifiers: list[str] | None):
+        """
+        开始或停止捕获和弦数字键（可在 sink 中调用）
+
+        捕获期间单独按下 1-9，或按住 modifiers 按下 1-9，以 chord_key_index(数字)
+        交给 sink，且不会传给前台程序。modifiers 为 None 时停止捕获。
+        """
+
+    def set_abbreviations(self, abbreviations: list[str]):
+        """
+        设置要展开的缩写（需要 sees_all_keys，其他后端忽略）
+
+        输入完成第 n 个缩写时以 abbrev_index(n) 交给 sink。
+        """
+
+
+class PynputBackend(HotkeyBackend):
+    """进程内 pynput 低级键盘钩子"""
+
+    name = "pynput"
+    sees_all_keys = True
+
+    def __init__(self, sink, on_failed=None):
+        super().__init__(sink, on_failed)
+        from src.core.keymatch import HotkeyFilter
+
+        self._filter = HotkeyFilter(sink)
+        self._listener = None
+
+    def start(self, entries: list):
+        from pynput import keyboard
+
+        self._filter.compile(entries)
+        if self._listener is not None:
+            return
+        self._listener = keyboard.Listener(
+            on_press=self._filter.on_press,
+            on_release=self._filter.on_release,
+        )
+        self._listener.start()
+
+    def compile(self, entries: list):
+        self._filter.compile(entries)
+
+    def set_abbreviations(self, abbreviations: list[str]):
+        self._filter.set_abbreviations(abbreviations)
+
+    def stop(self):
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+        self._filter.reset()
+
+
+class ProcessBackend(HotkeyBackend):
+    """pynput 钩子运行在独立子进程中"""
+
+    name = "process"
+    sees_all_keys = True
+
+    def __init__(self, sink, on_failed=None):
+        super().__init__(sink, on_failed)
+        from src.core.hook_worker import HookProcess
+
+        self._process = HookProcess(sink, on_failed=on_failed)
+
+    def start(self, entries: list):
+        self._process.start(entries)
+
+    def compile(self, entries: list):
+        self._process.compile(entries)
+
+    def set_abbreviations(self, abbreviations: list[str]):
+        self._process.set_abbreviations(abbreviations)
+
+    def stop(self):
+        self._process.stop()
+
+
+class FakeBackend(HotkeyBackend):
+    """
+    假后端
+
+    行为与注册式后端一致：只有绑定的组合键才会被"投递"。
+    通过 fire() 模拟按下组合键，不需要图形会话和 pynput。
+    """
+
+    name = "fake"
+    supports_chords = True
+
+    def __init__(self, sink, on_failed=None):
+        super().__init__(sink, on_failed)
+        self._table: dict[tuple[frozenset, str], int] = {}
+        self._running = False
+        self._chord_modifiers: frozenset | None = None
+
+    def start(self, entries: list):
+        self.compile(entries)
+        self._running = True
+
+    def compile(self, entries: list):
+        self._table = {
+            (frozenset(modifiers), key.lower()): index
+            for index, (modifiers, key, _) in enumerate(entries)
+        }
+
+    def stop(self):
+        self._running = False
+        self._chord_modifiers = None
+
+    def capture_chord(self, modifiers: list[str] | None):
+        self._chord_modifiers = None if modifiers is None else frozenset(modifiers)
+
+    def fire(self, modifiers: list[str], key: str) -> bool:
+        """模拟按下组合键，返回是否命中绑定"""
+        if not self._running:
+            return False
+        if (
+            self._chord_modifiers is not None
+            and key.isdigit() and int(key) in CHORD_DIGITS
+            and frozenset(modifiers) in (frozenset(), self._chord_modifiers)
+        ):
+            self._sink(chord_key_index(int(key)))
+            return True
+        index = self._table.get((frozenset(modifiers), key.lower()))
+        if index is None:
+            return False
+        self._sink(index)
+        return True
+
+
+def native_backend_class() -> type[HotkeyBackend] | None:
+    """当前平台的注册式后端，不支持时返回 None"""
+    if sys.platform == "win32":
+        from src.core.hotkey_win32 import Win32Backend
+        return Win32Backend
+    if sys.platform.startswith("linux") and os.environ.get("DISPLAY"):
+        from src.core.hotkey_x11 import X11Backend
+        if X11Backend.is_available():
+            return X11Backend
+    return None
+
+
+def create_backend(kind: str, sink, on_failed=None) -> HotkeyBackend:
+    """
+    创建热键后端
+
+    Args:
+        kind: auto / native / pynput / process / fake，
+              auto 与 native 优先使用注册式后端，不支持时使用 pynput
+    """
+    if kind == "fake":
+        return FakeBackend(sink, on_failed)
+    if kind == "process":
+        return ProcessBackend(sink, on_failed)
+    if kind in ("auto", "native"):
+        native = native_backend_class()
+        if native is not None:
+            return native(sink, on_failed)
+    return PynputBackend(sink, on_failed)
@@ -0,0 +1,221 @@
+"""Windows 注册式热键后端（RegisterHotKey）"""
+import ctypes
+import threading
+import time
+from ctypes import wintypes
+
+from src.core.hotkey_backend import HotkeyBackend, BackendUnavailable, CHORD_DIGITS, chord_key_index
+
+WM_HOTKEY = 0x0312
+WM_QUIT = 0x0012
+WM_CHORD = 0x8000 + 1  # WM_APP + 1：开始/停止捕获和弦数字键
+
+MOD_ALT = 0x0001
+MOD_CONTROL = 0x0002
+MOD_SHIFT = 0x0004
+MOD_NOREPEAT = 0x4000  # 按住不放时系统不重复投递
+
+MODIFIER_FLAGS = {
+    "ctrl": MOD_CONTROL,
+    "alt": MOD_ALT,
+    "shift": MOD_SHIFT,
+}
+
+# 键名 -> 虚拟键码（字母数字直接使用大写字符编码）
+VK_CODES = {
+    "space": 0x20,
+    "tab": 0x09,
+    "grave": 0xC0,
+    "`": 0xC0,
+    "enter": 0x0D,
+    "esc": 0x1B,
+    "backspace": 0x08,
+    "insert": 0x2D,
+    "delete": 0x2E,
+    "home": 0x24,
+    "end": 0x23,
+    "page_up": 0x21,
+    "page_down": 0x22,
+    "left": 0x25,
+    "up": 0x26,
+    "right": 0x27,
+    "down": 0x28,
+    "-": 0xBD,
+    "=": 0xBB,
+    "[": 0xDB,
+    "]": 0xDD,
+    ";": 0xBA,
+    "'": 0xDE,
+    ",": 0xBC,
+    ".": 0xBE,
+    "/": 0xBF,
+    "\\": 0xDC,
+    **{f"f{i}": 0x6F + i for i in range(1, 25)},
+}
+
+# 和弦数字键的热键 id 从这里开始，避开绑定序号
+CHORD_ID_BASE = 0x1000
+VK_NUMPAD0 = 0x60
+
+# 等待修饰键松开时检查的虚拟键（Shift、Ctrl、Alt、左右 Win）
+MODIFIER_VKS = (0x10, 0x11, 0x12, 0x5B, 0x5C)
+RELEASE_TIMEOUT = 2.0
+
+
+def key_to_vk(key: str) -> int | None:
+    """键名转虚拟键码"""
+    key = key.lower()
+    if key in VK_CODES:
+        return VK_CODES[key]
+    if len(key) == 1 and key.isascii() and key.isalnum():
+        return ord(key.upper())
+    return None
+
+
+def modifiers_to_flags(modifiers: list[str]) -> int:
+    """修饰键名列表转 RegisterHotKey 标志"""
+    flags = MOD_NOREPEAT
+    for name in modifiers:
+        flags |= MODIFIER_FLAGS.get(name, 0)
+    return flags
+
+
+class Win32Backend(HotkeyBackend):
+    """
+    RegisterHotKey 后端
+
+    热键在专用线程中注册，该线程运行消息循环接收 WM_HOTKEY。
+    系统只投递已注册的组合键，普通打字不会唤醒本进程。
+    """
+
+    name = "win32"
+    supports_chords = True
+
+    def __init__(self, sink, on_failed=None):
+        super().__init__(sink, on_failed)
+        self._entries: list = []
+        self._thread: threading.Thread | None = None
+        self._thread_id = 0
+        self._chord_modifiers: list[str] | None = None
+
+    def start(self, entries: list):
+        self._entries = list(entries)
+        if self._thread is not None:
+            return
+
+        ready = threading.Event()
+        errors: list[str] = []
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(self._entries, ready, errors),
+            name="shokax-win32-hotkey",
+            daemon=True,
+        )
+        self._thread.start()
+        ready.wait(2)
+        if errors:
+            self._thread.join(1)
+            self._thread = None
+            raise BackendUnavailable("; ".join(errors))
+
+    def compile(self, entries: list):
+        if self._thread is None:
+            self._entries = list(entries)
+            return
+        # 注册必须在消息循环线程中完成，直接重启线程
+        self.stop()
+        self.start(entries)
+
+    def stop(self):
+        if self._thread is None:
+            return
+        ctypes.windll.user32.PostThreadMessageW(self._thread_id, WM_QUIT, 0, 0)
+        self._thread.join(1)
+        self._thread = None
+
+    def capture_chord(self, modifiers: list[str] | None):
+        # 注册必须在消息循环线程中完成
+        self._chord_modifiers = None if modifiers is None else list(modifiers)
+        if self._thread is not None:
+            ctypes.windll.user32.PostThreadMessageW(self._thread_id, WM_CHORD, 0, 0)
+
+    def _run(self, entries: list, ready: threading.Event, errors: list[str]):
+        user32 = ctypes.windll.user32
+        self._thread_id = ctypes.windll.kernel32.GetCurrentThreadId()
+
+        registered = []
+        for index, (modifiers, key, _) in enumerate(entries):
+            vk = key_to_vk(key)
+            if vk is None:
+                errors.append(f"不支持的按键: {key}")
+                continue
+            if user32.RegisterHotKey(None, index + 1, modifiers_to_flags(modifiers), vk):
+                registered.append(index + 1)
+            else:
+                errors.append(f"热键已被占用: {'+'.join(modifiers)}+{key}")
+
+        if errors:
+            for hotkey_id in registered:
+                user32.UnregisterHotKey(None, hotkey_id)
+            ready.set()
+            return
+        ready.set()
+
+        msg = wintypes.MSG()
+        chord_ids: dict[int, int] = {}
+        try:
+            while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+                if msg.message == WM_CHORD:
+                    self._unregister_chord(chord_ids)
+                    if self._chord_modifiers is not None:
+                        chord_ids = self._register_chord(self._chord_modifiers)
+                    continue
+                if msg.message != WM_HOTKEY:
+                    continue
+                digit = chord_ids.get(msg.wParam)
+                if digit is not None:
+                    self._wait_modifiers_released()
+                    self._sink(chord_key_index(digit))
+                    continue
+                index = msg.wParam - 1
+                if 0 <= index < len(entries):
+                    if entries[index][2]:
+                        self._wait_modifiers_released()
+                    self._sink(index)
+        finally:
+            self._unregister_chord(chord_ids)
+            for hotkey_id in registered:
+                user32.UnregisterHotKey(None, hotkey_id)
+
+    @staticmethod
+    def _register_chord(modifiers: list[str]) -> dict[int, int]:
+        """注册和弦数字键（主键盘与小键盘，单独按下或带修饰键），返回 热键 id -> 数字"""
+        user32 = ctypes.windll.user32
+        flag_sets = {modifiers_to_flags([]), modifiers_to_flags(modifiers)}
+        chord_ids: dict[int, int] = {}
+        hotkey_id = CHORD_ID_BASE
+        for digit in CHORD_DIGITS:
+            for vk in (ord(str(digit)), VK_NUMPAD0 + digit):
+                for flags in flag_sets:
+                    # 个别组合被其他程序占用时跳过，不影响其他数字键
+                    if user32.RegisterHotKey(None, hotkey_id, flags, vk):
+                        chord_ids[hotkey_id] = digit
+                    hotkey_id += 1
+        return chord_ids
+
+    @staticmethod
+    def _unregister_chord(chord_ids: dict[int, int]):
+        """注销和弦数字键"""
+        for hotkey_id in chord_ids:
+            ctypes.windll.user32.UnregisterHotKey(None, hotkey_id)
+        chord_ids.clear()
+
+    @staticmethod
+    def _wait_modifiers_released():
+        """等待修饰键全部松开，避免输出时修饰键仍处于按下状态"""
+        get_state = ctypes.windll.user32.GetAsyncKeyState
+        deadline = time.monotonic() + RELEASE_TIMEOUT
+        while time.monotonic() < deadline:
+            if not any(get_state(vk) & 0x8000 for vk in MODIFIER_VKS):
+                return
+            time.sleep(0.01)
@@ -0,0 +1,456 @@
+"""X11 注册式热键后端（XGrabKey）"""
+import ctypes
+import ctypes.util
+import os
+import select
+import threading
+import time
+from contextlib import contextmanager
+from ctypes import c_int, c_uint, c_ulong, c_long, c_void_p, c_char_p, c_ubyte
+
+from src.core.hotkey_backend import (
+    HotkeyBackend, BackendUnavailable, REPEAT_DROPPED, CHORD_DIGITS, chord_key_index,
+)
+
+KEY_PRESS = 2
+KEY_RELEASE = 3
+KEY_PRESS_MASK = 1
+GRAB_MODE_ASYNC = 1
+
+SHIFT_MASK = 1 << 0
+LOCK_MASK = 1 << 1
+CONTROL_MASK = 1 << 2
+MOD1_MASK = 1 << 3  # Alt
+MOD2_MASK = 1 << 4  # NumLock
+
+MODIFIER_MASKS = {
+    "ctrl": CONTROL_MASK,
+    "alt": MOD1_MASK,
+    "shift": SHIFT_MASK,
+}
+RELEVANT_MASK = SHIFT_MASK | CONTROL_MASK | MOD1_MASK
+# CapsLock / NumLock 状态不应影响热键，需要对每种组合分别抓取
+IGNORED_MASKS = (0, LOCK_MASK, MOD2_MASK, LOCK_MASK | MOD2_MASK)
+
+# 键名 -> keysym 名称（字母数字直接使用字符本身）
+KEYSYM_NAMES = {
+    "space": "space",
+    "tab": "Tab",
+    "grave": "grave",
+    "`": "grave",
+    "enter": "Return",
+    "esc": "Escape",
+    "backspace": "BackSpace",
+    "insert": "Insert",
+    "delete": "Delete",
+    "home": "Home",
+    "end": "End",
+    "page_up": "Prior",
+    "page_down": "Next",
+    "left": "Left",
+    "up": "Up",
+    "right": "Right",
+    "down": "Down",
+    "-": "minus",
+    "=": "equal",
+    "[": "bracketleft",
+    "]": "bracketright",
+    ";": "semicolon",
+    "'": "apostrophe",
+    ",": "comma",
+    ".": "period",
+    "/": "slash",
+    "\\": "backslash",
+    **{f"f{i}": f"F{i}" for i in range(1, 25)},
+}
+
+# 唤醒管道中的命令字节
+WAKE_STOP = b"x"
+WAKE_CHORD = b"c"
+
+MODIFIER_KEYSYMS = ("Shift_L", "Shift_R", "Control_L", "Control_R", "Alt_L", "Alt_R", "Super_L", "Super_R")
+RELEASE_TIMEOUT = 2.0
+
+
+class XKeyEvent(ctypes.Structure):
+    _fields_ = [
+        ("type", c_int),
+        ("serial", c_ulong),
+        ("send_event", c_int),
+        ("display", c_void_p),
+        ("window", c_ulong),
+        ("root", c_ulong),
+        ("subwindow", c_ulong),
+        ("time", c_ulong),
+        ("x", c_int),
+        ("y", c_int),
+        ("x_root", c_int),
+        ("y_root", c_int),
+        ("state", c_uint),
+        ("keycode", c_uint),
+        ("same_screen", c_int),
+    ]
+
+
+class XEvent(ctypes.Union):
+    _fields_ = [
+        ("type", c_int),
+        ("xkey", XKeyEvent),
+        ("pad", c_long * 24),
+    ]
+
+
+class XErrorEvent(ctypes.Structure):
+    _fields_ = [
+        ("type", c_int),
+        ("display", c_void_p),
+        ("resourceid", c_ulong),
+        ("serial", c_ulong),
+        ("error_code", c_ubyte),
+        ("request_code", c_ubyte),
+        ("minor_code", c_ubyte),
+    ]
+
+
+ERROR_HANDLER = ctypes.CFUNCTYPE(c_int, c_void_p, ctypes.POINTER(XErrorEvent))
+
+_xlib = None
+_xlib_lock = threading.Lock()
+# 连接（Display 指针）-> 正在收集的错误码，见 trap_x_errors
+_x_errors: dict[int, list[int]] = {}
+
+
+def _on_x_error(display, event) -> int:
+    errors = _x_errors.get(display)
+    if errors is not None:
+        errors.append(event.contents.error_code)
+    return 0
+
+
+# 错误处理函数是进程全局的：加载时安装一次并一直保留引用，各线程不再各自替换
+# （替换与恢复交错时可能恢复一个已被回收的回调）。未在收集中的错误直接忽略，
+# 默认处理会退出进程
+_error_handler = ERROR_HANDLER(_on_x_error)
+
+
+@contextmanager
+def trap_x_errors(xlib, display):
+    """
+    收集该连接上的 X 错误（如 BadAccess、BadWindow）
+
+    退出时先 XSync，保证请求产生的错误都已送达。每个连接只应在一个线程中使用。
+
+    Yields:
+        错误码列表
+    """
+    errors: list[int] = []
+    _x_errors[display] = errors
+    try:
+        yield errors
+    finally:
+        xlib.XSync(display, 0)
+        _x_errors.pop(display, None)
+
+
+def _load_xlib():
+    """加载 libX11 并声明用到的函数（首次加载时启用多线程支持并安装错误处理函数）"""
+    global _xlib
+    if _xlib is not None:
+        return _xlib
+    with _xlib_lock:
+        if _xlib is None:
+            _xlib = _init_xlib()
+    return _xlib
+
+
+def _init_xlib():
+    path = ctypes.util.find_library("X11")
+    if not path:
+        raise OSError("libX11 not found")
+    lib = ctypes.CDLL(path)
+    lib.XOpenDisplay.restype = c_void_p
+    lib.XOpenDisplay.argtypes = [c_char_p]
+    lib.XCloseDisplay.argtypes = [c_void_p]
+    lib.XDefaultRootWindow.restype = c_ulong
+    lib.XDefaultRootWindow.argtypes = [c_void_p]
+    lib.XStringToKeysym.restype = c_ulong
+    lib.XStringToKeysym.argtypes = [c_char_p]
+    lib.XKeysymToKeycode.restype = c_ubyte
+    lib.XKeysymToKeycode.argtypes = [c_void_p, c_ulong]
+    lib.XGrabKey.argtypes = [c_void_p, c_int, c_uint, c_ulong, c_int, c_int, c_int]
+    lib.XUngrabKey.argtypes = [c_void_p, c_int, c_uint, c_ulong]
+    lib.XSelectInput.argtypes = [c_void_p, c_ulong, c_long]
+    lib.XSync.argtypes = [c_void_p, c_int]
+    lib.XPending.argtypes = [c_void_p]
+    lib.XNextEvent.argtypes = [c_void_p, ctypes.POINTER(XEvent)]
+    lib.XConnectionNumber.argtypes = [c_void_p]
+    lib.XQueryKeymap.argtypes = [c_void_p, ctypes.c_char * 32]
+    lib.XkbSetDetectableAutoRepeat.argtypes = [c_void_p, c_int, c_void_p]
+    lib.XSetErrorHandler.restype = c_void_p
+    lib.XSetErrorHandler.argtypes = [c_void_p]
+    # 前台窗口查询（src.core.profiles）
+    lib.XInternAtom.restype = c_ulong
+    lib.XInternAtom.argtypes = [c_void_p, c_char_p, c_int]
+    lib.XGetWindowProperty.argtypes = [
+        c_void_p, c_ulong, c_ulong, c_long, c_long, c_int, c_ulong,
+        c_void_p, c_void_p, c_void_p, c_void_p, c_void_p,
+    ]
+    lib.XFree.argtypes = [c_void_p]
+    lib.XInitThreads.restype = c_int
+    # 热键线程与输出线程各自打开连接，必须在第一次 XOpenDisplay 之前调用
+    lib.XInitThreads()
+    lib.XSetErrorHandler(ctypes.cast(_error_handler, c_void_p))
+    return lib
+
+
+def key_to_keysym_name(key: str) -> str:
+    """键名转 keysym 名称"""
+    key = key.lower()
+    return KEYSYM_NAMES.get(key, key)
+
+
+def modifiers_to_mask(modifiers: list[str]) -> int:
+    """修饰键名列表转 X11 修饰键掩码"""
+    mask = 0
+    for name in modifiers:
+        mask |= MODIFIER_MASKS.get(name, 0)
+    return mask
+
+
+class X11Backend(HotkeyBackend):
+    """
+    XGrabKey 后端
+
+    在专用线程中打开独立的 X 连接，对根窗口抓取绑定的组合键。
+    X 服务器只投递抓取的按键；按住不放产生的自动重复按下会被丢弃。
+    """
+
+    name = "x11"
+    supports_chords = True
+
+    @staticmethod
+    def is_available() -> bool:
+        try:
+            _load_xlib()
+        except OSError:
+            return False
+        return True
+
+    def __init__(self, sink, on_failed=None):
+        super().__init__(sink, on_failed)
+        self._entries: list = []
+        self._thread: threading.Thread | None = None
+        # 唤醒管道的写端；读端交给事件线程，由它退出时关闭
+        self._wake_w = -1
+        self._wake_lock = threading.Lock()
+        self._chord_modifiers: list[str] | None = None
+
+    def start(self, entries: list):
+        self._entries = list(entries)
+        if self._thread is not None:
+            return
+
+        wake_r, wake_w = os.pipe()
+        with self._wake_lock:
+            self._wake_w = wake_w
+        ready = threading.Event()
+        errors: list[str] = []
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(self._entries, wake_r, ready, errors),
+            name="shokax-x11-hotkey",
+            daemon=True,
+        )
+        self._thread.start()
+        if not ready.wait(2):
+            # 线程仍卡在连接或抓取中，让它之后进入事件循环时立即退出
+            errors.append("热键线程启动超时")
+            self._wake(WAKE_STOP)
+        if errors:
+            self._thread.join(1)
+            self._thread = None
+            self._close_wake()
+            raise BackendUnavailable("; ".join(errors))
+
+    def compile(self, entries: list):
+        if self._thread is None:
+            self._entries = list(entries)
+            return
+        self.stop()
+        self.start(entries)
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._wake(WAKE_STOP)
+        self._thread.join(1)
+        self._thread = None
+        self._close_wake()
+
+    def capture_chord(self, modifiers: list[str] | None):
+        # 抓取必须使用事件线程自己的 X 连接
+        self._chord_modifiers = None if modifiers is None else list(modifiers)
+        self._wake(WAKE_CHORD)
+
+    def _wake(self, command: bytes):
+        """向事件线程发送命令（可能与 stop() 并发，管道已关闭或线程已退出时忽略）"""
+        with self._wake_lock:
+            if self._wake_w < 0:
+                return
+            try:
+                os.write(self._wake_w, command)
+            except OSError:
+                pass
+
+    def _close_wake(self):
+        """关闭唤醒管道的写端；仍未退出的事件线程读到 EOF 后退出"""
+        with self._wake_lock:
+            if self._wake_w >= 0:
+                os.close(self._wake_w)
+                self._wake_w = -1
+
+    def _run(self, entries: list, wake_r: int, ready: threading.Event, errors: list[str]):
+        # 读端只在本线程中关闭：启动或停止超时后线程可能仍阻塞在 select 上，
+        # 由其他线程关闭的描述符编号可能被复用
+        display = None
+        try:
+            xlib = _load_xlib()
+            display = xlib.XOpenDisplay(None)
+            if not display:
+                errors.append("无法连接 X 服务器")
+                return
+            try:
+                grabs = self._grab_all(xlib, display, entries, errors)
+            except Exception as e:
+                errors.append(f"抓取热键失败: {e}")
+            ready.set()
+            if errors:
+                return
+            self._event_loop(xlib, display, grabs, entries, wake_r)
+        finally:
+            ready.set()
+            if display:
+                xlib.XCloseDisplay(display)
+            os.close(wake_r)
+
+    def _grab_all(self, xlib, display, entries: list, errors: list[str]) -> dict[tuple[int, int], int]:
+        """抓取所有绑定，返回 (keycode, 修饰键掩码) -> 绑定序号"""
+        grabs: dict[tuple[int, int], int] = {}
+        for index, (modifiers, key, _) in enumerate(entries):
+            keysym = xlib.XStringToKeysym(key_to_keysym_name(key).encode())
+            keycode = xlib.XKeysymToKeycode(display, keysym) if keysym else 0
+            if not keycode:
+                errors.append(f"不支持的按键: {key}")
+                continue
+            grabs[(keycode, modifiers_to_mask(modifiers))] = index
+
+        if not self._grab_keys(xlib, display, grabs):
+            errors.append("热键已被其他程序占用")
+            self._ungrab_keys(xlib, display, grabs)
+            return {}
+
+        # 自动重复只产生 KeyPress 不产生 KeyRelease，便于识别按住不放
+        xlib.XkbSetDetectableAutoRepeat(display, 1, None)
+        xlib.XSelectInput(display, xlib.XDefaultRootWindow(display), KEY_PRESS_MASK)
+        return grabs
+
+    @staticmethod
+    def _grab_keys(xlib, display, keys) -> bool:
+        """抓取 (keycode, 修饰键掩码) 组合，返回是否全部成功"""
+        root = xlib.XDefaultRootWindow(display)
+        # BadAccess 表示组合键已被其他程序抓取
+        with trap_x_errors(xlib, display) as failed:
+            for (keycode, mask) in keys:
+                for extra in IGNORED_MASKS:
+                    xlib.XGrabKey(display, keycode, mask | extra, root, 0, GRAB_MODE_ASYNC, GRAB_MODE_ASYNC)
+        return not failed
+
+    @staticmethod
+    def _ungrab_keys(xlib, display, keys):
+        """释放 (keycode, 修饰键掩码) 组合"""
+        root = xlib.XDefaultRootWindow(display)
+        for (keycode, mask) in keys:
+            for extra in IGNORED_MASKS:
+                xlib.XUngrabKey(display, keycode, mask | extra, root)
+        xlib.XSync(display, 0)
+
+    def _chord_keys(self, xlib, display, modifiers: list[str]) -> dict[tuple[int, int], int]:
+        """和弦数字键（主键盘与小键盘，单独按下或带修饰键），返回 (keycode, 修饰键掩码) -> 数字"""
+        masks = {0, modifiers_to_mask(modifiers)}
+        keys: dict[tuple[int, int], int] = {}
+        for digit in CHORD_DIGITS:
+            for name in (str(digit), f"KP_{digit}"):
+                keycode = xlib.XKeysymToKeycode(display, xlib.XStringToKeysym(name.encode()))
+                if keycode:
+                    for mask in masks:
+                        keys[(keycode, mask)] = digit
+        return keys
+
+    def _event_loop(self, xlib, display, grabs: dict[tuple[int, int], int], entries: list, wake_r: int):
+        fd = xlib.XConnectionNumber(display)
+        event = XEvent()
+        down: set[int] = set()
+        chord: dict[tuple[int, int], int] = {}
+        try:
+            while True:
+                while xlib.XPending(display):
+                    xlib.XNextEvent(display, ctypes.byref(event))
+                    if event.type == KEY_RELEASE:
+                        down.discard(event.xkey.keycode)
+                        continue
+                    if event.type != KEY_PRESS:
+                        continue
+                    keycode = event.xkey.keycode
+                    if keycode in down:
+                        self._sink(REPEAT_DROPPED)
+                        continue
+                    down.add(keycode)
+                    combo = (keycode, event.xkey.state & RELEVANT_MASK)
+                    digit = chord.get(combo)
+                    if digit is not None:
+                        self._wait_modifiers_released(xlib, display)
+                        self._sink(chord_key_index(digit))
+                        continue
+                    index = grabs.get(combo)
+                    if index is None:
+                        continue
+                    if entries[index][2]:
+                        self._wait_modifiers_released(xlib, display)
+                    self._sink(index)
+
+                readable, _, _ = select.select([fd, wake_r], [], [])
+                if wake_r not in readable:
+                    continue
+                commands = os.read(wake_r, 64)
+                # 空串表示写端已关闭
+                if not commands or WAKE_STOP in commands:
+                    return
+                self._ungrab_keys(xlib, display, chord)
+                chord = {}
+                if self._chord_modifiers is not None:
+                    # 与已抓取的热键相同的组合不再抓取，个别组合被占用时不影响其他数字键
+                    chord = {
+                        key: digit
+                        for key, digit in self._chord_keys(xlib, display, self._chord_modifiers).items()
+                        if key not in grabs
+                    }
+                    self._grab_keys(xlib, display, chord)
+        finally:
+            if chord:
+                self._ungrab_keys(xlib, display, chord)
+
+    @staticmethod
+    def _wait_modifiers_released(xlib, display):
+        """等待修饰键全部松开，避免输出时修饰键仍处于按下状态"""
+        keycodes = [
+            xlib.XKeysymToKeycode(display, xlib.XStringToKeysym(name.encode()))
+            for name in MODIFIER_KEYSYMS
+        ]
+        keymap = (ctypes.c_char * 32)()
+        deadline = time.monotonic() + RELEASE_TIMEOUT
+        while time.monotonic() < deadline:
+            xlib.XQueryKeymap(display, keymap)
+            raw = keymap.raw
+            if not any(code and raw[code >> 3] & (1 << (code & 7)) for code in keycodes):
+                return
+            time.sleep(0.01)
@@ -0,0 +1,199 @@
+"""空闲时释放资源与内存占用统计
+
+一段时间没有热键、命令等操作后进入空闲状态：依次调用登记的释放函数（隐藏的主窗口、
+弹出面板的菜单页等，下次使用时按需重建），再清理 Python / Qt 缓存并把空闲堆内存还给系统。
+下一次操作时退出空闲状态。空闲计时只是一个单次定时器，空闲期间不产生任何唤醒。
+
+footprint() 汇总常驻内存、tracemalloc（已开启时）、唤醒次数与预算，WakeupCounter 统计
+界面线程事件循环的唤醒次数（只在测量期间连接）。长时间运行的验证见 benchmarks/soak.py。
+"""
+import ctypes
+import gc
+import linecache
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Callable
+from PySide6.QtCore import QAbstractEventDispatcher, QCoreApplication, QEvent, QObject, QTimer, Signal
+
+from src.core import metrics
+from src.core.config import DEFAULT_IDLE_AFTER_S, DEFAULT_IDLE_BUDGET
+
+# 空闲状态下的预算：常驻内存（MB）与每秒唤醒次数（上下文切换）
+DEFAULT_RSS_BUDGET_MB = DEFAULT_IDLE_BUDGET["rss_mb"]
+DEFAULT_WAKEUP_BUDGET = DEFAULT_IDLE_BUDGET["wakeups_per_s"]
+
+
+def release_heap():
+    """把空闲的堆内存还给系统（glibc malloc_trim / Windows 工作集收缩）"""
+    try:
+        if sys.platform.startswith("linux"):
+            ctypes.CDLL("libc.so.6").malloc_trim(0)
+        elif sys.platform == "win32":
+            kernel32 = ctypes.windll.kernel32
+            kernel32.GetCurrentProcess.restype = ctypes.c_void_p
+            kernel32.SetProcessWorkingSetSize.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_size_t]
+            kernel32.SetProcessWorkingSetSize(kernel32.GetCurrentProcess(), ctypes.c_size_t(-1), ctypes.c_size_t(-1))
+    except (OSError, AttributeError):
+        pass
+
+
+def trim_caches():
+    """清理 Python 与 Qt 的缓存（先处理待删除的控件），然后释放堆内存"""
+    from PySide6.QtGui import QPixmapCache
+
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+    QPixmapCache.clear()
+    re.purge()
+    linecache.clearcache()
+    sys._clear_type_cache()
+    gc.collect()
+    release_heap()
+
+
+def context_switches() -> int | None:
+    """进程累计的主动上下文切换次数（近似唤醒次数），psutil 不可用时返回 None"""
+    try:
+        import psutil
+        return psutil.Process().num_ctx_switches().voluntary
+    except Exception:
+        return None
+
+
+def footprint(
+    previous: dict | None = None,
+    rss_budget_mb: float = DEFAULT_RSS_BUDGET_MB,
+    wakeup_budget: float = DEFAULT_WAKEUP_BUDGET,
+) -> dict:
+    """
+    当前内存占用与唤醒频率
+
+    Args:
+        previous: 上一次的结果，用于计算两次之间的每秒唤醒次数
+        rss_budget_mb: 常驻内存预算
+        wakeup_budget: 每秒唤醒次数预算
+
+    Returns:
+        rss_mb / tracemalloc_mb / wakeups_per_s 等，超出预算的项列在 over_budget 中
+    """
+    rss = metrics.rss_bytes()
+    result = {
+        "time": time.monotonic(),
+        "rss_mb": round(rss / 1024 / 1024, 1) if rss is not None else None,
+        "context_switches": context_switches(),
+        "threads": threading.active_count(),
+        "modules": len(sys.modules),
+        "gc_objects": len(gc.get_objects()),
+    }
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        result["tracemalloc_mb"] = round(current / 1024 / 1024, 2)
+        result["tracemalloc_peak_mb"] = round(peak / 1024 / 1024, 2)
+
+    result["wakeups_per_s"] = None
+    if previous and previous.get("context_switches") is not None and result["context_switches"] is not None:
+        elapsed = result["time"] - previous["time"]
+        if elapsed > 0:
+            result["wakeups_per_s"] = round((result["context_switches"] - previous["context_switches"]) / elapsed, 2)
+
+    over = []
+    if result["rss_mb"] is not None and result["rss_mb"] > rss_budget_mb:
+        over.append("rss_mb")
+    if result["wakeups_per_s"] is not None and result["wakeups_per_s"] > wakeup_budget:
+        over.append("wakeups_per_s")
+    result["budget"] = {"rss_mb": rss_budget_mb, "wakeups_per_s": wakeup_budget}
+    result["over_budget"] = over
+    return result
+
+
+class WakeupCounter(QObject):
+    """界面线程事件循环的唤醒计数（只在 start() 与 stop() 之间计数）"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._count = 0
+        self._started = 0.0
+        self._dispatcher = None
+
+    def start(self):
+        self._count = 0
+        self._started = time.monotonic()
+        if self._dispatcher is None:
+            self._dispatcher = QAbstractEventDispatcher.instance()
+            if self._dispatcher is not None:
+                self._dispatcher.awake.connect(self._on_awake)
+
+    def stop(self) -> float:
+        """停止计数，返回期间的每秒唤醒次数"""
+        if self._dispatcher is not None:
+            self._dispatcher.awake.disconnect(self._on_awake)
+            self._dispatcher = None
+        elapsed = time.monotonic() - self._started
+        return self._count / elapsed if elapsed > 0 else 0.0
+
+    def _on_awake(self):
+        self._count += 1
+
+
+class IdleMonitor(QObject):
+    """
+    空闲检测
+
+    touch() 标记一次操作；idle_after_s 秒内没有操作时调用释放函数并清理缓存，
+    状态变化通过 idle_changed 通知。
+    """
+
+    idle_changed = Signal(bool)
+
+    def __init__(self, idle_after_s: float = DEFAULT_IDLE_AFTER_S, parent=None):
+        super().__init__(parent)
+        self._idle = False
+        self._enabled = False
+        self._releases: list[Callable[[], None]] = []
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._enter_idle)
+        self.set_timeout(idle_after_s)
+
+    @property
+    def is_idle(self) -> bool:
+        return self._idle
+
+    def set_timeout(self, idle_after_s: float):
+        """设置进入空闲的时间，0 表示不启用"""
+        self._timer.stop()
+        self._enabled = idle_after_s > 0
+        if self._enabled:
+            self._timer.setInterval(round(idle_after_s * 1000))
+            self._timer.start()
+
+    def add_release(self, callback: Callable[[], None]):
+        """登记进入空闲时调用的释放函数"""
+        self._releases.append(callback)
+
+    def touch(self):
+        """标记一次操作（空闲时退出空闲状态）"""
+        if self._idle:
+            self._idle = False
+            self.idle_changed.emit(False)
+        if self._enabled:
+            self._timer.start()
+
+    def _enter_idle(self):
+        if self._idle:
+            return
+        before = metrics.rss_bytes()
+        for release in self._releases:
+            try:
+                release()
+            except Exception as e:
+                print(f"空闲释放失败: {e}")
+        trim_caches()
+        self._idle = True
+        metrics.incr("idle.entered")
+        after = metrics.rss_bytes()
+        if before is not None and after is not None:
+            print(f"进入空闲状态，常驻内存 {before / 1024 / 1024:.1f} -> {after / 1024 / 1024:.1f} MB")
+        self.idle_changed.emit(True)
@@ -0,0 +1,169 @@
+"""单实例保护与本地进程间通信"""
+import getpass
+import time
+from typing import Callable
+from PySide6.QtCore import QObject, Signal, QLockFile
+from PySide6.QtNetwork import QLocalServer, QLocalSocket
+
+from src.core.config import CONFIG_PATH
+
+LOCK_PATH = CONFIG_PATH.parent / "instance.lock"
+
+# 连接主实例的超时时间（毫秒）
+CONNECT_TIMEOUT_MS = 1000
+
+
+def server_name() -> str:
+    """本地服务名（按用户区分，避免多用户会话互相干扰）"""
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = "default"
+    return f"shokax-plugin-{user}"
+
+
+def send_commands(commands: list[str], timeout_ms: int = CONNECT_TIMEOUT_MS) -> list[str] | None:
+    """
+    向主实例发送命令并等待回复
+
+    协议为按行分隔的 UTF-8 文本，每条命令对应一行回复。
+
+    Args:
+        commands: 命令列表
+        timeout_ms: 连接及等待每条回复的超时时间
+
+    Returns:
+        回复列表；无法连接到主实例时返回 None
+    """
+    socket = QLocalSocket()
+    deadline = time.monotonic() + timeout_ms / 1000
+    # 主实例可能已持有锁但还没开始监听，短暂重试
+    while True:
+        socket.connectToServer(server_name())
+        if socket.waitForConnected(100):
+            break
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(0.02)
+
+    payload = "".join(f"{command}\n" for command in commands)
+    socket.write(payload.encode("utf-8"))
+    socket.flush()
+
+    replies: list[str] = []
+    buffer = b""
+    while len(replies) < len(commands):
+        if not socket.bytesAvailable() and not socket.waitForReadyRead(timeout_ms):
+            break
+        buffer += bytes(socket.readAll())
+        *lines, buffer = buffer.split(b"\n")
+        replies.extend(line.decode("utf-8") for line in lines)
+
+    socket.disconnectFromServer()
+    return replies
+
+
+class _Connection:
+    """单个客户端连接，保证回复顺序与命令顺序一致"""
+
+    def __init__(self, socket: QLocalSocket):
+        self.socket = socket
+        self.buffer = b""
+        self._next_id = 0
+        self._next_to_send = 0
+        self._pending: dict[int, str] = {}
+        self.closed = False  # 客户端已断开，套接字已交给 deleteLater
+
+    def make_reply(self) -> Callable[[str], None]:
+        request_id = self._next_id
+        self._next_id += 1
+
+        def reply(text: str):
+            # 异步完成的命令可能在客户端断开后才回复
+            if self.closed:
+                return
+            self._pending[request_id] = text
+            self._flush()
+        return reply
+
+    def close(self):
+        """客户端已断开，之后的回复全部丢弃"""
+        self.closed = True
+        self._pending.clear()
+
+    def _flush(self):
+        data = []
+        while self._next_to_send in self._pending:
+            data.append(self._pending.pop(self._next_to_send))
+            self._next_to_send += 1
+        if data and self.socket.state() == QLocalSocket.ConnectedState:
+            self.socket.write("".join(f"{text}\n" for text in data).encode("utf-8"))
+            self.socket.flush()
+
+
+class SingleInstance(QObject):
+    """
+    单实例保护
+
+    通过锁文件判断是否已有实例在运行。主实例在本地套接字上监听，
+    后续启动的实例把命令转发给主实例后立即退出。
+    """
+
+    # (命令, 回复函数)，回复函数可在命令完成后异步调用
+    command_received = Signal(str, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        LOCK_PATH.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = QLockFile(str(LOCK_PATH))
+        # 只有持有进程已退出时才视为过期锁
+        self._lock.setStaleLockTime(0)
+        self._server: QLocalServer | None = None
+        self._connections: dict[QLocalSocket, _Connection] = {}
+
+    def acquire(self) -> bool:
+        """尝试成为主实例"""
+        return self._lock.tryLock(0)
+
+    def listen(self) -> bool:
+        """开始监听本地命令（仅主实例调用）"""
+        name = server_name()
+        # 清理上次异常退出遗留的套接字文件
+        QLocalServer.removeServer(name)
+        self._server = QLocalServer(self)
+        self._server.setSocketOptions(QLocalServer.UserAccessOption)
+        self._server.newConnection.connect(self._on_new_connection)
+        if not self._server.listen(name):
+            print(f"本地服务启动失败: {self._server.errorString()}")
+            return False
+        return True
+
+    def release(self):
+        """释放锁并停止监听"""
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        self._lock.unlock()
+
+    def _on_new_connection(self):
+        while self._server is not None and self._server.hasPendingConnections():
+            socket = self._server.nextPendingConnection()
+            self._connections[socket] = _Connection(socket)
+            socket.readyRead.connect(lambda s=socket: self._on_ready_read(s))
+            socket.disconnected.connect(lambda s=socket: self._on_disconnected(s))
+
+    def _on_ready_read(self, socket: QLocalSocket):
+        connection = self._connections.get(socket)
+        if connection is None:
+            return
+        *lines, connection.buffer = (connection.buffer + bytes(socket.readAll())).split(b"\n")
+        for line in lines:
+            command = line.decode("utf-8", errors="replace").strip()
+            if command:
+                self.command_received.emit(command, connection.make_reply())
+
+    def _on_disconnected(self, socket: QLocalSocket):
+        connection = self._connections.pop(socket, None)
+        if connection is not None:
+            connection.close()
+        socket.deleteLater()
@@ -0,0 +1,292 @@
+"""热键匹配器
+
+全局键盘钩子的回调对系统中的每一次按键都会执行，这里把绑定预先编译成扁平的查找表：
+不匹配的按键只需一次字典未命中即可返回。本模块不依赖 Qt，可在独立进程中使用。
+"""
+import sys
+from pynput import keyboard
+
+from src.core.abbrev import AbbrevMatcher
+from src.core.hotkey_backend import REPEAT_DROPPED, PREPARE, abbrev_index
+
+KeyCode = keyboard.KeyCode
+Key = keyboard.Key
+
+# 修饰键位
+MOD_CTRL = 1
+MOD_ALT = 2
+MOD_SHIFT = 4
+
+MODIFIER_BITS = {
+    "ctrl": MOD_CTRL,
+    "alt": MOD_ALT,
+    "shift": MOD_SHIFT,
+}
+
+# pynput 修饰键 -> 修饰键位
+MODIFIER_KEYS = {
+    Key.ctrl: MOD_CTRL,
+    Key.ctrl_l: MOD_CTRL,
+    Key.ctrl_r: MOD_CTRL,
+    Key.alt: MOD_ALT,
+    Key.alt_l: MOD_ALT,
+    Key.alt_r: MOD_ALT,
+    Key.shift: MOD_SHIFT,
+    Key.shift_l: MOD_SHIFT,
+    Key.shift_r: MOD_SHIFT,
+}
+
+# press() 的返回值：绑定的按键仍处于按下状态（系统自动重复）
+REPEAT = object()
+
+# 特殊键映射
+KEY_MAP = {
+    "space": Key.space,
+    "tab": Key.tab,
+    "grave": "`",
+}
+
+
+def resolve_key(name: str):
+    """配置中的键名转为 pynput 键（Key 枚举或单个字符）"""
+    if name in KEY_MAP:
+        return KEY_MAP[name]
+    if len(name) == 1:
+        return name.lower()
+    # f1-f12、enter 等具名按键
+    return getattr(Key, name.lower(), name)
+
+
+def modifier_mask(modifiers) -> int:
+    """修饰键名列表转为位掩码"""
+    mask = 0
+    for name in modifiers:
+        mask |= MODIFIER_BITS.get(name, 0)
+    return mask
+
+
+def char_vks(char: str) -> list[int]:
+    """
+    字符键在当前平台上的虚拟键码
+
+    Windows 上字母数字的 vk 即大写字符的编码；X11 上 vk 为 keysym，
+    拉丁字符的 keysym 与字符编码相同。其他平台返回空列表，改用字符匹配。
+    """
+    if not char.isascii() or not char.isalnum():
+        return []
+    if sys.platform == "win32":
+        return [ord(char.upper())]
+    if sys.platform.startswith("linux"):
+        return sorted({ord(char.lower()), ord(char.upper())})
+    return []
+
+
+class KeyMatcher:
+    """
+    编译后的热键匹配器
+
+    _table 以 Key 枚举或 vk 为键：值为 int 表示修饰键位，
+    为 dict 表示 {修饰键掩码: 动作}。无法用 vk 表示的字符键放在 _chars 中。
+    绑定过的按键会记录按下状态，按住不放产生的重复按下返回 REPEAT。
+    字符键按下与释放时的 vk / 字符可能随 Shift 变化（X11 上 1 与 ! 是不同的 keysym），
+    释放时对不上，因此松开修饰键时还会丢弃用到该修饰键的绑定键的按下状态，
+    避免残留记录把下一次按下当成重复；按住绑定键时点按其他修饰键不影响重复识别。
+    """
+
+    def __init__(self):
+        self._table: dict = {}
+        self._chars: dict[str, dict[int, object]] = {}
+        self._down: dict = {}  # 处于按下状态的绑定键 -> 其绑定用到的修饰键位
+        self.mask = 0  # 当前按下的修饰键
+
+    def compile(self, bindings: list[tuple[list[str], str, object]]):
+        """
+        编译绑定
+
+        Args:
+            bindings: [(修饰键名列表, 键名, 动作)]，后出现的绑定覆盖先出现的
+        """
+        table: dict = dict(MODIFIER_KEYS)
+        chars: dict[str, dict[int, object]] = {}
+
+        for modifiers, key_name, action in bindings:
+            mask = modifier_mask(modifiers)
+            key = resolve_key(key_name)
+            if isinstance(key, Key):
+                if key in MODIFIER_KEYS:
+                    continue
+                table.setdefault(key, {})[mask] = action
+                continue
+            vks = char_vks(key)
+            for vk in vks:
+                table.setdefault(vk, {})[mask] = action
+            if not vks:
+                for char in {key.lower(), key.upper()}:
+                    chars.setdefault(char, {})[mask] = action
+
+        self._table = table
+        self._chars = chars
+
+    def reset(self):
+        """清空按键状态"""
+        self.mask = 0
+        self._down.clear()
+
+    def press(self, key):
+        """
+        处理按键按下
+
+        Returns:
+            匹配到的动作；未匹配返回 None；绑定键的自动重复返回 REPEAT
+        """
+        if key.__class__ is KeyCode:
+            ident = key.vk
+            entry = self._table.get(ident)
+            if entry is None:
+                if not self._chars:
+                    return None
+                ident = key.char
+                entry = self._chars.get(ident)
+                if entry is None:
+                    return None
+        else:
+            ident = key
+            entry = self._table.get(key)
+            if entry is None:
+                return None
+
+        if entry.__class__ is int:
+            self.mask |= entry
+            return None
+        if ident in self._down:
+            # 只有当前组合确实绑定了动作时才算热键的重复，否则按普通输入处理
+            return REPEAT if self.mask in entry else None
+        bits = 0
+        for mask in entry:
+            bits |= mask
+        self._down[ident] = bits
+        return entry.get(self.mask)
+
+    def release(self, key):
+        """处理按键释放"""
+        if key.__class__ is KeyCode:
+            if self._down:
+                self._down.pop(key.vk, None)
+                self._down.pop(key.char, None)
+            return
+        bit = MODIFIER_KEYS.get(key)
+        if bit is not None:
+            self.mask &= ~bit
+            if self._down:
+                self._down = {ident: bits for ident, bits in self._down.items() if not bits & bit}
+        elif self._down:
+            self._down.pop(key, None)
+
+
+class HotkeyFilter:
+    """
+    热键过滤器
+
+    在键盘钩子线程（或钩子子进程）中运行，只把命中的绑定交给 sink。
+    绑定分两类：立即触发（弹出面板）；等修饰键全部松开后触发（直接输出，
+    避免粘贴时修饰键仍处于按下状态）。立即触发绑定的修饰键刚好按齐时
+    提前通知 PREPARE，便于在主键按下前预热弹出面板。
+
+    设置了缩写时，未命中绑定的按键还会交给缩写自动机，输入完成的缩写以
+    abbrev_index(n) 交给 sink。
+    """
+
+    def __init__(self, sink):
+        """
+        Args:
+            sink: 命中回调，参数为绑定序号、REPEAT_DROPPED 或 PREPARE
+        """
+        self._sink = sink
+        self._matcher = KeyMatcher()
+        self._on_release_actions: set[int] = set()
+        self._prepare_masks: frozenset[int] = frozenset()
+        self._abbrev: AbbrevMatcher | None = None
+        self._pending: int | None = None
+
+    def compile(self, entries: list[tuple[list[str], str, bool]]):
+        """
+        编译绑定
+
+        Args:
+            entries: [(修饰键名列表, 键名, 是否等修饰键松开后触发)]，
+                     序号即在列表中的位置
+        """
+        self._matcher.compile([
+            (modifiers, key, index) for index, (modifiers, key, _) in enumerate(entries)
+        ])
+        self._on_release_actions = {
+            index for index, (_, _, on_release) in enumerate(entries) if on_release
+        }
+        self._prepare_masks = frozenset(
+            modifier_mask(modifiers) for modifiers, _, on_release in entries
+            if modifiers and not on_release
+        )
+        self._pending = None
+
+    def set_abbreviations(self, abbreviations: list[str]):
+        """设置缩写，空列表表示不展开"""
+        self._abbrev = AbbrevMatcher(abbreviations) if abbreviations else None
+
+    def reset(self):
+        """清空按键状态"""
+        self._matcher.reset()
+        if self._abbrev is not None:
+            self._abbrev.reset()
+        self._pending = None
+
+    def _feed_abbrev(self, key):
+        """把未命中绑定的按键交给缩写自动机"""
+        abbrev = self._abbrev
+        if key.__class__ is KeyCode:
+            char = key.char
+            # 快捷键（Ctrl/Alt 组合）和无字符的按键打断输入
+            if char is None or self._matcher.mask & (MOD_CTRL | MOD_ALT):
+                abbrev.reset()
+                return
+        elif key is Key.space:
+            char = " "
+        elif key is Key.backspace:
+            abbrev.back()
+            return
+        elif key in MODIFIER_KEYS:
+            return
+        else:
+            # 方向键、回车等会移动光标
+            abbrev.reset()
+            return
+        match = abbrev.feed(char)
+        if match is not None:
+            self._sink(abbrev_index(match))
+
+    def on_press(self, key):
+        """按键按下"""
+        matcher = self._matcher
+        mask = matcher.mask
+        index = matcher.press(key)
+        if index is None:
+            if matcher.mask != mask and matcher.mask in self._prepare_masks:
+                self._sink(PREPARE)
+            if self._abbrev is not None:
+                self._feed_abbrev(key)
+            return
+        if index is REPEAT:
+            # 重复按下在钩子中直接丢弃，只通知计数
+            self._sink(REPEAT_DROPPED)
+            return
+        if index in self._on_release_actions:
+            self._pending = index
+        else:
+            self._sink(index)
+
+    def on_release(self, key):
+        """按键释放"""
+        self._matcher.release(key)
+        if self._pending is not None and not self._matcher.mask:
+            index = self._pending
+            self._pending = None
+            self._sink(index)
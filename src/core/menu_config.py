@@ -10,6 +10,7 @@ class SubMenuItem:
     label: str
     icon: str
     color: str
+    abbrev: str = ""  # 缩写展开中使用的简写
 
 
 @dataclass
@@ -20,15 +21,16 @@ class MenuItem:
     has_submenu: bool
     template: str | Callable[[str], str] = ""
     cursor_offset: int | Callable[[str], int] = 0
+    abbrev: str = ""  # 缩写展开中使用的简写（与子菜单简写拼接）
 
 
 # 子菜单选项（用于提醒、折叠、方块）
 SUB_MENU_ITEMS = [
-    SubMenuItem("primary", "primary", "+", "#9333ea"),
-    SubMenuItem("info", "info", "i", "#0ea5e9"),
-    SubMenuItem("warning", "warning", "!", "#eab308"),
-    SubMenuItem("success", "success", "✓", "#22c55e"),
-    SubMenuItem("danger", "danger", "-", "#ef4444"),
+    SubMenuItem("primary", "primary", "+", "#9333ea", abbrev="prim"),
+    SubMenuItem("info", "info", "i", "#0ea5e9", abbrev="info"),
+    SubMenuItem("warning", "warning", "!", "#eab308", abbrev="warn"),
+    SubMenuItem("success", "success", "✓", "#22c55e", abbrev="ok"),
+    SubMenuItem("danger", "danger", "-", "#ef4444", abbrev="dang"),
 ]
 
 
@@ -68,6 +70,7 @@ MENU_ITEMS = [
         has_submenu=False,
         template="[]{.rainbow}",
         cursor_offset=11,  # 从末尾往前数11个字符到[]中间
+        abbrev="rb",
     ),
     MenuItem(
         key="reminder",
@@ -82,6 +85,7 @@ MENU_ITEMS = [
         has_submenu=True,
         template=_fold_template,
         cursor_offset=_fold_offset,
+        abbrev="f",
     ),
     MenuItem(
         key="block",
@@ -89,6 +93,7 @@ MENU_ITEMS = [
         has_submenu=True,
         template=_block_template,
         cursor_offset=_block_offset,
+        abbrev="b",
     ),
     MenuItem(
         key="card",
@@ -96,6 +101,7 @@ MENU_ITEMS = [
         has_submenu=False,
         template=";;;[id] []\r\n\r\n;;;",
         cursor_offset=5,  # 从末尾往前数5个字符到空行位置
+        abbrev="card",
     ),
 ]
 
@@ -121,3 +127,14 @@ def get_output(menu_key: str, sub_key: str | None = None) -> tuple[str, int]:
                 offset = item.cursor_offset if isinstance(item.cursor_offset, int) else 0
             return text, offset
     return "", 0
+
+
+def template_texts() -> list[str]:
+    """所有模板（有子菜单的按每个子菜单展开）的输出文本"""
+    texts = []
+    for item in MENU_ITEMS:
+        if item.has_submenu:
+            texts.extend(get_output(item.key, sub_item.key)[0] for sub_item in SUB_MENU_ITEMS)
+        else:
+            texts.append(get_output(item.key)[0])
+    return texts
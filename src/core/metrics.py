@@ -0,0 +1,54 @@
+"""运行时指标（计数器、时间点、内存占用）"""
+import time
+from collections import Counter
+
+# 模块首次导入的时间，入口尽早导入本模块即可近似为启动时间
+_START = time.perf_counter()
+
+_marks: dict[str, float] = {}
+_counters: Counter[str] = Counter()
+
+
+def mark(name: str):
+    """记录时间点（相对启动的毫秒数，只记录第一次）"""
+    if name not in _marks:
+        _marks[name] = (time.perf_counter() - _START) * 1000
+
+
+def incr(name: str, n: int = 1):
+    """计数器累加"""
+    _counters[name] += n
+
+
+def counter(name: str) -> int:
+    """读取计数器"""
+    return _counters[name]
+
+
+def process_uptime_ms() -> float | None:
+    """进程真实启动至今的毫秒数（含解释器启动），psutil 不可用时返回 None"""
+    try:
+        import psutil
+        return (time.time() - psutil.Process().create_time()) * 1000
+    except Exception:
+        return None
+
+
+def rss_bytes() -> int | None:
+    """当前进程常驻内存"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except Exception:
+        return None
+
+
+def snapshot() -> dict:
+    """导出当前所有指标"""
+    rss = rss_bytes()
+    return {
+        "marks_ms": {name: round(value, 1) for name, value in _marks.items()},
+        "counters": dict(_counters),
+        "uptime_ms": process_uptime_ms(),
+        "rss_mb": round(rss / 1024 / 1024, 1) if rss is not None else None,
+    }
@@ -1,73 +1,236 @@
 """文本输出处理"""
 import time
-import pyperclip
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
 import pyautogui
 
+from src.core import clipboard
+from src.core.profiles import DEFAULT_PROFILE, OutputProfile
+from src.core.transform import SEGMENT_MODES, apply_template
+
+if TYPE_CHECKING:
+    from src.core.selection import SelectionProvider
+
+# Ctrl+C 后以该间隔（秒）检查剪贴板序列号，一旦变化立即继续；最长等待时间见 OutputProfile.copy_ms
+COPY_POLL_INTERVAL = 0.005
+
+
+@dataclass
+class OutputObservation:
+    """一次输出中测得的目标程序行为（供 TimingModel 学习）"""
+    copy_ms: float | None = None  # Ctrl+C 到剪贴板变化的延迟，未测到时为 None
+    paste_ms: float | None = None  # 粘贴到选区被替换的延迟（经选中文字提供者测得），未测到时为 None
+    clobbered: bool = False  # 写入后、粘贴完成前剪贴板被改写（如迟到的复制），粘贴的不是模板
+    selected_chars: int = 0  # 选中文字的长度（只记录长度，供会话记录使用）
+    selection_provider: str = ""  # 读到选中文字的提供者，空串表示使用了 Ctrl+C
+    selection_ms: float | None = None  # 提供者读取选中文字的耗时
+
+
+def _read_original_clipboard() -> bytes | str:
+    """读取输出前的剪贴板内容"""
+    try:
+        return clipboard.get_raw()
+    except Exception:
+        return ""
+
+
+def _copy_selection(
+    original: bytes | str, timeout: float, observation: OutputObservation
+) -> bytes | str:
+    """
+    模拟 Ctrl+C 获取选中文字
+
+    支持剪贴板序列号时以序列号是否变化判断有无选中，不比较内容；
+    否则只能比较内容（与原剪贴板不同且非空）。
+
+    Args:
+        original: 原剪贴板内容
+        timeout: 等待剪贴板变化的最长时间（秒）
+        observation: 测到剪贴板变化时记录延迟
+
+    Returns:
+        选中文字的原始表示，没有选中时为空
+    """
+    before = clipboard.sequence_number()
+    pyautogui.hotkey("ctrl", "c")
+
+    if before is None:
+        time.sleep(timeout)
+        try:
+            selected = clipboard.get_raw()
+        except Exception:
+            return ""
+        return selected if selected and selected != original else ""
+
+    start = time.monotonic()
+    deadline = start + timeout
+    while clipboard.sequence_number() == before:
+        if time.monotonic() >= deadline:
+            return b""
+        time.sleep(COPY_POLL_INTERVAL)
+    observation.copy_ms = (time.monotonic() - start) * 1000
+    try:
+        return clipboard.get_raw()
+    except Exception:
+        return b""
+
+
+def _read_selection(
+    provider: "SelectionProvider | None", profile: OutputProfile, observation: OutputObservation
+) -> str | None:
+    """通过选中文字提供者读取选区（最多等待 copy_ms），无法判断或超时返回 None（回退到 Ctrl+C）"""
+    if provider is None or not profile.native_selection:
+        return None
+    start = time.monotonic()
+    selected = provider.read(timeout=profile.copy_ms / 1000)
+    if selected is not None:
+        observation.selection_provider = provider.name
+        observation.selection_ms = (time.monotonic() - start) * 1000
+    return selected
+
+
+def _wait_paste(provider: "SelectionProvider", timeout: float, observation: OutputObservation):
+    """
+    粘贴后等待目标程序完成粘贴
 
-def output_text(text: str, cursor_left_offset: int = 0):
+    包裹选中文字时，粘贴完成后选区被替换，提供者读到的选中文字变为空串。
+    以 COPY_POLL_INTERVAL 轮询，完成后立即返回并记录延迟；超时按等待时间的两倍记录
+    （同 TCP 超时后的退避），估计值因此能回升，不会停在已缩短的等待时间上。
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            observation.paste_ms = timeout * 2000
+            return
+        if provider.read(timeout=remaining) == "":
+            observation.paste_ms = (time.monotonic() - start) * 1000
+            return
+        time.sleep(min(COPY_POLL_INTERVAL, max(deadline - time.monotonic(), 0)))
+
+
+def wrap_parts(text: str, selected: bytes | str, cursor_left_offset: int) -> list[bytes | str]:
+    """
+    包裹模式的输出分段
+
+    选中文字插入到模板的光标位置（从末尾往前数 cursor_left_offset 个字符），
+    没有偏移量时追加在末尾。只切分模板，不拼接选中文字。
+    """
+    if cursor_left_offset > 0:
+        insert_pos = len(text) - cursor_left_offset
+        return [text[:insert_pos], selected, text[insert_pos:]]
+    return [text, selected]
+
+
+def _move_left(count: int, profile: OutputProfile):
+    """光标左移 count 个字符"""
+    for _ in range(count):
+        pyautogui.press("left")
+        time.sleep(profile.key_interval_ms / 1000)
+
+
+def _type_text(text: str, cursor_left_offset: int, erase: int, profile: OutputProfile):
+    """模拟键入输出（不使用剪贴板，也不包裹选中文字）"""
+    if erase > 0:
+        pyautogui.press("backspace", presses=erase)
+    # \r\n 按一次回车
+    pyautogui.write(text.replace("\r\n", "\n").replace("\r", "\n"), interval=profile.key_interval_ms / 1000)
+    time.sleep(profile.paste_ms / 1000)
+    tail = text[len(text) - cursor_left_offset:] if cursor_left_offset > 0 else ""
+    _move_left(len(tail.replace("\r\n", "\n")), profile)
+
+
+def output_text(
+    text: str,
+    cursor_left_offset: int = 0,
+    erase: int = 0,
+    segment: str = "",
+    restore: bool = True,
+    profile: OutputProfile | None = None,
+    wrap: bool = True,
+    selection: "SelectionProvider | None" = None,
+) -> OutputObservation:
     """
     输出文本并定位光标
 
     Args:
         text: 要输出的文本
         cursor_left_offset: 光标需要左移的字符数
+        erase: 输出前先退格删除的字符数（缩写展开时删除已输入的缩写）
+        segment: 有选中文字时按行（"line"）或按段（"paragraph"）分别套用模板，空串为整体包裹
+        restore: 输出后立即恢复原剪贴板文本；为 False 时由调用方负责恢复（见 OutputQueue）
+        profile: 目标程序的输出配置（粘贴热键、换行、等待时间），默认使用 DEFAULT_PROFILE
+        wrap: 为 False 时原样插入，不复制选中文字（剪贴板历史）
+        selection: 选中文字提供者，能读到选区时不再模拟 Ctrl+C
+
+    Returns:
+        测得的目标程序行为
     """
-    # 保存原剪贴板内容
-    try:
-        original_clipboard = pyperclip.paste()
-    except Exception:
-        original_clipboard = ""
+    profile = profile or DEFAULT_PROFILE
+    observation = OutputObservation()
+    if cursor_left_offset > 0:
+        # 分别转换光标前后两部分，光标偏移量随之变化
+        insert_pos = len(text) - cursor_left_offset
+        tail = profile.convert_newlines(text[insert_pos:])
+        text = profile.convert_newlines(text[:insert_pos]) + tail
+        cursor_left_offset = len(tail)
+    else:
+        text = profile.convert_newlines(text)
 
-    # 检测是否有选中文字（通过 Ctrl+C 获取）
-    pyautogui.hotkey("ctrl", "c")
-    time.sleep(0.05)
+    if profile.types(text):
+        _type_text(text, cursor_left_offset, erase, profile)
+        return observation
 
-    try:
-        selected_text = pyperclip.paste()
-    except Exception:
-        selected_text = ""
-
-    # 判断是否有选中内容（与原剪贴板不同且非空）
-    has_selection = selected_text and selected_text != original_clipboard
-
-    if has_selection:
-        # 包裹模式：将选中文字插入到模板中光标位置
-        # 计算插入位置（从末尾往前数 cursor_left_offset 个字符）
-        if cursor_left_offset > 0:
-            insert_pos = len(text) - cursor_left_offset
-            wrapped_text = text[:insert_pos] + selected_text + text[insert_pos:]
-        else:
-            # 如果没有偏移量，直接追加
-            wrapped_text = text + selected_text
-
-        # 写入包裹后的文本到剪贴板
-        pyperclip.copy(wrapped_text)
-        time.sleep(0.05)
-
-        # 粘贴
-        pyautogui.hotkey("ctrl", "v")
-        time.sleep(0.05)
-
-        # 光标定位：定位到选中文字后面（即原来的 cursor_left_offset 位置）
-        if cursor_left_offset > 0:
-            for _ in range(cursor_left_offset):
-                pyautogui.press("left")
-                time.sleep(0.01)
+    # 保存原剪贴板内容；不在这里恢复且能用序列号判断选中时不需要读取
+    if restore or clipboard.sequence_number() is None:
+        original_clipboard = _read_original_clipboard()
     else:
-        # 原有逻辑：无选中文字时直接输出模板
-        pyperclip.copy(text)
-        time.sleep(0.05)
+        original_clipboard = b""
 
-        pyautogui.hotkey("ctrl", "v")
-        time.sleep(0.05)
+    if erase > 0:
+        # 刚输入完缩写，不会有选中文字
+        pyautogui.press("backspace", presses=erase)
+        selected = ""
+    elif not wrap:
+        selected = ""
+    else:
+        selected = _read_selection(selection, profile, observation)
+        if selected is None:
+            selected = _copy_selection(original_clipboard, profile.copy_ms / 1000, observation)
+        # Windows 上原始剪贴板数据是 UTF-16LE 字节
+        observation.selected_chars = len(selected) // 2 if isinstance(selected, bytes) else len(selected)
 
-        if cursor_left_offset > 0:
-            for _ in range(cursor_left_offset):
-                pyautogui.press("left")
-                time.sleep(0.01)
+    if selected and segment in SEGMENT_MODES:
+        # 批量模式：逐段套用模板后一次粘贴，光标留在整块输出的末尾
+        clipboard.set_parts(["".join(
+            apply_template(text, cursor_left_offset, clipboard.to_text(selected), segment)
+        )])
+        cursor_left_offset = 0
+    elif selected:
+        # 包裹模式：选中文字作为单独一段写入剪贴板，不与模板拼接成新字符串
+        clipboard.set_parts(wrap_parts(text, selected, cursor_left_offset))
+    else:
+        clipboard.set_parts([text])
+    written = clipboard.sequence_number()
+    time.sleep(profile.settle_ms / 1000)
 
-    # 恢复原剪贴板内容
-    try:
-        pyperclip.copy(original_clipboard)
-    except Exception:
-        pass
+    pyautogui.hotkey(*profile.paste_keys)
+    if selected and observation.selection_provider:
+        # 选区是提供者读到的，可以观察它何时被替换，不必等满 paste_ms
+        _wait_paste(selection, profile.paste_ms / 1000, observation)
+    else:
+        time.sleep(profile.paste_ms / 1000)
+    observation.clobbered = written is not None and clipboard.sequence_number() != written
+
+    # 光标定位：包裹模式下即选中文字之后
+    _move_left(cursor_left_offset, profile)
+
+    if restore:
+        # 恢复原剪贴板内容
+        try:
+            clipboard.set_parts([original_clipboard])
+        except Exception:
+            pass
+    return observation
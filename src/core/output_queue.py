@@ -0,0 +1,262 @@
+"""串行输出队列"""
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable
+from PySide6.QtCore import QObject, QTimer
+
+from src.core import clipboard, metrics
+from src.core.clipboard_snapshot import ClipboardSnapshot
+from src.core.output import OutputObservation, output_text
+from src.core.profiles import ProfileResolver, foreground_window
+
+# 会话记录、输出时间学习与选中文字提供者都是可选的，由调用方按配置导入后设置
+if TYPE_CHECKING:
+    from src.core import recorder
+    from src.core.selection import SelectionProvider
+    from src.core.timing import TimingModel
+
+# 输出后等待目标程序读取剪贴板（完成粘贴）的时间，之后再恢复原剪贴板
+RESTORE_DELAY_MS = 500
+# 能识别前台窗口时以该间隔检查焦点是否已离开本程序（弹出面板隐藏后），delay_ms 只是上限
+FOCUS_POLL_MS = 5
+# 输出时间记录的延迟写盘
+TIMING_FLUSH_DELAY_MS = 5000
+
+
+@dataclass
+class OutputTiming:
+    """单次输出的耗时（毫秒）"""
+    queued_ms: float  # 在队列中等待的时间（含延迟）
+    output_ms: float  # output_text 执行时间
+    error: str = ""  # 输出失败时的错误信息
+
+    @property
+    def total_ms(self) -> float:
+        return self.queued_ms + self.output_ms
+
+
+@dataclass
+class _OutputJob:
+    text: str
+    offset: int
+    delay_ms: int
+    callback: Callable[[OutputTiming], None] | None
+    submitted: float
+    erase: int = 0
+    segment: str = ""
+    wrap: bool = True
+    deadline: float = 0.0  # 延迟的截止时间
+
+
+class OutputQueue(QObject):
+    """
+    输出队列
+
+    所有插入请求（弹出面板、本地命令）按提交顺序逐个执行，
+    避免多个剪贴板/按键模拟过程互相交错。
+
+    第一次输出前保存剪贴板的完整快照，队列空闲 RESTORE_DELAY_MS 后再恢复，
+    连续的输出共用同一个快照；期间用户复制了新内容则不恢复。
+
+    设置了 TimingModel 时按前台程序调整等待时间，并记录每次输出测到的延迟与失败。
+    设置了 SessionRecorder 时记录每次输出的排队、复制与输出耗时。
+    设置了 SelectionProvider 时优先通过它读取选中文字，读不到时才模拟 Ctrl+C。
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._jobs: deque[_OutputJob] = deque()
+        self._busy = False
+        self._snapshot: ClipboardSnapshot | None = None
+        self._written_seq: int | None = None  # 输出后的剪贴板序列号
+        self._profiles: ProfileResolver | None = None
+        self._timing: "TimingModel | None" = None
+        self._recorder: "recorder.SessionRecorder | None" = None
+        self._selection: "SelectionProvider | None" = None
+        self._last_app = ""  # 最近一次输出的目标程序
+        self._restore_timer = QTimer(self)
+        self._restore_timer.setSingleShot(True)
+        self._restore_timer.setInterval(RESTORE_DELAY_MS)
+        self._restore_timer.timeout.connect(self.restore_clipboard)
+        self._timing_timer = QTimer(self)
+        self._timing_timer.setSingleShot(True)
+        self._timing_timer.setInterval(TIMING_FLUSH_DELAY_MS)
+        self._timing_timer.timeout.connect(self._flush_timing)
+
+    def submit(
+        self,
+        text: str,
+        offset: int,
+        delay_ms: int = 0,
+        callback: Callable[[OutputTiming], None] | None = None,
+        erase: int = 0,
+        segment: str = "",
+        wrap: bool = True,
+    ):
+        """
+        提交输出请求
+
+        Args:
+            text: 要输出的文本
+            offset: 光标左移偏移量
+            delay_ms: 开始输出前的延迟
+            callback: 完成后回调，参数为耗时统计
+            erase: 输出前先退格删除的字符数
+            segment: 选中文字按行（"line"）或按段（"paragraph"）分别套用模板
+            wrap: 为 False 时原样插入，不复制选中文字
+        """
+        self._jobs.append(
+            _OutputJob(text, offset, delay_ms, callback, time.perf_counter(), erase, segment, wrap)
+        )
+        if not self._busy:
+            self._schedule_next()
+
+    def set_profiles(self, profiles: ProfileResolver | None):
+        """设置按前台程序选择输出配置的解析器，None 时使用默认配置"""
+        self._profiles = profiles
+
+    def set_timing(self, timing: "TimingModel | None"):
+        """设置自动调整等待时间的模型，None 时使用配置中的固定等待时间"""
+        self._timing = timing
+
+    def set_recorder(self, session: "recorder.SessionRecorder | None"):
+        """设置会话记录，None 时不记录"""
+        self._recorder = session
+
+    def set_selection(self, provider: "SelectionProvider | None"):
+        """设置选中文字提供者，None 时只用 Ctrl+C"""
+        self._selection = provider
+
+    def report_failure(self) -> str:
+        """
+        用户确认最近一次输出失败，该程序的等待时间加倍
+
+        Returns:
+            目标程序进程名，无法识别时为空串
+        """
+        if self._timing is not None and self._last_app:
+            self._timing.failure(self._last_app)
+            self._schedule_timing_flush()
+        return self._last_app
+
+    def _schedule_timing_flush(self):
+        if not self._timing_timer.isActive():
+            self._timing_timer.start()
+
+    def _flush_timing(self):
+        if self._timing is not None:
+            self._timing.flush()
+
+    def shutdown(self):
+        """退出前恢复剪贴板并保存输出时间记录"""
+        self.restore_clipboard()
+        self._timing_timer.stop()
+        self._flush_timing()
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    @property
+    def owns_clipboard(self) -> bool:
+        """剪贴板当前的内容是否由输出队列写入（输出中、等待恢复或刚恢复的原内容）"""
+        if self._busy or self._snapshot is not None:
+            return True
+        seq = clipboard.sequence_number()
+        return seq is not None and seq == self._written_seq
+
+    def _clipboard_replaced(self) -> bool:
+        """输出之后剪贴板是否被其他程序改写（平台不支持序列号时无法判断，视为未改写）"""
+        seq = clipboard.sequence_number()
+        return seq is not None and self._written_seq is not None and seq != self._written_seq
+
+    def restore_clipboard(self):
+        """恢复输出前的剪贴板（退出前也会调用）"""
+        self._restore_timer.stop()
+        snapshot, self._snapshot = self._snapshot, None
+        if snapshot is None or self._clipboard_replaced():
+            return
+        try:
+            snapshot.restore()
+        except Exception as e:
+            print(f"恢复剪贴板失败: {e}")
+        self._written_seq = clipboard.sequence_number()
+
+    def _schedule_next(self):
+        if not self._jobs:
+            self._busy = False
+            if self._snapshot is not None:
+                self._restore_timer.start()
+            return
+        self._busy = True
+        job = self._jobs[0]
+        job.deadline = time.perf_counter() + job.delay_ms / 1000
+        # 能识别前台窗口时不必等满 delay_ms，焦点一离开本程序就开始输出
+        delay = FOCUS_POLL_MS if job.delay_ms and foreground_window()[1] else job.delay_ms
+        QTimer.singleShot(delay, self._run_next)
+
+    def _run_next(self):
+        job = self._jobs[0]
+        if job.delay_ms and time.perf_counter() < job.deadline and foreground_window()[1] == os.getpid():
+            QTimer.singleShot(FOCUS_POLL_MS, self._run_next)
+            return
+        self._jobs.popleft()
+        start = time.perf_counter()
+        error = ""
+        self._restore_timer.stop()
+
+        app, profile = self._profiles.resolve() if self._profiles is not None else ("", None)
+        if profile is not None and self._timing is not None:
+            profile = self._timing.tune(app, profile)
+        self._last_app = app
+
+        if profile is not None and profile.types(job.text):
+            pass  # 模拟键入不使用剪贴板
+        elif self._snapshot is None or self._clipboard_replaced():
+            # 剪贴板里还是上一次输出的内容时沿用原来的快照
+            self._snapshot = ClipboardSnapshot.capture()
+        observation = None
+        try:
+            observation = output_text(
+                job.text, job.offset, job.erase, job.segment, restore=False, profile=profile, wrap=job.wrap,
+                selection=self._selection,
+            )
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            print(f"输出失败: {error}")
+        self._written_seq = clipboard.sequence_number()
+        end = time.perf_counter()
+        if observation is not None and observation.selection_provider:
+            metrics.incr(f"selection.{observation.selection_provider}")
+
+        if self._timing is not None and app:
+            if observation is None or observation.clobbered:
+                metrics.incr("output.failed")
+                self._timing.failure(app)
+            else:
+                self._timing.observe(app, observation.copy_ms, observation.paste_ms)
+            self._schedule_timing_flush()
+
+        if self._recorder is not None:
+            self._record(job, observation, (start - job.submitted) * 1000, (end - start) * 1000)
+
+        if job.callback is not None:
+            job.callback(OutputTiming(
+                queued_ms=(start - job.submitted) * 1000,
+                output_ms=(end - start) * 1000,
+                error=error,
+            ))
+        self._schedule_next()
+
+    def _record(self, job: _OutputJob, observation: OutputObservation | None, queued_ms: float, output_ms: float):
+        """写入会话记录（输出失败时选中文字长度记为 0）"""
+        from src.core import recorder
+
+        session = self._recorder
+        session.record(recorder.EVENT_QUEUED, value=queued_ms)
+        if observation is not None and observation.copy_ms is not None:
+            session.record(recorder.EVENT_COPY, value=observation.copy_ms)
+        segment = recorder.SEGMENTS.index(job.segment) if job.segment in recorder.SEGMENTS else 0
+        selected = observation.selected_chars if observation is not None else 0
+        session.record(recorder.EVENT_OUTPUT, segment, job.erase, selected, output_ms)
@@ -0,0 +1,273 @@
+"""按前台程序选择输出方式
+
+不同目标程序对粘贴的要求不同：终端用 Ctrl+Shift+V 或 Shift+Insert，浏览器的富文本编辑器
+会把 \\r\\n 变成两个换行，远程桌面客户端需要更长的等待时间。输出前按前台窗口所属进程名
+选择一个输出配置。前台窗口句柄 + PID 到配置的映射会缓存，重复触发时不再查询进程名。
+本模块不依赖 Qt。
+"""
+import ctypes
+import sys
+from dataclasses import dataclass, fields, replace
+
+STRATEGY_PASTE = "paste"  # 经剪贴板粘贴（默认）
+STRATEGY_TYPE = "type"  # 逐字模拟键入，不使用剪贴板（只对 ASCII 文本生效，其余仍然粘贴）
+STRATEGIES = (STRATEGY_PASTE, STRATEGY_TYPE)
+
+NEWLINE_STYLES = ("keep", "lf", "crlf")
+
+# 缓存的前台窗口数量上限，超过后清空重建
+CACHE_SIZE = 64
+
+
+@dataclass(frozen=True)
+class OutputProfile:
+    """一类目标程序的输出方式"""
+    name: str = "default"
+    paste_keys: tuple[str, ...] = ("ctrl", "v")
+    strategy: str = STRATEGY_PASTE
+    newline: str = "keep"  # keep / lf / crlf，只转换模板文本，不改动选中文字
+    copy_ms: int = 50  # Ctrl+C 后等待剪贴板变化的最长时间
+    settle_ms: int = 50  # 写入剪贴板后、粘贴前的等待
+    paste_ms: int = 50  # 粘贴后、移动光标前的等待
+    key_interval_ms: int = 10  # 移动光标时每次按键的间隔
+    focus_ms: int = 100  # 弹出面板隐藏后等待焦点离开本程序的最长时间（无法识别前台窗口时固定等待）
+    native_selection: bool = True  # 优先通过辅助功能接口读取选中文字，False 时只用 Ctrl+C
+
+    def types(self, text: str) -> bool:
+        """该文本是否以模拟键入方式输出"""
+        return self.strategy == STRATEGY_TYPE and text.isascii()
+
+    def convert_newlines(self, text: str) -> str:
+        """按配置转换模板文本的换行"""
+        if self.newline == "keep" or "\r" not in text and "\n" not in text:
+            return text
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text.replace("\n", "\r\n") if self.newline == "crlf" else text
+
+
+DEFAULT_PROFILE = OutputProfile()
+
+_TERMINAL = {"paste_keys": ("ctrl", "shift", "v"), "newline": "lf"}
+_BROWSER = {"newline": "lf"}
+_REMOTE = {"copy_ms": 300, "settle_ms": 200, "paste_ms": 200, "key_interval_ms": 30}
+
+# 内置配置：进程名（小写）-> 覆盖项
+BUILTIN_PROFILES: dict[str, dict] = {
+    # 终端
+    "windowsterminal.exe": {"paste_keys": ("ctrl", "v"), "newline": "lf"},
+    "mintty.exe": {"paste_keys": ("shift", "insert"), "newline": "lf"},
+    "alacritty.exe": _TERMINAL,
+    "wezterm-gui.exe": _TERMINAL,
+    "gnome-terminal-server": _TERMINAL,
+    "konsole": _TERMINAL,
+    "xfce4-terminal": _TERMINAL,
+    "tilix": _TERMINAL,
+    "alacritty": _TERMINAL,
+    "kitty": _TERMINAL,
+    "wezterm-gui": _TERMINAL,
+    "xterm": {"paste_keys": ("shift", "insert"), "newline": "lf"},
+    # 浏览器
+    "chrome.exe": _BROWSER,
+    "msedge.exe": _BROWSER,
+    "firefox.exe": _BROWSER,
+    "chrome": _BROWSER,
+    "chromium": _BROWSER,
+    "firefox": _BROWSER,
+    # 远程桌面 / 虚拟机
+    "mstsc.exe": _REMOTE,
+    "vmconnect.exe": _REMOTE,
+    "remmina": _REMOTE,
+    "xfreerdp": _REMOTE,
+}
+
+
+def build_profile(name: str, overrides: dict, base: OutputProfile = DEFAULT_PROFILE) -> OutputProfile:
+    """
+    在 base 上应用覆盖项
+
+    Raises:
+        ValueError: 覆盖项无效
+    """
+    known = {f.name for f in fields(OutputProfile)} - {"name"}
+    unknown = set(overrides) - known
+    if unknown:
+        raise ValueError(f"unknown profile option: {', '.join(sorted(unknown))}")
+    values = dict(overrides)
+    if "paste_keys" in values:
+        values["paste_keys"] = tuple(values["paste_keys"])
+    if values.get("strategy", base.strategy) not in STRATEGIES:
+        raise ValueError(f"unknown strategy: {values['strategy']}")
+    if values.get("newline", base.newline) not in NEWLINE_STYLES:
+        raise ValueError(f"unknown newline style: {values['newline']}")
+    for key in ("copy_ms", "settle_ms", "paste_ms", "key_interval_ms", "focus_ms"):
+        if key in values:
+            values[key] = max(int(values[key]), 0)
+    return replace(base, name=name, **values)
+
+
+# ---------- 前台窗口 ----------
+
+_user32 = None
+_x11: tuple | None = None
+
+
+def _foreground_win32() -> tuple[int, int]:
+    """Windows 前台窗口句柄及其进程 PID"""
+    global _user32
+    if _user32 is None:
+        from ctypes import wintypes
+
+        _user32 = ctypes.windll.user32
+        _user32.GetForegroundWindow.restype = wintypes.HWND
+        _user32.GetWindowThreadProcessId.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.DWORD)]
+    hwnd = _user32.GetForegroundWindow() or 0
+    pid = ctypes.c_ulong()
+    if hwnd:
+        _user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+    return hwnd, pid.value
+
+
+def _x11_property(xlib, display, window: int, atom: int) -> int:
+    """读取窗口上第一个 32 位属性值（CARDINAL / WINDOW），不存在时返回 0"""
+    actual_type = ctypes.c_ulong()
+    actual_format = ctypes.c_int()
+    nitems = ctypes.c_ulong()
+    after = ctypes.c_ulong()
+    data = ctypes.POINTER(ctypes.c_ulong)()
+    status = xlib.XGetWindowProperty(
+        display, window, atom, 0, 1, False, 0,  # AnyPropertyType
+        ctypes.byref(actual_type), ctypes.byref(actual_format),
+        ctypes.byref(nitems), ctypes.byref(after), ctypes.byref(data),
+    )
+    if status != 0 or not data:
+        return 0
+    try:
+        return data[0] if nitems.value and actual_format.value == 32 else 0
+    finally:
+        xlib.XFree(data)
+
+
+def _foreground_x11() -> tuple[int, int]:
+    """X11 活动窗口（_NET_ACTIVE_WINDOW）及其 _NET_WM_PID"""
+    global _x11
+    from src.core.hotkey_x11 import _load_xlib, trap_x_errors
+
+    if _x11 is None:
+        _x11 = ()  # 失败时不再重试
+        xlib = _load_xlib()
+        display = xlib.XOpenDisplay(None)
+        if not display:
+            raise OSError("cannot open X display")
+        _x11 = (
+            xlib,
+            display,
+            xlib.XDefaultRootWindow(display),
+            xlib.XInternAtom(display, b"_NET_ACTIVE_WINDOW", False),
+            xlib.XInternAtom(display, b"_NET_WM_PID", False),
+        )
+    if not _x11:
+        return 0, 0
+    xlib, display, root, active_atom, pid_atom = _x11
+
+    # 活动窗口可能在两次查询之间关闭（BadWindow），错误只收集不处理
+    with trap_x_errors(xlib, display):
+        window = _x11_property(xlib, display, root, active_atom)
+        pid = _x11_property(xlib, display, window, pid_atom) if window else 0
+    return window, pid
+
+
+def foreground_window() -> tuple[int, int]:
+    """
+    前台窗口
+
+    Returns:
+        (窗口句柄, 进程 PID)，无法获取时为 0
+    """
+    try:
+        if sys.platform == "win32":
+            return _foreground_win32()
+        if sys.platform.startswith("linux"):
+            return _foreground_x11()
+    except (OSError, AttributeError):
+        pass
+    return 0, 0
+
+
+def process_name(pid: int) -> str:
+    """进程名（小写），psutil 不可用或进程已退出时返回空串"""
+    if not pid:
+        return ""
+    try:
+        import psutil
+        return psutil.Process(pid).name().lower()
+    except Exception:
+        return ""
+
+
+class ProfileResolver:
+    """
+    按前台程序解析输出配置
+
+    配置来自内置配置与用户配置 "output_profiles"（进程名 -> 覆盖项，null 表示禁用内置配置，
+    "default" 覆盖默认配置）。同一窗口句柄 + PID 的结果会缓存。
+    """
+
+    def __init__(self, overrides: dict | None = None):
+        self._default = DEFAULT_PROFILE
+        self._profiles: dict[str, OutputProfile] = {}
+        self._cache: dict[tuple[int, int], tuple[str, OutputProfile]] = {}
+        self.configure(overrides or {})
+
+    def configure(self, overrides: dict):
+        """重新加载配置（清空缓存）"""
+        overrides = dict(overrides)
+        try:
+            self._default = build_profile("default", overrides.pop("default", None) or {})
+        except (TypeError, ValueError) as e:
+            print(f"输出配置 default 无效: {e}")
+            self._default = DEFAULT_PROFILE
+
+        merged: dict[str, dict | None] = {name: dict(values) for name, values in BUILTIN_PROFILES.items()}
+        for name, values in overrides.items():
+            name = name.lower()
+            if values is None:
+                merged[name] = None
+            else:
+                merged[name] = {**(merged.get(name) or {}), **values}
+
+        self._profiles = {}
+        for name, values in merged.items():
+            if values is None:
+                continue
+            try:
+                self._profiles[name] = build_profile(name, values, self._default)
+            except (TypeError, ValueError) as e:
+                print(f"输出配置 {name} 无效: {e}")
+        self._cache.clear()
+
+    @property
+    def default(self) -> OutputProfile:
+        return self._default
+
+    def for_process(self, name: str) -> OutputProfile:
+        """按进程名查找配置"""
+        return self._profiles.get(name.lower(), self._default)
+
+    def resolve(self) -> tuple[str, OutputProfile]:
+        """
+        当前前台程序的输出配置
+
+        Returns:
+            (进程名, 输出配置)，无法识别前台程序时进程名为空串
+        """
+        key = foreground_window()
+        if not key[1]:
+            return "", self._default
+        resolved = self._cache.get(key)
+        if resolved is None:
+            if len(self._cache) >= CACHE_SIZE:
+                self._cache.clear()
+            name = process_name(key[1])
+            resolved = (name, self.for_process(name))
+            self._cache[key] = resolved
+        return resolved
@@ -0,0 +1,161 @@
+"""插入过程记录
+
+开启后把事件时间线写入固定大小的二进制环形文件（默认 4096 条，每条 20 字节），
+旧记录被循环覆盖。只记录事件类型、菜单序号、选中文字长度和耗时，不记录任何文本内容。
+文件通过 mmap 写入，进程异常退出也不会丢失已写入的记录。
+回放见 benchmarks/replay.py。本模块不依赖 Qt，只应在 GUI 线程中调用 record()。
+"""
+import mmap
+import struct
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from src.core.config import CONFIG_PATH
+from src.core.menu_config import MENU_ITEMS, SUB_MENU_ITEMS
+
+RECORD_PATH = CONFIG_PATH.parent / "session.bin"
+
+MAGIC = b"SXRR"
+VERSION = 1
+DEFAULT_CAPACITY = 4096
+HEADER = struct.Struct("<4sHHIIQ")  # 魔数, 版本, 保留, 容量, 下一个写入位置, 已写入总数
+RECORD = struct.Struct("<dBBHIf")  # 时间戳, 事件类型, 参数 1, 参数 2, 长度, 数值（毫秒）
+
+# 事件类型
+EVENT_HOTKEY = 1  # 参数 1: HOTKEY_*；参数 2: 主菜单序号 + 1（和弦超时）；长度: 缩写长度
+EVENT_POPUP_SHOWN = 2  # 参数 1: 层级；数值: 触发到显示的耗时
+EVENT_POPUP_KEY = 3  # 参数 1: 是否为特殊键（Qt 键码 0x01000000 位）；参数 2: 键码低 16 位
+EVENT_SELECT = 4  # 参数 1: 主菜单序号（RAW_TEMPLATE 表示直接给出的文本）；参数 2: 子菜单序号 + 1；长度: 模板长度
+EVENT_OUTPUT = 5  # 参数 1: 分段方式序号；参数 2: 退格删除的字符数；长度: 选中文字长度；数值: 输出耗时
+EVENT_QUEUED = 6  # 数值: 在输出队列中等待的时间
+EVENT_COPY = 7  # 数值: Ctrl+C 到剪贴板变化的延迟
+
+HOTKEY_POPUP = 0
+HOTKEY_BINDING = 1
+HOTKEY_CHORD_STALLED = 2
+HOTKEY_ABBREVIATION = 3
+
+RAW_TEMPLATE = 255
+SEGMENTS = ("", "line", "paragraph")
+
+EVENT_NAMES = {
+    EVENT_HOTKEY: "hotkey",
+    EVENT_POPUP_SHOWN: "popup_shown",
+    EVENT_POPUP_KEY: "popup_key",
+    EVENT_SELECT: "select",
+    EVENT_OUTPUT: "output",
+    EVENT_QUEUED: "queued",
+    EVENT_COPY: "copy",
+}
+
+_MENU_INDEX = {item.key: i for i, item in enumerate(MENU_ITEMS)}
+_SUB_INDEX = {item.key: i for i, item in enumerate(SUB_MENU_ITEMS)}
+
+
+@dataclass(frozen=True)
+class Record:
+    """一条事件记录"""
+    timestamp: float
+    kind: int
+    arg1: int
+    arg2: int
+    size: int
+    value: float
+
+    @property
+    def name(self) -> str:
+        return EVENT_NAMES.get(self.kind, str(self.kind))
+
+
+def menu_index(menu_key: str) -> int:
+    """主菜单 key 对应的序号，未知时为 RAW_TEMPLATE"""
+    return _MENU_INDEX.get(menu_key, RAW_TEMPLATE)
+
+
+def sub_index(sub_key: str | None) -> int:
+    """子菜单 key 对应的序号 + 1，没有子菜单时为 0"""
+    return _SUB_INDEX[sub_key] + 1 if sub_key in _SUB_INDEX else 0
+
+
+def template_keys(arg1: int, arg2: int) -> tuple[str, str | None] | None:
+    """EVENT_SELECT 的参数还原为 (主菜单 key, 子菜单 key)，直接给出的文本返回 None"""
+    if arg1 >= len(MENU_ITEMS):
+        return None
+    sub = SUB_MENU_ITEMS[arg2 - 1].key if 0 < arg2 <= len(SUB_MENU_ITEMS) else None
+    return MENU_ITEMS[arg1].key, sub
+
+
+class SessionRecorder:
+    """事件环形记录文件"""
+
+    def __init__(self, path: Path = RECORD_PATH, capacity: int = DEFAULT_CAPACITY):
+        self._path = path
+        size = HEADER.size + RECORD.size * capacity
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "r+b" if path.exists() else "w+b")
+        try:
+            header = self._file.read(HEADER.size)
+            valid = False
+            if len(header) == HEADER.size:
+                magic, version, _, stored_capacity, _, _ = HEADER.unpack(header)
+                valid = (magic, version, stored_capacity) == (MAGIC, VERSION, capacity)
+            if not valid:
+                # 格式或容量不符时重新开始
+                self._file.truncate(size)
+            self._map = mmap.mmap(self._file.fileno(), size)
+        except (OSError, ValueError):
+            self._file.close()
+            raise
+        if not valid:
+            HEADER.pack_into(self._map, 0, MAGIC, VERSION, 0, capacity, 0, 0)
+        _, _, _, self._capacity, self._next, self._total = HEADER.unpack_from(self._map)
+
+    def record(self, kind: int, arg1: int = 0, arg2: int = 0, size: int = 0, value: float = 0.0):
+        """追加一条记录（超出容量时覆盖最旧的记录）"""
+        if self._map is None:
+            return
+        RECORD.pack_into(
+            self._map,
+            HEADER.size + RECORD.size * self._next,
+            time.time(),
+            kind,
+            min(max(arg1, 0), 0xFF),
+            min(max(arg2, 0), 0xFFFF),
+            min(max(size, 0), 0xFFFFFFFF),
+            value,
+        )
+        self._next = (self._next + 1) % self._capacity
+        self._total += 1
+        HEADER.pack_into(self._map, 0, MAGIC, VERSION, 0, self._capacity, self._next, self._total)
+
+    def close(self):
+        """关闭文件（记录已在写入时落到映射中）"""
+        if self._map is None:
+            return
+        self._map.flush()
+        self._map.close()
+        self._file.close()
+        self._map = None
+
+
+def read_records(path: Path = RECORD_PATH) -> list[Record]:
+    """
+    按时间顺序读取记录文件
+
+    Raises:
+        ValueError: 文件格式不符
+    """
+    data = Path(path).read_bytes()
+    if len(data) < HEADER.size:
+        raise ValueError("record file too short")
+    magic, version, _, capacity, next_slot, total = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION or len(data) < HEADER.size + RECORD.size * capacity:
+        raise ValueError("not a session record file")
+    count = min(total, capacity)
+    first = next_slot if total > capacity else 0
+    records = []
+    for i in range(count):
+        slot = (first + i) % capacity
+        records.append(Record(*RECORD.unpack_from(data, HEADER.size + RECORD.size * slot)))
+    return records
@@ -0,0 +1,355 @@
+"""读取选中文字
+
+输出前需要知道目标程序中选中的文字。模拟 Ctrl+C 再检查剪贴板的方式需要等待目标程序响应，
+而且平台不支持剪贴板序列号时，选中文字与原剪贴板内容相同会被误判为没有选中。
+选中文字提供者通过辅助功能接口直接读取焦点控件的选区：
+
+- uia: Windows UI Automation（焦点控件的 TextPattern）
+- atspi: Linux AT-SPI（当前窗口中焦点控件的 Text 接口，需要 PyGObject）
+- fake: 不依赖系统，用于无界面的测试和基准
+
+提供者只在能确定结果时回答：返回选中文字，确定没有选中时返回空串；焦点控件不支持、
+接口调用失败或超时则返回 None，由 output_text 回退到 Ctrl+C。
+系统接口在专用的后台线程中调用（目标程序无响应时不阻塞界面线程），超时后直接回退，
+后台线程仍在等待时的读取也直接回退。
+
+X11 PRIMARY 选区没有作为提供者：取消选中后很多程序仍保留 PRIMARY，无法判断它是否
+属于当前焦点控件，读到旧的选区会把无关文字包裹进模板。
+"""
+import ctypes
+import queue
+import re
+import sys
+import threading
+from typing import Callable
+
+# 等待后台线程读取选区的默认最长时间（秒），输出时使用输出配置的 copy_ms
+DEFAULT_TIMEOUT = 0.05
+
+PROVIDERS = ("auto", "uia", "atspi", "fake", "off")
+
+
+class SelectionUnavailable(RuntimeError):
+    """当前环境无法使用该提供者"""
+
+
+class SelectionProvider:
+    """选中文字提供者接口"""
+
+    name = "base"
+
+    def read(self, timeout: float = DEFAULT_TIMEOUT) -> str | None:
+        """
+        读取焦点控件中选中的文字
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            选中文字，确定没有选中时为空串，无法判断时为 None
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """释放系统资源"""
+
+
+class ThreadedProvider(SelectionProvider):
+    """在专用后台线程中调用系统接口，read() 超时或线程忙时返回 None"""
+
+    def __init__(self):
+        self._requests: queue.SimpleQueue = queue.SimpleQueue()
+        self._busy = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._failed = False
+
+    def read(self, timeout: float = DEFAULT_TIMEOUT) -> str | None:
+        if self._failed or not self._busy.acquire(blocking=False):
+            return None
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"selection-{self.name}", daemon=True)
+            self._thread.start()
+        done = threading.Event()
+        result: list[str | None] = [None]
+        self._requests.put((done, result))
+        done.wait(max(timeout, 0.001))
+        return result[0]
+
+    def close(self):
+        if self._thread is not None:
+            self._requests.put(None)
+            self._thread = None
+
+    def _run(self):
+        try:
+            self._init_thread()
+        except Exception as e:
+            print(f"选中文字提供者 {self.name} 不可用: {e}")
+            self._failed = True
+            self._busy.release()
+            return
+        while True:
+            request = self._requests.get()
+            if request is None:
+                break
+            done, result = request
+            try:
+                result[0] = self._read_blocking()
+            except Exception:
+                result[0] = None
+            # 先释放再通知：超时后才完成的读取结果被丢弃，下一次读取可以立即开始
+            self._busy.release()
+            done.set()
+        self._close_thread()
+
+    def _init_thread(self):
+        """在后台线程中初始化（失败时该提供者停用）"""
+
+    def _read_blocking(self) -> str | None:
+        raise NotImplementedError
+
+    def _close_thread(self):
+        """后台线程退出前释放资源"""
+
+
+# ---------- Windows UI Automation ----------
+
+CLSID_CUIAUTOMATION = "{ff48dba4-60ef-4201-aa87-54103eef594e}"
+IID_IUIAUTOMATION = "{30cbe57d-d9d0-452a-ab13-7ac5ac4825ee}"
+IID_IUIAUTOMATION_TEXT_PATTERN = "{32eba289-3583-42c9-9c59-3b6d9a1e9b6a}"
+UIA_TEXT_PATTERN_ID = 10014
+
+# 虚函数表序号（IUnknown 占 0-2）
+_RELEASE = 2
+_UIA_GET_FOCUSED_ELEMENT = 8  # IUIAutomation
+_ELEMENT_GET_CURRENT_PATTERN_AS = 14  # IUIAutomationElement
+_TEXT_PATTERN_GET_SELECTION = 5  # IUIAutomationTextPattern
+_RANGE_ARRAY_GET_LENGTH = 3  # IUIAutomationTextRangeArray
+_RANGE_ARRAY_GET_ELEMENT = 4
+_RANGE_GET_TEXT = 12  # IUIAutomationTextRange
+
+_CLSCTX_INPROC_SERVER = 0x1
+_COINIT_MULTITHREADED = 0x0
+
+# 单独的 \r 换行（RichEdit 等控件）按剪贴板的习惯转换为 \r\n
+_LONE_CR = re.compile(r"\r(?!\n)")
+
+
+class _GUID(ctypes.Structure):
+    _fields_ = [
+        ("Data1", ctypes.c_ulong),
+        ("Data2", ctypes.c_ushort),
+        ("Data3", ctypes.c_ushort),
+        ("Data4", ctypes.c_ubyte * 8),
+    ]
+
+
+class UIAutomationProvider(ThreadedProvider):
+    """Windows UI Automation：读取焦点控件 TextPattern 的选区"""
+
+    name = "uia"
+
+    def __init__(self):
+        if sys.platform != "win32":
+            raise SelectionUnavailable("UI Automation requires Windows")
+        super().__init__()
+        self._uia = ctypes.c_void_p()
+
+    @staticmethod
+    def _guid(text: str) -> _GUID:
+        guid = _GUID()
+        ctypes.oledll.ole32.CLSIDFromString(text, ctypes.byref(guid))
+        return guid
+
+    @staticmethod
+    def _method(pointer: ctypes.c_void_p, index: int, *argtypes):
+        """COM 接口方法，失败的 HRESULT 抛出 OSError"""
+        vtable = ctypes.cast(pointer, ctypes.POINTER(ctypes.POINTER(ctypes.c_void_p))).contents
+        prototype = ctypes.WINFUNCTYPE(ctypes.HRESULT, ctypes.c_void_p, *argtypes)
+        function = prototype(vtable[index])
+        return lambda *args: function(pointer, *args)
+
+    @staticmethod
+    def _release(pointer: ctypes.c_void_p):
+        if pointer:
+            vtable = ctypes.cast(pointer, ctypes.POINTER(ctypes.POINTER(ctypes.c_void_p))).contents
+            ctypes.WINFUNCTYPE(ctypes.c_ulong, ctypes.c_void_p)(vtable[_RELEASE])(pointer)
+
+    def _init_thread(self):
+        ole32 = ctypes.oledll.ole32
+        # 后台线程使用多线程套间，UI Automation 客户端不应在界面线程中调用
+        ole32.CoInitializeEx(None, _COINIT_MULTITHREADED)
+        ole32.CoCreateInstance(
+            ctypes.byref(self._guid(CLSID_CUIAUTOMATION)),
+            None,
+            _CLSCTX_INPROC_SERVER,
+            ctypes.byref(self._guid(IID_IUIAUTOMATION)),
+            ctypes.byref(self._uia),
+        )
+        self._text_pattern_iid = self._guid(IID_IUIAUTOMATION_TEXT_PATTERN)
+        oleaut32 = ctypes.windll.oleaut32
+        oleaut32.SysStringLen.argtypes = [ctypes.c_void_p]
+        oleaut32.SysStringLen.restype = ctypes.c_uint
+        oleaut32.SysFreeString.argtypes = [ctypes.c_void_p]
+        self._oleaut32 = oleaut32
+
+    def _close_thread(self):
+        self._release(self._uia)
+        self._uia = ctypes.c_void_p()
+        ctypes.oledll.ole32.CoUninitialize()
+
+    def _bstr(self, bstr: ctypes.c_void_p) -> str:
+        if not bstr:
+            return ""
+        try:
+            return ctypes.wstring_at(bstr, self._oleaut32.SysStringLen(bstr))
+        finally:
+            self._oleaut32.SysFreeString(bstr)
+
+    def _read_blocking(self) -> str | None:
+        method = self._method
+        element = ctypes.c_void_p()
+        method(self._uia, _UIA_GET_FOCUSED_ELEMENT, ctypes.c_void_p)(ctypes.byref(element))
+        if not element:
+            return None
+        pattern = ctypes.c_void_p()
+        ranges = ctypes.c_void_p()
+        try:
+            method(element, _ELEMENT_GET_CURRENT_PATTERN_AS, ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p)(
+                UIA_TEXT_PATTERN_ID, ctypes.byref(self._text_pattern_iid), ctypes.byref(pattern)
+            )
+            if not pattern:
+                return None  # 焦点控件不支持 TextPattern
+            method(pattern, _TEXT_PATTERN_GET_SELECTION, ctypes.c_void_p)(ctypes.byref(ranges))
+            if not ranges:
+                return None
+            length = ctypes.c_int()
+            method(ranges, _RANGE_ARRAY_GET_LENGTH, ctypes.c_void_p)(ctypes.byref(length))
+            parts = []
+            for i in range(length.value):
+                text_range = ctypes.c_void_p()
+                method(ranges, _RANGE_ARRAY_GET_ELEMENT, ctypes.c_int, ctypes.c_void_p)(i, ctypes.byref(text_range))
+                try:
+                    bstr = ctypes.c_void_p()
+                    method(text_range, _RANGE_GET_TEXT, ctypes.c_int, ctypes.c_void_p)(-1, ctypes.byref(bstr))
+                    parts.append(self._bstr(bstr))
+                finally:
+                    self._release(text_range)
+            return _LONE_CR.sub("\r\n", "".join(parts))
+        finally:
+            self._release(ranges)
+            self._release(pattern)
+            self._release(element)
+
+
+# ---------- Linux AT-SPI ----------
+
+class AtspiProvider(ThreadedProvider):
+    """Linux AT-SPI：在当前窗口中查找焦点控件，读取其 Text 接口的选区"""
+
+    name = "atspi"
+
+    def __init__(self):
+        if not sys.platform.startswith("linux"):
+            raise SelectionUnavailable("AT-SPI requires Linux")
+        try:
+            import gi
+            gi.require_version("Atspi", "2.0")
+            from gi.repository import Atspi
+        except (ImportError, ValueError) as e:
+            raise SelectionUnavailable(f"AT-SPI bindings not available: {e}") from e
+        super().__init__()
+        self._atspi = Atspi
+        self._rule = None
+
+    def _init_thread(self):
+        Atspi = self._atspi
+        Atspi.init()
+        self._rule = Atspi.MatchRule.new(
+            Atspi.StateSet.new([Atspi.StateType.FOCUSED]), Atspi.CollectionMatchType.ALL,
+            {}, Atspi.CollectionMatchType.NONE,
+            [], Atspi.CollectionMatchType.NONE,
+            [], Atspi.CollectionMatchType.NONE,
+            False,
+        )
+
+    def _active_window(self):
+        Atspi = self._atspi
+        desktop = Atspi.get_desktop(0)
+        for i in range(desktop.get_child_count()):
+            app = desktop.get_child_at_index(i)
+            if app is None:
+                continue
+            for j in range(app.get_child_count()):
+                window = app.get_child_at_index(j)
+                if window is not None and window.get_state_set().contains(Atspi.StateType.ACTIVE):
+                    return window
+        return None
+
+    def _read_blocking(self) -> str | None:
+        Atspi = self._atspi
+        window = self._active_window()
+        if window is None:
+            return None
+        collection = window.get_collection_iface()
+        if collection is None:
+            return None
+        focused = collection.get_matches(self._rule, Atspi.CollectionSortOrder.CANONICAL, 1, True)
+        if not focused:
+            return None
+        text = focused[0].get_text_iface()
+        if text is None:
+            return None  # 焦点控件不支持 Text 接口
+        parts = []
+        for i in range(text.get_n_selections()):
+            selection = text.get_selection(i)
+            parts.append(text.get_text(selection.start_offset, selection.end_offset))
+        return "".join(parts)
+
+
+# ---------- 测试 ----------
+
+class FakeSelectionProvider(SelectionProvider):
+    """
+    假提供者
+
+    返回 source() 的结果（未提供 source 时返回 text 属性），不需要图形会话。
+    """
+
+    name = "fake"
+
+    def __init__(self, source: Callable[[], str | None] | None = None):
+        self._source = source
+        self.text: str | None = None
+        self.reads = 0
+
+    def read(self, timeout: float = DEFAULT_TIMEOUT) -> str | None:
+        self.reads += 1
+        return self._source() if self._source is not None else self.text
+
+
+def create_provider(kind: str) -> SelectionProvider | None:
+    """
+    创建选中文字提供者
+
+    Args:
+        kind: 见 PROVIDERS，auto 使用当前平台的提供者，off 只用 Ctrl+C
+
+    Returns:
+        提供者，不可用或 off 时为 None（只用 Ctrl+C）
+    """
+    if kind == "fake":
+        return FakeSelectionProvider()
+    if kind == "off":
+        return None
+    if kind == "auto":
+        kind = "uia" if sys.platform == "win32" else "atspi"
+    try:
+        if kind == "uia":
+            return UIAutomationProvider()
+        if kind == "atspi":
+            return AtspiProvider()
+    except SelectionUnavailable as e:
+        print(f"选中文字提供者 {kind} 不可用（{e}），使用 Ctrl+C")
+        return None
+    raise ValueError(f"unknown selection provider: {kind}")
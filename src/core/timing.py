@@ -0,0 +1,199 @@
+"""按目标程序自动调整输出等待时间
+
+输出配置（OutputProfile）里的等待时间按最慢的目标程序设定。这里为每个目标程序记录两种延迟：
+Ctrl+C 后剪贴板变化的延迟（只有支持剪贴板序列号的平台能测到），以及粘贴后选区被替换的延迟
+（包裹选中文字且选区由选中文字提供者读到时测得）。按 TCP 重传超时的算法维护平滑延迟与偏差，
+估计值 = 平滑延迟 + 4 × 偏差，快的程序按估计值分别缩短 copy_ms 与 paste_ms；
+稳定与按键间隔没有测量依据，不会被缩短，只随退避延长。确认失败（粘贴前后剪贴板被改写、输出出错、用户报告）时退避加倍，
+之后每次成功逐渐恢复。数据保存在 timing.json，由调用方延迟调用 flush() 写盘。
+本模块不依赖 Qt。
+"""
+import json
+import os
+from dataclasses import replace
+from pathlib import Path
+
+from src.core.config import CONFIG_PATH
+from src.core.profiles import OutputProfile
+
+TIMING_PATH = CONFIG_PATH.parent / "timing.json"
+
+# 样本数不足时不调整
+MIN_SAMPLES = 3
+# 缩放系数下限（最多缩短到配置值的这一比例）与退避上限
+MIN_SCALE = 0.1
+MAX_BACKOFF = 8.0
+# 每次成功后退避系数的衰减
+BACKOFF_DECAY = 0.9
+# 各等待时间的下限（毫秒）
+MIN_COPY_MS = 20
+MIN_SETTLE_MS = 5
+MIN_PASTE_MS = 5
+MIN_KEY_INTERVAL_MS = 1
+# 所有等待时间的上限（毫秒）
+MAX_WAIT_MS = 2000
+
+
+class _Latency:
+    """一种延迟的平滑估计"""
+    __slots__ = ("srtt", "rttvar", "samples")
+
+    def __init__(self, srtt: float = 0.0, rttvar: float = 0.0, samples: int = 0):
+        self.srtt = srtt
+        self.rttvar = rttvar
+        self.samples = samples
+
+    def add(self, latency_ms: float):
+        if self.samples == 0:
+            self.srtt = latency_ms
+            self.rttvar = latency_ms / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - latency_ms)
+            self.srtt = 0.875 * self.srtt + 0.125 * latency_ms
+        self.samples += 1
+
+    @property
+    def value_ms(self) -> float:
+        return self.srtt + 4 * self.rttvar
+
+    def scale(self, configured_ms: int) -> float:
+        """相对配置值的缩放系数，样本不足时为 1"""
+        if self.samples < MIN_SAMPLES or configured_ms <= 0:
+            return 1.0
+        return min(max(self.value_ms / configured_ms, MIN_SCALE), 1.0)
+
+    def to_dict(self) -> dict:
+        return {"srtt": round(self.srtt, 2), "rttvar": round(self.rttvar, 2), "samples": self.samples}
+
+    @classmethod
+    def from_dict(cls, values: dict) -> "_Latency":
+        return cls(float(values["srtt"]), float(values["rttvar"]), int(values["samples"]))
+
+
+class _Estimate:
+    """单个目标程序的延迟估计"""
+    __slots__ = ("copy", "paste", "backoff")
+
+    def __init__(self, copy: _Latency | None = None, paste: _Latency | None = None, backoff: float = 1.0):
+        self.copy = copy or _Latency()
+        self.paste = paste or _Latency()
+        self.backoff = backoff
+
+
+class TimingModel:
+    """各目标程序的输出等待时间"""
+
+    def __init__(self, path: Path = TIMING_PATH):
+        self._path = path
+        self._apps: dict[str, _Estimate] = {}
+        self._dirty = False
+        self._load()
+
+    @property
+    def dirty(self) -> bool:
+        """是否有未写盘的修改"""
+        return self._dirty
+
+    def _load(self):
+        """读取记录（复制延迟在顶层，粘贴延迟在 "paste" 下，旧记录没有），格式不符时从空表开始"""
+        try:
+            data = json.loads(self._path.read_text(encoding="utf-8"))
+            for app, values in data.items():
+                self._apps[app] = _Estimate(
+                    _Latency.from_dict(values),
+                    _Latency.from_dict(values["paste"]) if "paste" in values else None,
+                    min(max(float(values.get("backoff", 1.0)), 1.0), MAX_BACKOFF),
+                )
+        except (OSError, ValueError, TypeError, KeyError, AttributeError):
+            self._apps.clear()
+
+    def flush(self):
+        """写盘（先写临时文件再替换）"""
+        if not self._dirty:
+            return
+        data = {
+            app: {**e.copy.to_dict(), "paste": e.paste.to_dict(), "backoff": round(e.backoff, 3)}
+            for app, e in self._apps.items()
+        }
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self._path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+            os.replace(tmp, self._path)
+        except OSError as e:
+            print(f"保存输出时间记录失败: {e}")
+            return
+        self._dirty = False
+
+    def _entry(self, app: str) -> _Estimate:
+        entry = self._apps.get(app)
+        if entry is None:
+            entry = self._apps[app] = _Estimate()
+        return entry
+
+    def observe(self, app: str, copy_latency_ms: float | None, paste_latency_ms: float | None = None):
+        """记录一次成功的输出（附带测得的复制、粘贴延迟时计入估计）"""
+        if not app:
+            return
+        entry = self._entry(app)
+        if copy_latency_ms is not None:
+            entry.copy.add(copy_latency_ms)
+        if paste_latency_ms is not None:
+            entry.paste.add(paste_latency_ms)
+        if entry.backoff > 1.0:
+            entry.backoff = max(1.0, entry.backoff * BACKOFF_DECAY)
+        self._dirty = True
+
+    def failure(self, app: str):
+        """记录一次确认的失败，等待时间加倍"""
+        if not app:
+            return
+        entry = self._entry(app)
+        entry.backoff = min(entry.backoff * 2, MAX_BACKOFF)
+        self._dirty = True
+
+    def scale(self, app: str, profile: OutputProfile) -> float:
+        """该程序 copy_ms 相对配置值的缩放系数（含退避）"""
+        entry = self._apps.get(app)
+        if entry is None:
+            return 1.0
+        return entry.copy.scale(profile.copy_ms) * entry.backoff
+
+    def tune(self, app: str, profile: OutputProfile) -> OutputProfile:
+        """按学到的延迟调整 copy_ms 与 paste_ms，退避时延长所有等待时间"""
+        entry = self._apps.get(app)
+        if entry is None:
+            return profile
+        copy_scale = entry.copy.scale(profile.copy_ms) * entry.backoff
+        paste_scale = entry.paste.scale(profile.paste_ms) * entry.backoff
+        if copy_scale == 1.0 and paste_scale == 1.0 and entry.backoff == 1.0:
+            return profile
+
+        def scaled(value: int, scale: float, minimum: int) -> int:
+            return min(max(round(value * scale), minimum), max(value, MAX_WAIT_MS))
+
+        def backed_off(value: int, minimum: int) -> int:
+            if entry.backoff == 1.0:
+                return value
+            return scaled(value, entry.backoff, minimum)
+
+        return replace(
+            profile,
+            copy_ms=scaled(profile.copy_ms, copy_scale, MIN_COPY_MS),
+            settle_ms=backed_off(profile.settle_ms, MIN_SETTLE_MS),
+            paste_ms=scaled(profile.paste_ms, paste_scale, MIN_PASTE_MS),
+            key_interval_ms=backed_off(profile.key_interval_ms, MIN_KEY_INTERVAL_MS),
+        )
+
+    def describe(self) -> dict:
+        """各程序当前的估计（供 timing 命令查看）"""
+        return {
+            app: {
+                "estimate_ms": round(e.copy.value_ms, 1),
+                "samples": e.copy.samples,
+                "paste_estimate_ms": round(e.paste.value_ms, 1),
+                "paste_samples": e.paste.samples,
+                "backoff": round(e.backoff, 2),
+            }
+            for app, e in self._apps.items()
+        }
@@ -0,0 +1,68 @@
+"""分段批量套用模板
+
+把选中文字按行或按段切分，对每一段分别套用模板（如每行变成一个 []{.label .info}，
+每段放进一个提醒），结果一次粘贴。切分与套用都是生成器，不依赖 Qt。
+"""
+from typing import Iterator
+
+SEGMENT_LINE = "line"
+SEGMENT_PARAGRAPH = "paragraph"
+SEGMENT_MODES = (SEGMENT_LINE, SEGMENT_PARAGRAPH)
+
+
+def iter_segments(text: str, mode: str) -> Iterator[tuple[str, str]]:
+    """
+    按行或按段切分
+
+    Args:
+        text: 选中文字
+        mode: SEGMENT_LINE / SEGMENT_PARAGRAPH
+
+    Returns:
+        (片段, 片段之后的分隔符) 的生成器，分隔符原样保留
+    """
+    if mode == SEGMENT_LINE:
+        # splitlines 在 C 中完成切分，比逐个匹配换行快得多
+        for line in text.splitlines(keepends=True):
+            body = line.rstrip("\r\n")
+            yield body, line[len(body):]
+        return
+
+    # 按段：连续的空白行（连同前一行的换行）作为分隔符，只记录位置，最后按位置切片
+    start = 0  # 当前段的起点
+    body_end = 0  # 最近一个非空白行去掉换行后的结尾
+    pos = 0
+    separator_start = -1  # 正在经过的空白行分隔符起点，-1 表示不在分隔符中
+    for line in text.splitlines(keepends=True):
+        if line.strip():
+            if separator_start >= 0:
+                yield text[start:separator_start], text[separator_start:pos]
+                start = pos
+                separator_start = -1
+            body_end = pos + len(line.rstrip("\r\n"))
+        elif separator_start < 0:
+            separator_start = body_end
+        pos += len(line)
+    if separator_start >= 0:
+        yield text[start:separator_start], text[separator_start:]
+    elif start < len(text):
+        yield text[start:body_end], text[body_end:]
+
+
+def apply_template(text: str, cursor_left_offset: int, selection: str, mode: str) -> Iterator[str]:
+    """
+    对每个片段套用模板
+
+    片段放在模板的光标位置（从末尾往前数 cursor_left_offset 个字符），没有偏移量时
+    追加在模板末尾。空白片段和分隔符原样输出。
+
+    Returns:
+        输出文本分段的生成器（每个片段连同分隔符一段），拼接后即完整输出
+    """
+    insert_pos = len(text) - cursor_left_offset if cursor_left_offset > 0 else len(text)
+    head, tail = text[:insert_pos], text[insert_pos:]
+    for segment, separator in iter_segments(selection, mode):
+        if segment.strip():
+            yield f"{head}{segment}{tail}{separator}"
+        else:
+            yield segment + separator
@@ -1,66 +1,208 @@
 """自动更新模块"""
-import requests
+import json
+import os
 import sys
-from typing import Optional
-from packaging import version
+from PySide6.QtCore import QObject, Signal, QUrl, QFile, QIODevice
+from PySide6.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
+
 from src.core.version import __version__
 
 
-class UpdateChecker:
-    """更新检查器"""
+def is_newer_version(latest: str, current: str) -> bool:
+    """比较版本号，latest 是否比 current 新"""
+    # packaging 只在比较时才导入，避免进入启动导入链
+    from packaging import version
+
+    try:
+        return version.parse(latest) > version.parse(current)
+    except version.InvalidVersion:
+        return False
+
+
+def parse_release(data: dict) -> dict | None:
+    """
+    解析 GitHub Release 数据
+
+    Returns:
+        如果有新版本，返回 {
+            "version": "x.x.x",
+            "setup_url": "setup安装包URL",
+            "portable_url": "单文件exe URL",
+            "onedir_url": "目录版 zip URL",
+            "changelog": "更新日志"
+        }
+        否则返回 None
+    """
+    latest_version = data.get("tag_name", "").lstrip("v")
+    if not latest_version or not is_newer_version(latest_version, __version__):
+        return None
+
+    # 查找 setup、portable exe 和目录版 zip 下载链接
+    setup_url = None
+    portable_url = None
+    onedir_url = None
+
+    for asset in data.get("assets", []):
+        name = asset["name"]
+        if "setup" in name.lower() and name.endswith(".exe"):
+            setup_url = asset["browser_download_url"]
+        elif name.endswith(".exe") and "setup" not in name.lower():
+            portable_url = asset["browser_download_url"]
+        elif name.endswith(".zip") and "onedir" in name.lower():
+            onedir_url = asset["browser_download_url"]
+
+    return {
+        "version": latest_version,
+        "setup_url": setup_url,
+        "portable_url": portable_url,
+        "onedir_url": onedir_url,
+        "changelog": data.get("body", ""),
+    }
+
+
+def build_layout() -> str:
+    """
+    当前程序的打包方式
+
+    Returns:
+        "source": 源码运行；"onefile": 单文件 exe（运行时解压到临时目录）；
+        "onedir": 目录版（依赖文件在 exe 所在目录下）
+    """
+    if not getattr(sys, 'frozen', False):
+        return "source"
+    bundle = os.path.normcase(os.path.abspath(getattr(sys, '_MEIPASS', '')))
+    app_dir = os.path.normcase(os.path.dirname(os.path.abspath(sys.executable)))
+    try:
+        inside = os.path.commonpath([bundle, app_dir]) == app_dir
+    except ValueError:  # 不同盘符
+        inside = False
+    return "onedir" if inside else "onefile"
+
+
+def select_download(update_info: dict, is_installed: bool, layout: str) -> tuple[str, str] | None:
+    """
+    选择与当前版本对应的更新文件
+
+    Returns:
+        (下载链接, 类型 "setup" / "portable" / "onedir")，没有可用文件时返回 None
+    """
+    setup_url = update_info.get("setup_url")
+    portable_url = update_info.get("portable_url")
+    onedir_url = update_info.get("onedir_url")
+
+    if is_installed and setup_url:
+        return setup_url, "setup"
+    if not is_installed and layout == "onedir":
+        # 目录版不能只替换 exe，没有目录版 zip 时只能改用安装版
+        if onedir_url:
+            return onedir_url, "onedir"
+        return (setup_url, "setup") if setup_url else None
+    if not is_installed and portable_url:
+        return portable_url, "portable"
+    # 如果没有对应版本，使用任意可用的
+    if setup_url:
+        return setup_url, "setup"
+    if portable_url:
+        return portable_url, "portable"
+    return None
+
+
+class UpdateChecker(QObject):
+    """
+    更新检查器
+
+    基于 QNetworkAccessManager 的异步实现，所有请求都在 Qt 事件循环中完成，
+    不再为每次检查创建线程。同一时刻最多只有一个检查请求，重复调用 check()
+    会合并到正在进行的请求上。
+    """
 
     REPO_OWNER = "chxcodepro"
     REPO_NAME = "shokax-plugin"
     API_URL = f"https://api.github.com/repos/{REPO_OWNER}/{REPO_NAME}/releases/latest"
 
-    @classmethod
-    def check_update(cls) -> Optional[dict]:
+    CHECK_TIMEOUT_MS = 5000
+    DOWNLOAD_TIMEOUT_MS = 30000
+
+    update_found = Signal(dict)  # 发现新版本
+    no_update = Signal()  # 已是最新版本
+    check_failed = Signal(str)  # 检查失败
+
+    download_progress = Signal(int, int)  # (已下载, 总大小)
+    download_finished = Signal(bool)  # 下载是否成功
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._manager: QNetworkAccessManager | None = None
+        self._check_reply: QNetworkReply | None = None
+        self._download_reply: QNetworkReply | None = None
+        self._download_file: QFile | None = None
+
+    def _network(self) -> QNetworkAccessManager:
+        """延迟创建网络管理器"""
+        if self._manager is None:
+            self._manager = QNetworkAccessManager(self)
+        return self._manager
+
+    def _make_request(self, url: str, timeout_ms: int) -> QNetworkRequest:
+        request = QNetworkRequest(QUrl(url))
+        request.setHeader(QNetworkRequest.UserAgentHeader, f"shokax-plugin/{__version__}")
+        request.setAttribute(
+            QNetworkRequest.RedirectPolicyAttribute,
+            QNetworkRequest.NoLessSafeRedirectPolicy,
+        )
+        request.setTransferTimeout(timeout_ms)
+        return request
+
+    @property
+    def is_checking(self) -> bool:
+        """是否正在检查更新"""
+        return self._check_reply is not None
+
+    def check(self) -> bool:
         """
-        检查是否有新版本
+        异步检查更新，结果通过信号返回
 
         Returns:
-            如果有新版本，返回 {
-                "version": "x.x.x",
-                "setup_url": "setup安装包URL",
-                "portable_url": "单文件exe URL",
-                "changelog": "更新日志"
-            }
-            否则返回 None
+            True: 发起了新的请求
+            False: 已有请求在进行中，本次调用被合并
         """
+        if self._check_reply is not None:
+            return False
+
+        request = self._make_request(self.API_URL, self.CHECK_TIMEOUT_MS)
+        request.setRawHeader(b"Accept", b"application/vnd.github+json")
+        self._check_reply = self._network().get(request)
+        self._check_reply.finished.connect(self._on_check_finished)
+        return True
+
+    def _on_check_finished(self):
+        reply = self._check_reply
+        self._check_reply = None
+        if reply is None:
+            return
+        reply.deleteLater()
+
+        if reply.error() != QNetworkReply.NoError:
+            message = reply.errorString()
+            print(f"检查更新失败: {message}")
+            self.check_failed.emit(message)
+            return
+
         try:
-            response = requests.get(cls.API_URL, timeout=5)
-            response.raise_for_status()
-            data = response.json()
-
-            latest_version = data.get("tag_name", "").lstrip("v")
-            current_version = __version__
-
-            if version.parse(latest_version) > version.parse(current_version):
-                # 查找 setup 和 portable exe 下载链接
-                setup_url = None
-                portable_url = None
-
-                for asset in data.get("assets", []):
-                    name = asset["name"]
-                    if "setup" in name.lower() and name.endswith(".exe"):
-                        setup_url = asset["browser_download_url"]
-                    elif name.endswith(".exe") and "setup" not in name.lower():
-                        portable_url = asset["browser_download_url"]
-
-                return {
-                    "version": latest_version,
-                    "setup_url": setup_url,
-                    "portable_url": portable_url,
-                    "changelog": data.get("body", ""),
-                }
-
-            return None
+            data = json.loads(bytes(reply.readAll()).decode("utf-8"))
+            update_info = parse_release(data)
         except Exception as e:
             print(f"检查更新失败: {e}")
-            return None
+            self.check_failed.emit(str(e))
+            return
 
-    @classmethod
-    def is_installed_version(cls) -> bool:
+        if update_info:
+            self.update_found.emit(update_info)
+        else:
+            self.no_update.emit()
+
+    @staticmethod
+    def is_installed_version() -> bool:
         """
         判断当前是否为安装版本
 
@@ -79,35 +221,65 @@ class UpdateChecker:
             r'appdata\local\programs'
         ])
 
-    @classmethod
-    def download_update(cls, url: str, save_path: str, progress_callback=None) -> bool:
+    @property
+    def is_downloading(self) -> bool:
+        """是否正在下载"""
+        return self._download_reply is not None
+
+    def download(self, url: str, save_path: str) -> bool:
         """
-        下载更新文件
+        异步下载更新文件，数据边接收边写入磁盘
 
-        Args:
-            url: 下载链接
-            save_path: 保存路径
-            progress_callback: 进度回调函数 callback(current, total)
+        进度通过 download_progress 信号通知，结束时发出 download_finished。
 
         Returns:
-            是否下载成功
+            是否成功发起下载
         """
-        try:
-            response = requests.get(url, stream=True, timeout=30)
-            response.raise_for_status()
+        if self._download_reply is not None:
+            return False
 
-            total_size = int(response.headers.get("content-length", 0))
-            downloaded = 0
+        file = QFile(save_path)
+        if not file.open(QIODevice.WriteOnly | QIODevice.Truncate):
+            print(f"下载更新失败: 无法写入 {save_path}")
+            return False
+        self._download_file = file
 
-            with open(save_path, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        if progress_callback:
-                            progress_callback(downloaded, total_size)
+        request = self._make_request(url, self.DOWNLOAD_TIMEOUT_MS)
+        reply = self._network().get(request)
+        reply.readyRead.connect(self._on_download_ready_read)
+        reply.downloadProgress.connect(self._on_download_progress)
+        reply.finished.connect(self._on_download_finished)
+        self._download_reply = reply
+        return True
 
-            return True
-        except Exception as e:
-            print(f"下载更新失败: {e}")
-            return False
+    def cancel_download(self):
+        """取消下载"""
+        if self._download_reply is not None:
+            self._download_reply.abort()
+
+    def _on_download_ready_read(self):
+        if self._download_reply is not None and self._download_file is not None:
+            self._download_file.write(self._download_reply.readAll())
+
+    def _on_download_progress(self, received: int, total: int):
+        self.download_progress.emit(received, max(total, 0))
+
+    def _on_download_finished(self):
+        reply = self._download_reply
+        file = self._download_file
+        self._download_reply = None
+        self._download_file = None
+        if reply is None or file is None:
+            return
+        reply.deleteLater()
+
+        success = reply.error() == QNetworkReply.NoError
+        if success:
+            file.write(reply.readAll())
+        else:
+            print(f"下载更新失败: {reply.errorString()}")
+        file.close()
+        if not success:
+            file.remove()
+
+        self.download_finished.emit(success)
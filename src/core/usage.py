@@ -0,0 +1,164 @@
+"""模板使用统计
+
+按 (主菜单, 子菜单) 记录使用热度，热度随时间指数衰减，兼顾频率与最近使用。
+数据保存在固定大小的二进制文件中（开放寻址表，每项 24 字节），
+record() 只修改内存，由调用方延迟调用 flush() 写盘。本模块不依赖 Qt。
+"""
+import hashlib
+import os
+import struct
+import time
+from pathlib import Path
+
+from src.core.config import CONFIG_PATH
+from src.core.menu_config import MENU_ITEMS, SUB_MENU_ITEMS
+
+USAGE_PATH = CONFIG_PATH.parent / "usage.bin"
+
+MAGIC = b"SXUS"
+VERSION = 1
+SLOTS = 64
+HEADER = struct.Struct("<4sHH")  # 魔数, 版本, 槽数
+RECORD = struct.Struct("<Qdd")  # 键哈希（0 表示空槽）, 热度, 热度对应的时间戳
+
+DEFAULT_HALF_LIFE_DAYS = 7.0
+
+
+def _key_hash(menu_key: str, sub_key: str | None) -> int:
+    """模板键的 64 位哈希（不为 0）"""
+    digest = hashlib.blake2b(f"{menu_key}/{sub_key or ''}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1
+
+
+def template_keys() -> list[tuple[str, str | None]]:
+    """模板注册表中的所有 (主菜单, 子菜单) 键"""
+    keys: list[tuple[str, str | None]] = []
+    for item in MENU_ITEMS:
+        if item.has_submenu:
+            keys.extend((item.key, sub_item.key) for sub_item in SUB_MENU_ITEMS)
+        else:
+            keys.append((item.key, None))
+    return keys
+
+
+class UsageStats:
+    """
+    模板使用统计
+
+    热度在每次使用时先按经过的时间衰减再加 1，半衰期内未使用的模板热度减半。
+    """
+
+    def __init__(self, path: Path = USAGE_PATH, half_life_days: float = DEFAULT_HALF_LIFE_DAYS):
+        self._path = path
+        self._half_life = max(half_life_days, 0.01) * 86400
+        self._hashes = [0] * SLOTS
+        self._scores = [0.0] * SLOTS
+        self._stamps = [0.0] * SLOTS
+        self._dirty = False
+        self._load()
+
+    @property
+    def dirty(self) -> bool:
+        """是否有未写盘的修改"""
+        return self._dirty
+
+    def _load(self):
+        """读取统计文件，格式不符时从空表开始"""
+        try:
+            data = self._path.read_bytes()
+        except OSError:
+            return
+        if len(data) != HEADER.size + RECORD.size * SLOTS:
+            return
+        magic, version, slots = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION or slots != SLOTS:
+            return
+        for i, (key, score, stamp) in enumerate(RECORD.iter_unpack(data[HEADER.size:])):
+            self._hashes[i] = key
+            self._scores[i] = score
+            self._stamps[i] = stamp
+
+    def flush(self):
+        """写盘（先写临时文件再替换，避免中途退出损坏文件）"""
+        if not self._dirty:
+            return
+        data = bytearray(HEADER.pack(MAGIC, VERSION, SLOTS))
+        for i in range(SLOTS):
+            data += RECORD.pack(self._hashes[i], self._scores[i], self._stamps[i])
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self._path.with_suffix(".tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, self._path)
+        except OSError as e:
+            print(f"保存使用统计失败: {e}")
+            return
+        self._dirty = False
+
+    def _find(self, key: int) -> int:
+        """查找键所在的槽，不存在返回 -1"""
+        start = key % SLOTS
+        for probe in range(SLOTS):
+            i = (start + probe) % SLOTS
+            if self._hashes[i] == key:
+                return i
+            if self._hashes[i] == 0:
+                return -1
+        return -1
+
+    def _decayed(self, i: int, now: float) -> float:
+        return self._scores[i] * 0.5 ** ((now - self._stamps[i]) / self._half_life)
+
+    def record(self, menu_key: str, sub_key: str | None = None):
+        """记录一次使用（只修改内存）"""
+        key = _key_hash(menu_key, sub_key)
+        now = time.time()
+        i = self._find(key)
+        if i < 0:
+            i = self._allocate(key, now)
+            self._hashes[i] = key
+            self._scores[i] = 0.0
+        self._scores[i] = self._decayed(i, now) + 1.0
+        self._stamps[i] = now
+        self._dirty = True
+
+    def _allocate(self, key: int, now: float) -> int:
+        """为新键分配槽，表满时淘汰热度最低的槽"""
+        start = key % SLOTS
+        for probe in range(SLOTS):
+            i = (start + probe) % SLOTS
+            if self._hashes[i] == 0:
+                return i
+        # 淘汰后整表重建，保证开放寻址的探测链不断裂
+        victim = min(range(SLOTS), key=lambda j: self._decayed(j, now))
+        entries = [
+            (self._hashes[j], self._scores[j], self._stamps[j]) for j in range(SLOTS) if j != victim
+        ]
+        self._hashes = [0] * SLOTS
+        self._scores = [0.0] * SLOTS
+        self._stamps = [0.0] * SLOTS
+        for h, score, stamp in entries:
+            j = h % SLOTS
+            while self._hashes[j]:
+                j = (j + 1) % SLOTS
+            self._hashes[j], self._scores[j], self._stamps[j] = h, score, stamp
+        j = start
+        while self._hashes[j]:
+            j = (j + 1) % SLOTS
+        return j
+
+    def score(self, menu_key: str, sub_key: str | None = None) -> float:
+        """模板当前的热度"""
+        i = self._find(_key_hash(menu_key, sub_key))
+        return self._decayed(i, time.time()) if i >= 0 else 0.0
+
+    def menu_score(self, menu_key: str) -> float:
+        """主菜单项的热度（含其所有子菜单项）"""
+        return self.score(menu_key) + sum(self.score(menu_key, sub.key) for sub in SUB_MENU_ITEMS)
+
+    def top(self, n: int) -> list[tuple[str, str | None]]:
+        """热度最高的 n 个模板（只含用过的）"""
+        scored = [(self.score(menu, sub), menu, sub) for menu, sub in template_keys()]
+        scored = [entry for entry in scored if entry[0] > 0]
+        scored.sort(key=lambda entry: entry[0], reverse=True)
+        return [(menu, sub) for _, menu, sub in scored[:n]]
@@ -0,0 +1,219 @@
+"""界面线程卡顿检测
+
+后台线程每隔 CHECK_INTERVAL_MS 向界面线程发送一次排队信号（心跳），界面线程处理到该信号时
+应答。超过阈值仍未应答时抓取界面线程当前的 Python 调用栈，应答后记录卡顿时长。
+统计包括时长分布和累计耗时最多的调用栈，可通过 report() 导出，dump() 写入 stalls.json。
+没有卡顿时的开销只是每个间隔一次排队信号。
+
+卡顿时长从发出心跳开始计算，是实际卡顿时长的下限；短于检查间隔的卡顿只有恰好
+覆盖心跳时才会被发现（抽样）。
+"""
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass, field
+from pathlib import Path
+from PySide6.QtCore import QObject, Qt, Signal
+
+from src.core.config import CONFIG_PATH
+
+STALLS_PATH = CONFIG_PATH.parent / "stalls.json"
+
+CHECK_INTERVAL_MS = 500
+DEFAULT_THRESHOLD_MS = 200
+# 分布区间的分界（毫秒）
+STALL_BUCKETS_MS = (500, 1000, 2000, 5000)
+# 调用栈保留的帧数与记录的不同调用栈数量上限
+STACK_DEPTH = 12
+MAX_STACKS = 50
+TOP_STACKS = 5
+
+
+@dataclass
+class _StackStats:
+    """同一调用栈上的卡顿"""
+    frames: list[str]
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+
+@dataclass
+class _Stats:
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(STALL_BUCKETS_MS) + 1))
+    stacks: dict[tuple[str, ...], _StackStats] = field(default_factory=dict)
+
+
+def _bucket_labels() -> list[str]:
+    bounds = STALL_BUCKETS_MS
+    labels = [f"{low}-{high}ms" for low, high in zip(bounds, bounds[1:])]
+    return [f"<{bounds[0]}ms", *labels, f">={bounds[-1]}ms"]
+
+
+def _format_frames(frame) -> list[str]:
+    """调用栈（最内层在后），路径只保留项目内的相对路径或文件名"""
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    frames = []
+    for entry in traceback.extract_stack(frame, limit=STACK_DEPTH):
+        path = entry.filename
+        path = os.path.relpath(path, root) if path.startswith(root) else os.path.basename(path)
+        frames.append(f"{path}:{entry.lineno} {entry.name}")
+    return frames
+
+
+class StallWatchdog(QObject):
+    """
+    界面线程卡顿检测
+
+    必须在界面线程中创建，start() 后由后台线程检测。
+    """
+
+    _ping = Signal()
+
+    def __init__(self, threshold_ms: int = DEFAULT_THRESHOLD_MS, interval_ms: int = CHECK_INTERVAL_MS, parent=None):
+        super().__init__(parent)
+        self._threshold = max(threshold_ms, 1) / 1000
+        self._interval = max(interval_ms, 1) / 1000
+        self._gui_thread = threading.get_ident()
+        self._answered = threading.Event()
+        self._answered_at = 0.0
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._stats = _Stats()
+        self._ping.connect(self._pong, Qt.QueuedConnection)
+
+    @property
+    def threshold_ms(self) -> int:
+        return round(self._threshold * 1000)
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        """开始检测"""
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="stall-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止检测（等待后台线程退出）"""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._answered.set()
+        self._thread.join(timeout=1.0)
+        self._thread = None
+
+    def _pong(self):
+        """界面线程应答心跳"""
+        self._answered_at = time.monotonic()
+        self._answered.set()
+
+    def _run(self):
+        expected = time.monotonic() + self._interval
+        while not self._stopping.wait(max(expected - time.monotonic(), 0)):
+            now = time.monotonic()
+            late = now - expected
+            expected = now + self._interval
+            if late > self._threshold:
+                # 检测线程自己被延误（系统休眠、整个进程被挂起），不算界面卡顿
+                continue
+            self._answered.clear()
+            sent = time.monotonic()
+            self._ping.emit()
+            if self._answered.wait(self._threshold):
+                continue
+            frames = self._gui_stack()
+            last = time.monotonic()
+            suspended = False
+            while not self._answered.wait(self._interval):
+                if self._stopping.is_set():
+                    return
+                now = time.monotonic()
+                suspended = suspended or now - last > self._interval + self._threshold
+                last = now
+            if self._stopping.is_set():
+                return
+            if not suspended:
+                self._record((self._answered_at - sent) * 1000, frames)
+            expected = time.monotonic() + self._interval
+
+    def _gui_stack(self) -> list[str]:
+        frame = sys._current_frames().get(self._gui_thread)
+        return _format_frames(frame) if frame is not None else []
+
+    def _record(self, duration_ms: float, frames: list[str]):
+        with self._lock:
+            stats = self._stats
+            stats.count += 1
+            stats.total_ms += duration_ms
+            stats.max_ms = max(stats.max_ms, duration_ms)
+            index = sum(1 for bound in STALL_BUCKETS_MS if duration_ms >= bound)
+            stats.buckets[index] += 1
+            key = tuple(frames)
+            entry = stats.stacks.get(key)
+            if entry is None:
+                if len(stats.stacks) >= MAX_STACKS:
+                    # 丢弃累计耗时最少的调用栈
+                    del stats.stacks[min(stats.stacks, key=lambda k: stats.stacks[k].total_ms)]
+                entry = stats.stacks[key] = _StackStats(frames)
+            entry.count += 1
+            entry.total_ms += duration_ms
+            entry.max_ms = max(entry.max_ms, duration_ms)
+        where = frames[-1] if frames else "?"
+        print(f"界面卡顿 {duration_ms:.0f} ms: {where}")
+
+    def reset(self):
+        """清空统计"""
+        with self._lock:
+            self._stats = _Stats()
+
+    def report(self, top: int = TOP_STACKS) -> dict:
+        """
+        卡顿统计
+
+        Returns:
+            次数、总时长、最长时长、时长分布与累计耗时最多的 top 个调用栈
+        """
+        with self._lock:
+            stats = self._stats
+            stacks = sorted(stats.stacks.values(), key=lambda s: s.total_ms, reverse=True)[:top]
+            return {
+                "threshold_ms": self.threshold_ms,
+                "interval_ms": round(self._interval * 1000),
+                "stalls": stats.count,
+                "total_ms": round(stats.total_ms, 1),
+                "max_ms": round(stats.max_ms, 1),
+                "histogram": dict(zip(_bucket_labels(), stats.buckets)),
+                "top_stacks": [
+                    {
+                        "count": s.count,
+                        "total_ms": round(s.total_ms, 1),
+                        "max_ms": round(s.max_ms, 1),
+                        "stack": list(s.frames),
+                    }
+                    for s in stacks
+                ],
+            }
+
+    def dump(self, path: Path = STALLS_PATH) -> dict:
+        """
+        把卡顿统计（含全部调用栈）写入 JSON 文件
+
+        Returns:
+            写入的统计
+        """
+        report = self.report(top=MAX_STACKS)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        return report
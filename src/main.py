@@ -1,17 +1,66 @@
 """程序入口"""
+import argparse
+import multiprocessing
 import sys
 import os
 
 # 添加项目根目录到路径
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.app import App
+from src.core import metrics  # noqa: F401  尽早导入，作为启动计时起点
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(prog="shokaX plugin")
+    parser.add_argument(
+        "--command",
+        action="append",
+        metavar="CMD",
+        help="启动后执行的命令，已有实例运行时转发给该实例（默认: show，托盘模式为 start）",
+    )
+    parser.add_argument(
+        "--tray",
+        action="store_true",
+        help="托盘模式启动：不创建主窗口，直接开始监听热键",
+    )
+    parser.add_argument(
+        "--startup-report",
+        action="store_true",
+        help="热键就绪后输出启动指标（JSON）并退出",
+    )
+    return parser.parse_args(argv)
 
 
 def main():
-    app = App()
+    args = parse_args(sys.argv[1:])
+    commands = args.command or (["start"] if args.tray else ["show"])
+
+    # 单实例检查只依赖 QtCore / QtNetwork：已有实例运行时转发命令后立即退出，
+    # 不导入 App 及其子系统，也不创建 QApplication
+    from src.core.ipc import SingleInstance, send_commands
+
+    instance = SingleInstance()
+    if not instance.acquire():
+        from PySide6.QtCore import QCoreApplication
+
+        core_app = QCoreApplication(sys.argv)  # noqa: F841  本地套接字需要应用对象
+        if send_commands(commands) is None:
+            print("无法连接到已运行的实例")
+        sys.exit(0)
+
+    # App 在这里才导入：热键子进程以本文件为入口启动时不会加载 Qt
+    from src.app import App
+
+    app = App(
+        instance,
+        commands=commands,
+        startup_report=args.startup_report,
+    )
     sys.exit(app.run())
 
 
 if __name__ == "__main__":
+    # 打包后热键子进程也从本入口启动，需要先交给 multiprocessing 处理
+    multiprocessing.freeze_support()
     main()
@@ -1,9 +1,15 @@
 """仿输入法弹出选择面板"""
+from typing import TYPE_CHECKING
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel
-from PySide6.QtCore import Qt, Signal, QPoint
-from PySide6.QtGui import QCursor, QPainter, QColor, QFont, QPen, QPainterPath
+from PySide6.QtCore import Qt, Signal, QPoint, QRect
+from PySide6.QtGui import QCursor, QGuiApplication, QPainter, QColor, QFont, QPen, QPainterPath
 
-from src.core.menu_config import MENU_ITEMS, SUB_MENU_ITEMS, get_output
+from src.core.menu_config import MENU_ITEMS, SUB_MENU_ITEMS, MenuItem, SubMenuItem, get_output
+from src.core.transform import SEGMENT_LINE, SEGMENT_PARAGRAPH
+
+if TYPE_CHECKING:
+    from src.core.history import ClipboardHistory
+    from src.core.usage import UsageStats
 
 
 # 指示器颜色
@@ -16,6 +22,31 @@ INDICATOR_COLORS = {
 }
 
 
+# 子菜单指示器图标
+SUB_MENU_ICONS = {
+    "primary": "+",
+    "info": "i",
+    "warning": "!",
+    "success": "✓",
+    "danger": "-",
+}
+
+# 弹出面板排序方式: off（固定顺序）/ reorder（按使用热度排序）/ recent（主菜单末尾追加常用模板）
+RANKING_MODES = ("off", "reorder", "recent")
+
+# 分段方式及面板中的提示（顺序即 Tab 切换顺序）
+SEGMENT_LABELS = {
+    "": "",
+    SEGMENT_LINE: "逐行套用",
+    SEGMENT_PARAGRAPH: "逐段套用",
+}
+
+# 剪贴板历史页：固定数量的行控件反复使用，过滤时只更新文字
+HISTORY_ROWS = 9
+HISTORY_WIDTH = 320
+PANEL_WIDTH = 140
+
+
 class CircleIndicator(QWidget):
     """圆形指示器（用于提醒）"""
 
@@ -136,6 +167,10 @@ class MenuItemWidget(QWidget):
         self.setFixedHeight(26)
         self.setCursor(Qt.PointingHandCursor)
 
+    def set_text(self, text: str):
+        """更新文本（剪贴板历史页复用行控件）"""
+        self._text_label.setText(text)
+
     def set_selected(self, selected: bool):
         """设置选中状态"""
         self._selected = selected
@@ -174,7 +209,10 @@ class MenuItemWidget(QWidget):
 class PopupPanel(QWidget):
     """弹出选择面板"""
 
-    output_selected = Signal(str, int)
+    output_selected = Signal(str, int, str)  # 文本, 光标偏移, 分段方式（空串为整体包裹）
+    template_selected = Signal(str, str)  # 选中的模板 (主菜单 key, 子菜单 key 或空串)
+    key_pressed = Signal(int)  # 面板收到的按键（Qt 键码，供会话记录使用）
+    history_selected = Signal(str)  # 选中的剪贴板历史内容
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -182,6 +220,18 @@ class PopupPanel(QWidget):
         self._selected_index = 0
         self._current_menu_key = ""
         self._menu_items: list[MenuItemWidget] = []
+        self._entries: list = []  # 当前层级显示的条目，与 _menu_items 一一对应
+        self._screen_rect = QRect()  # 预热时解析的光标所在屏幕可用区域
+
+        self._ranking = "off"
+        self._usage: "UsageStats | None" = None
+        self._recent_count = 4
+        self._main_stale = False  # 使用统计变化后主菜单需要重建
+        self._segment = ""  # Tab 切换的分段方式，每次显示时复位
+
+        self._history: "ClipboardHistory | None" = None
+        self._history_rows: list[MenuItemWidget] = []  # 历史页的行控件，创建后一直复用
+        self._query = ""
 
         self._init_ui()
 
@@ -193,7 +243,7 @@ class PopupPanel(QWidget):
             | Qt.Popup
         )
         self.setAttribute(Qt.WA_TranslucentBackground)
-        self.setFixedWidth(140)
+        self.setFixedWidth(PANEL_WIDTH)
 
         self._container = QWidget(self)
         self._container.setObjectName("popup_panel")
@@ -207,37 +257,212 @@ class PopupPanel(QWidget):
             """
         )
 
-        self._layout = QVBoxLayout(self._container)
-        self._layout.setContentsMargins(4, 4, 4, 4)
+        container_layout = QVBoxLayout(self._container)
+        container_layout.setContentsMargins(4, 4, 4, 4)
+        container_layout.setSpacing(2)
+
+        # 剪贴板历史页的搜索框（只显示输入的文字）
+        self._query_label = QLabel()
+        self._query_label.setStyleSheet(
+            "color: #3f3f46; background: #f4f4f5; border-radius: 4px; padding: 2px 6px; font-size: 12px;"
+        )
+        self._query_label.hide()
+        container_layout.addWidget(self._query_label)
+
+        self._layout = QVBoxLayout()
+        self._layout.setContentsMargins(0, 0, 0, 0)
         self._layout.setSpacing(2)
+        container_layout.addLayout(self._layout)
+
+        # 分段方式提示，整体包裹时隐藏
+        self._segment_label = QLabel()
+        self._segment_label.setAlignment(Qt.AlignCenter)
+        self._segment_label.setStyleSheet(
+            "color: #9333ea; background: #f3e8ff; border-radius: 4px; padding: 2px; font-size: 11px;"
+        )
+        self._segment_label.hide()
+        container_layout.addWidget(self._segment_label)
+
+        # 主菜单底部的剪贴板历史入口提示
+        self._history_hint = QLabel("0 剪贴板历史")
+        self._history_hint.setStyleSheet("color: #a1a1aa; font-size: 10px; padding-left: 6px;")
+        self._history_hint.hide()
+        container_layout.addWidget(self._history_hint)
 
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(0, 0, 0, 0)
         main_layout.addWidget(self._container)
 
-    def show_at_cursor(self):
-        """在光标位置显示"""
-        self._show_main_menu()
-        pos = QCursor.pos()
-        self.move(pos + QPoint(10, 10))
+    def set_ranking(self, mode: str, usage: "UsageStats | None", recent_count: int = 4):
+        """
+        设置排序方式
+
+        Args:
+            mode: 见 RANKING_MODES
+            usage: 使用统计
+            recent_count: recent 模式下追加的常用模板数量（主菜单总数不超过 9）
+        """
+        self._ranking = mode if mode in RANKING_MODES else "off"
+        self._usage = usage
+        self._recent_count = recent_count
+        self._main_stale = True
+
+    @property
+    def in_history(self) -> bool:
+        """是否正在显示剪贴板历史页"""
+        return self._current_level == 2
+
+    def set_history(self, history: "ClipboardHistory | None"):
+        """设置剪贴板历史，None 时主菜单不提供历史页"""
+        self._history = history
+        self._main_stale = True
+
+    def invalidate_ranking(self):
+        """使用统计已变化，下次显示前按新的排序重建主菜单"""
+        if self._ranking != "off":
+            self._main_stale = True
+
+    def prepare(self):
+        """
+        预热
+
+        在不显示的情况下完成主菜单布局、创建原生窗口并解析光标所在屏幕，
+        之后 show_at_cursor 只需移动并显示窗口。面板可见时不做任何事。
+        """
+        if self.isVisible():
+            return
+        if self._current_level != 0 or not self._menu_items or self._main_stale:
+            self._show_main_menu()
+        self.ensurePolished()
+        self.winId()  # 创建原生窗口
+        self._screen_rect = self._screen_geometry(QCursor.pos())
+
+    def release(self):
+        """释放菜单页（空闲时调用），下次预热或显示时重建。面板可见时不做任何事"""
+        if self.isVisible():
+            return
+        self._clear_menu()
+        for row in self._history_rows:
+            row.deleteLater()
+        self._history_rows = []
+        self._entries = []
+        self._main_stale = True
+
+    def show_at_cursor(self, menu_key: str = ""):
+        """
+        在光标位置显示
+
+        Args:
+            menu_key: 非空时直接显示该主菜单项的子菜单
+        """
+        if menu_key:
+            self._show_sub_menu(menu_key)
+        elif self._current_level != 0 or not self._menu_items or self._main_stale:
+            self._show_main_menu()
+        else:
+            # 预热过的主菜单只需复位选中项
+            self._selected_index = 0
+            self._update_selection()
+        self._set_segment("")
+
+        cursor = QCursor.pos()
+        rect = self._screen_rect
+        if not rect.contains(cursor):
+            rect = self._screen_geometry(cursor)
+        pos = cursor + QPoint(10, 10)
+        if rect.isValid():
+            # 靠近屏幕边缘时保持面板完整可见
+            pos = QPoint(
+                max(rect.left(), min(pos.x(), rect.right() - self.width())),
+                max(rect.top(), min(pos.y(), rect.bottom() - self.height())),
+            )
+        self.move(pos)
         self.show()
         self.activateWindow()
         self.setFocus()
 
+    def _set_segment(self, segment: str):
+        """设置分段方式并更新提示"""
+        if segment == self._segment:
+            return
+        self._segment = segment
+        self._segment_label.setText(SEGMENT_LABELS.get(segment, ""))
+        self._segment_label.setVisible(bool(segment))
+        self.adjustSize()
+
+    @staticmethod
+    def _screen_geometry(pos: QPoint) -> QRect:
+        """指定位置所在屏幕的可用区域"""
+        screen = QGuiApplication.screenAt(pos) or QGuiApplication.primaryScreen()
+        return screen.availableGeometry() if screen is not None else QRect()
+
     def _clear_menu(self):
-        """清空菜单"""
+        """清空菜单（历史页的行控件只隐藏）"""
         for item in self._menu_items:
-            item.deleteLater()
+            if self._current_level == 2:
+                item.hide()
+            else:
+                item.deleteLater()
         self._menu_items.clear()
 
+    def _set_history_mode(self, enabled: bool):
+        """切换历史页与菜单页的宽度和提示"""
+        self.setFixedWidth(HISTORY_WIDTH if enabled else PANEL_WIDTH)
+        self._query_label.setVisible(enabled)
+        self._history_hint.setVisible(not enabled and self._history is not None)
+
+    def _main_entries(self) -> list[tuple[MenuItem, str | None]]:
+        """主菜单条目 (主菜单项, 子菜单 key)，子菜单 key 非空表示常用模板快捷项"""
+        items = list(MENU_ITEMS)
+        if self._ranking == "reorder" and self._usage is not None:
+            # 稳定排序：没用过的保持原有顺序
+            items.sort(key=lambda item: self._usage.menu_score(item.key), reverse=True)
+        entries: list[tuple[MenuItem, str | None]] = [(item, None) for item in items]
+
+        if self._ranking == "recent" and self._usage is not None:
+            # 常用模板接在固定菜单之后，保持原有序号不变
+            count = min(self._recent_count, 9 - len(entries))
+            by_key = {item.key: item for item in MENU_ITEMS}
+            for menu_key, sub_key in self._usage.top(max(count, 0)):
+                entries.append((by_key[menu_key], sub_key or ""))
+        return entries
+
+    def _sub_entries(self, menu_key: str) -> list[SubMenuItem]:
+        """子菜单条目"""
+        items = list(SUB_MENU_ITEMS)
+        if self._ranking == "reorder" and self._usage is not None:
+            items.sort(key=lambda sub: self._usage.score(menu_key, sub.key), reverse=True)
+        return items
+
+    @staticmethod
+    def _sub_indicator(menu_key: str, sub_item: SubMenuItem) -> QWidget:
+        """子菜单项的指示器"""
+        color = INDICATOR_COLORS.get(sub_item.key, "#666666")
+        # 根据父菜单类型选择指示器样式
+        if menu_key == "fold":
+            return ArrowIndicator(color)
+        if menu_key == "block":
+            return BorderIndicator(color, sub_item.label)
+        # reminder 和其他使用圆形
+        return CircleIndicator(color, SUB_MENU_ICONS.get(sub_item.key, ""))
+
     def _show_main_menu(self):
         """显示主菜单"""
         self._clear_menu()
+        self._set_history_mode(False)
         self._current_level = 0
         self._selected_index = 0
-
-        for i, menu_item in enumerate(MENU_ITEMS):
-            widget = MenuItemWidget(i + 1, menu_item.label)
+        self._main_stale = False
+        self._entries = self._main_entries()
+        subs = {sub.key: sub for sub in SUB_MENU_ITEMS}
+
+        for i, (menu_item, sub_key) in enumerate(self._entries):
+            if sub_key:
+                sub_item = subs[sub_key]
+                text = menu_item.label if menu_item.key == "block" else f"{menu_item.label} {sub_item.label}"
+                widget = MenuItemWidget(i + 1, text, self._sub_indicator(menu_item.key, sub_item))
+            else:
+                widget = MenuItemWidget(i + 1, menu_item.label)
             widget.clicked.connect(lambda idx=i: self._on_item_clicked(idx))
             self._layout.addWidget(widget)
             self._menu_items.append(widget)
@@ -248,34 +473,16 @@ class PopupPanel(QWidget):
     def _show_sub_menu(self, menu_key: str):
         """显示子菜单"""
         self._clear_menu()
+        self._set_history_mode(False)
         self._current_level = 1
         self._current_menu_key = menu_key
         self._selected_index = 0
+        self._entries = self._sub_entries(menu_key)
 
-        # 子菜单指示器图标
-        icons = {
-            "primary": "+",
-            "info": "i",
-            "warning": "!",
-            "success": "✓",
-            "danger": "-",
-        }
-
-        for i, sub_item in enumerate(SUB_MENU_ITEMS):
-            color = INDICATOR_COLORS.get(sub_item.key, "#666666")
-
-            # 根据父菜单类型选择指示器样式
-            if menu_key == "fold":
-                indicator = ArrowIndicator(color)
-            elif menu_key == "block":
-                indicator = BorderIndicator(color, sub_item.label)
-            else:
-                # reminder 和其他使用圆形
-                indicator = CircleIndicator(color, icons.get(sub_item.key, ""))
-
+        for i, sub_item in enumerate(self._entries):
             # block 类型不需要额外文本（已在指示器中显示）
             text = "" if menu_key == "block" else sub_item.label
-            widget = MenuItemWidget(i + 1, text, indicator)
+            widget = MenuItemWidget(i + 1, text, self._sub_indicator(menu_key, sub_item))
             widget.clicked.connect(lambda idx=i: self._on_sub_item_clicked(idx))
             self._layout.addWidget(widget)
             self._menu_items.append(widget)
@@ -283,6 +490,66 @@ class PopupPanel(QWidget):
         self._update_selection()
         self.adjustSize()
 
+    def _show_history(self):
+        """显示剪贴板历史页"""
+        self._clear_menu()
+        self._set_history_mode(True)
+        self._current_level = 2
+        self._query = ""
+        if not self._history_rows:
+            for i in range(HISTORY_ROWS):
+                row = MenuItemWidget(i + 1, "")
+                row.clicked.connect(lambda idx=i: self._select_history(idx))
+                row.hide()
+                self._layout.addWidget(row)
+                self._history_rows.append(row)
+        self._refresh_history()
+
+    def _refresh_history(self):
+        """按搜索文字更新历史页"""
+        self._entries = self._history.search(self._query, HISTORY_ROWS)
+        self._menu_items = self._history_rows[:len(self._entries)]
+        for row, entry in zip(self._menu_items, self._entries):
+            row.set_text(entry.preview)
+            row.show()
+        for row in self._history_rows[len(self._entries):]:
+            row.hide()
+        if self._query:
+            self._query_label.setText(f"搜索: {self._query}" if self._entries else f"搜索: {self._query}（无匹配）")
+        else:
+            self._query_label.setText(f"剪贴板历史 {len(self._history)} 条，输入文字搜索")
+        self._selected_index = 0
+        self._update_selection()
+        self.adjustSize()
+
+    def _select_history(self, index: int):
+        """选择剪贴板历史"""
+        if index < 0 or index >= len(self._entries):
+            return
+        text = self._history.text(self._entries[index])
+        self.hide()
+        self.history_selected.emit(text)
+
+    def _history_key(self, event) -> bool:
+        """历史页的按键：输入文字过滤，Ctrl+数字选择，Backspace 删除文字或返回主菜单"""
+        key = event.key()
+        if Qt.Key_1 <= key <= Qt.Key_9 and event.modifiers() & Qt.ControlModifier:
+            self._select_history(key - Qt.Key_1)
+            return True
+        if key == Qt.Key_Backspace:
+            if self._query:
+                self._query = self._query[:-1]
+                self._refresh_history()
+            else:
+                self._show_main_menu()
+            return True
+        text = event.text()
+        if text and text.isprintable() and not event.modifiers() & (Qt.ControlModifier | Qt.AltModifier):
+            self._query += text
+            self._refresh_history()
+            return True
+        return False
+
     def _update_selection(self):
         """更新选中状态"""
         for i, item in enumerate(self._menu_items):
@@ -298,32 +565,45 @@ class PopupPanel(QWidget):
 
     def _select_item(self, index: int):
         """选择主菜单项"""
-        if index < 0 or index >= len(MENU_ITEMS):
+        if index < 0 or index >= len(self._entries):
             return
 
-        menu_item = MENU_ITEMS[index]
-        if menu_item.has_submenu:
+        menu_item, sub_key = self._entries[index]
+        if sub_key:
+            self._emit_output(menu_item.key, sub_key)
+        elif menu_item.has_submenu:
             self._show_sub_menu(menu_item.key)
         else:
-            text, offset = get_output(menu_item.key)
-            self.hide()
-            self.output_selected.emit(text, offset)
+            self._emit_output(menu_item.key, "")
 
     def _select_sub_item(self, index: int):
         """选择子菜单项"""
-        if index < 0 or index >= len(SUB_MENU_ITEMS):
+        if index < 0 or index >= len(self._entries):
             return
+        self._emit_output(self._current_menu_key, self._entries[index].key)
 
-        sub_item = SUB_MENU_ITEMS[index]
-        text, offset = get_output(self._current_menu_key, sub_item.key)
+    def _emit_output(self, menu_key: str, sub_key: str):
+        """隐藏面板并输出模板"""
+        text, offset = get_output(menu_key, sub_key or None)
         self.hide()
-        self.output_selected.emit(text, offset)
+        # 先提交输出，再记录使用统计
+        self.output_selected.emit(text, offset, self._segment)
+        self.template_selected.emit(menu_key, sub_key)
 
     def keyPressEvent(self, event):
         key = event.key()
+        self.key_pressed.emit(key)
+
+        if self._current_level == 2:
+            if self._history_key(event):
+                return
+        # 0 进入剪贴板历史
+        elif key == Qt.Key_0 and self._current_level == 0 and self._history is not None:
+            self._show_history()
+            return
 
         # 数字键选择
-        if Qt.Key_1 <= key <= Qt.Key_9:
+        elif Qt.Key_1 <= key <= Qt.Key_9:
             index = key - Qt.Key_1
             if self._current_level == 0:
                 self._select_item(index)
@@ -343,9 +623,18 @@ class PopupPanel(QWidget):
         elif key == Qt.Key_Return or key == Qt.Key_Enter:
             if self._current_level == 0:
                 self._select_item(self._selected_index)
+            elif self._current_level == 2:
+                self._select_history(self._selected_index)
             else:
                 self._select_sub_item(self._selected_index)
 
+        # Tab 切换分段方式：整体包裹 → 逐行 → 逐段
+        elif key == Qt.Key_Tab:
+            if self._current_level == 2:
+                return
+            order = list(SEGMENT_LABELS)
+            self._set_segment(order[(order.index(self._segment) + 1) % len(order)])
+
         # ESC 直接关闭
         elif key == Qt.Key_Escape:
             self.hide()
@@ -358,6 +647,10 @@ class PopupPanel(QWidget):
         else:
             super().keyPressEvent(event)
 
+    def focusNextPrevChild(self, next: bool) -> bool:
+        """Tab 留给 keyPressEvent 切换分段方式，不做焦点切换"""
+        return False
+
     def focusOutEvent(self, event):
         """失去焦点时隐藏"""
         self.hide()
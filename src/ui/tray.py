@@ -0,0 +1,74 @@
+"""系统托盘"""
+from PySide6.QtWidgets import QSystemTrayIcon, QMenu
+from PySide6.QtCore import Signal
+from PySide6.QtGui import QIcon, QAction
+
+
+class TrayIcon(QSystemTrayIcon):
+    """托盘图标（不依赖主窗口，主窗口按需创建）"""
+
+    toggle_requested = Signal()
+    show_requested = Signal()
+    check_update_requested = Signal()
+    stalls_requested = Signal()
+    quit_requested = Signal()
+
+    def __init__(self, icon: QIcon, parent=None):
+        super().__init__(icon, parent)
+        self._init_menu()
+        self.activated.connect(self._on_activated)
+        self.set_running(False)
+
+    def _init_menu(self):
+        self._menu = QMenu()
+
+        self._toggle_action = QAction("启动", self._menu)
+        self._toggle_action.triggered.connect(self.toggle_requested)
+        self._menu.addAction(self._toggle_action)
+
+        self._menu.addSeparator()
+
+        show_action = QAction("显示窗口", self._menu)
+        show_action.triggered.connect(self.show_requested)
+        self._menu.addAction(show_action)
+
+        check_update_action = QAction("检查更新", self._menu)
+        check_update_action.triggered.connect(self.check_update_requested)
+        self._menu.addAction(check_update_action)
+
+        stalls_action = QAction("卡顿统计", self._menu)
+        stalls_action.triggered.connect(self.stalls_requested)
+        self._menu.addAction(stalls_action)
+
+        quit_action = QAction("退出", self._menu)
+        quit_action.triggered.connect(self.quit_requested)
+        self._menu.addAction(quit_action)
+
+        self.setContextMenu(self._menu)
+
+    def set_running(self, running: bool):
+        """设置运行状态"""
+        if running:
+            self._toggle_action.setText("停止")
+            self.setToolTip("shokaX plugin - 运行中")
+        else:
+            self._toggle_action.setText("启动")
+            self.setToolTip("shokaX plugin - 已停止")
+
+    def notify_minimized(self):
+        """提示已最小化到托盘"""
+        self.showMessage(
+            "shokaX plugin",
+            "程序已最小化到托盘，双击图标可打开",
+            QSystemTrayIcon.Information,
+            2000,
+        )
+
+    def show_stalls(self, summary: str):
+        """显示界面卡顿统计摘要"""
+        self.showMessage("shokaX plugin - 卡顿统计", summary, QSystemTrayIcon.Information, 8000)
+
+    def _on_activated(self, reason):
+        """托盘图标激活"""
+        if reason == QSystemTrayIcon.DoubleClick:
+            self.show_requested.emit()
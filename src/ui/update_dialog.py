@@ -0,0 +1,309 @@
+"""更新提示与下载安装流程"""
+from PySide6.QtWidgets import QMessageBox, QProgressDialog
+from PySide6.QtCore import QObject, Qt
+
+from src.core.version import __version__
+from src.core.updater import UpdateChecker, build_layout, select_download
+
+# 更新文件类型的显示名称
+INSTALL_TYPES = {"setup": "安装版", "portable": "便携版", "onedir": "便携版（目录）"}
+
+
+class UpdateDialog(QObject):
+    """
+    更新流程
+
+    持有唯一的 UpdateChecker，负责检查结果提示、下载进度和安装。
+    不依赖主窗口，托盘模式下也能使用。
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._manual_check = False
+        self._pending_install: tuple[str, str] | None = None  # (下载的文件, 更新文件类型)
+        self._progress: QProgressDialog | None = None
+        self._prompting = False  # "发现新版本"提示正在显示（嵌套事件循环中，不能释放）
+        self._checker = UpdateChecker(self)
+        self._checker.update_found.connect(self._on_update_found)
+        self._checker.no_update.connect(self._on_no_update)
+        self._checker.check_failed.connect(self._on_check_failed)
+        self._checker.download_progress.connect(self._on_download_progress)
+        self._checker.download_finished.connect(self._on_download_finished)
+
+    @property
+    def is_busy(self) -> bool:
+        """是否有进行中的检查、下载、待安装的更新或正在显示的更新提示"""
+        return (
+            self._prompting
+            or self._checker.is_checking
+            or self._checker.is_downloading
+            or self._pending_install is not None
+            or self._progress is not None
+        )
+
+    def check(self, manual: bool = False):
+        """
+        检查更新（进行中的检查会被合并，只发出一个请求）
+
+        Args:
+            manual: 是否为手动检查，手动检查会提示"已是最新版本"及失败信息
+        """
+        if manual:
+            self._manual_check = True
+        self._checker.check()
+
+    def _on_update_found(self, update_info: dict):
+        """发现新版本"""
+        self._manual_check = False
+        if self._checker.is_downloading:
+            return
+
+        version = update_info["version"]
+        changelog = update_info.get("changelog", "")
+
+        # 按当前是安装版、单文件便携版还是目录版选择下载链接
+        selected = select_download(update_info, UpdateChecker.is_installed_version(), build_layout())
+        if selected is None:
+            QMessageBox.warning(
+                None,
+                "更新失败",
+                "未找到可用的更新文件",
+            )
+            return
+        download_url, kind = selected
+        install_type = INSTALL_TYPES[kind]
+
+        msg = QMessageBox()
+        msg.setWindowTitle("发现新版本")
+        msg.setIcon(QMessageBox.Information)
+        msg.setText(f"发现新版本 v{version} ({install_type})\n\n当前版本: v{__version__}")
+        if changelog:
+            msg.setDetailedText(changelog)
+        msg.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
+        msg.setDefaultButton(QMessageBox.Yes)
+        msg.button(QMessageBox.Yes).setText("立即更新")
+        msg.button(QMessageBox.No).setText("稍后提醒")
+
+        self._prompting = True
+        try:
+            accepted = msg.exec() == QMessageBox.Yes
+        finally:
+            self._prompting = False
+        if accepted:
+            self._download_and_install(download_url, kind)
+
+    def _on_no_update(self):
+        """没有更新"""
+        if not self._manual_check:
+            return
+        self._manual_check = False
+        QMessageBox.information(
+            None,
+            "检查更新",
+            f"当前已是最新版本 v{__version__}",
+        )
+
+    def _on_check_failed(self, message: str):
+        """检查更新失败"""
+        if not self._manual_check:
+            return
+        self._manual_check = False
+        QMessageBox.warning(
+            None,
+            "检查更新",
+            f"检查更新失败: {message}",
+        )
+
+    def _download_and_install(self, url: str, kind: str):
+        """下载并安装更新"""
+        import os
+        import tempfile
+
+        # 下载到临时文件
+        filename = {
+            "setup": "shokax_plugin_update_setup.exe",
+            "portable": "shokax_plugin_update.exe",
+            "onedir": "shokax_plugin_update.zip",
+        }[kind]
+        temp_file = os.path.join(tempfile.gettempdir(), filename)
+
+        if not self._checker.download(url, temp_file):
+            QMessageBox.warning(
+                None,
+                "下载失败",
+                "更新下载失败，请稍后重试或手动下载。",
+            )
+            return
+
+        self._pending_install = (temp_file, kind)
+
+        # 创建进度对话框
+        progress = QProgressDialog("正在下载更新...", "取消", 0, 100)
+        progress.setWindowTitle("更新")
+        progress.setWindowModality(Qt.ApplicationModal)
+        progress.setMinimumDuration(0)
+        progress.setValue(0)
+        progress.canceled.connect(self._checker.cancel_download)
+        self._progress = progress
+
+    def _on_download_progress(self, current: int, total: int):
+        """下载进度"""
+        if self._progress is not None and total > 0:
+            self._progress.setValue(int((current / total) * 100))
+
+    def _on_download_finished(self, success: bool):
+        """下载结束"""
+        if self._progress is not None:
+            self._progress.close()
+            self._progress = None
+
+        pending = self._pending_install
+        self._pending_install = None
+        if pending is None:
+            return
+        temp_file, kind = pending
+
+        if success:
+            self._install_update(temp_file, kind)
+        else:
+            QMessageBox.warning(
+                None,
+                "下载失败",
+                "更新下载失败，请稍后重试或手动下载。",
+            )
+
+    def _install_update(self, temp_file: str, kind: str):
+        """安装已下载的更新"""
+        import os
+        import sys
+        import tempfile
+        import subprocess
+
+        if kind == "onedir":
+            self._install_onedir(temp_file)
+        elif kind == "setup":
+            # 安装版：使用 setup 安装程序
+            reply = QMessageBox.question(
+                None,
+                "下载完成",
+                "更新已下载完成，是否立即安装？\n（程序将关闭并启动安装程序）",
+                QMessageBox.Yes | QMessageBox.No,
+            )
+
+            if reply == QMessageBox.Yes:
+                # 获取当前进程 PID，传递给安装程序
+                current_pid = os.getpid()
+
+                # 启动安装程序，传递当前进程 PID
+                # 安装程序会等待当前进程退出后再继续
+                subprocess.Popen([temp_file, f"/PID={current_pid}"])
+
+                # 退出当前程序
+                from PySide6.QtWidgets import QApplication
+                QApplication.quit()
+        else:
+            # 便携版：覆盖安装
+            reply = QMessageBox.question(
+                None,
+                "下载完成",
+                "更新已下载完成，是否立即安装？\n（程序将退出，请等待几秒后手动启动新版本）",
+                QMessageBox.Yes | QMessageBox.No,
+            )
+
+            if reply == QMessageBox.Yes:
+                current_exe = sys.executable
+                backup_exe = current_exe + ".bak"
+
+                # 创建批处理脚本来完成替换
+                batch_script = os.path.join(tempfile.gettempdir(), "update_shokax.bat")
+                with open(batch_script, "w", encoding="gbk") as f:
+                    f.write("@echo off\n")
+                    f.write("echo Waiting for application to close...\n")
+                    f.write("timeout /t 2 /nobreak >nul\n")
+                    f.write(f'if exist "{current_exe}" (\n')
+                    f.write(f'    move /y "{current_exe}" "{backup_exe}"\n')
+                    f.write(")\n")
+                    f.write(f'move /y "{temp_file}" "{current_exe}"\n')
+                    f.write("echo Update completed!\n")
+                    f.write(f'start "" "{current_exe}"\n')
+                    f.write(f'del "{backup_exe}" >nul 2>&1\n')
+                    f.write('del "%~f0"\n')
+
+                # 启动批处理脚本
+                subprocess.Popen(
+                    ["cmd", "/c", batch_script],
+                    creationflags=subprocess.CREATE_NO_WINDOW
+                )
+
+                # 退出当前程序
+                from PySide6.QtWidgets import QApplication
+                QApplication.quit()
+
+    def _install_onedir(self, temp_file: str):
+        """目录版：解压新版本，退出后替换 exe 与 _internal 目录"""
+        import os
+        import shutil
+        import subprocess
+        import sys
+        import tempfile
+        import zipfile
+
+        reply = QMessageBox.question(
+            None,
+            "下载完成",
+            "更新已下载完成，是否立即安装？\n（程序将退出，替换完成后自动启动新版本）",
+            QMessageBox.Yes | QMessageBox.No,
+        )
+        if reply != QMessageBox.Yes:
+            return
+
+        current_exe = sys.executable
+        app_dir = os.path.dirname(current_exe)
+        exe_name = os.path.basename(current_exe)
+        extract_dir = os.path.join(tempfile.gettempdir(), "shokax_plugin_update")
+
+        # 先解压并确认包内有新的 exe，失败时不退出当前程序
+        new_dir = None
+        try:
+            shutil.rmtree(extract_dir, ignore_errors=True)
+            with zipfile.ZipFile(temp_file) as archive:
+                archive.extractall(extract_dir)
+            for root, _dirs, files in os.walk(extract_dir):
+                if exe_name in files:
+                    new_dir = root
+                    break
+        except (OSError, zipfile.BadZipFile) as e:
+            print(f"解压更新失败: {e}")
+        if new_dir is None:
+            QMessageBox.warning(
+                None,
+                "更新失败",
+                "更新文件无效，请稍后重试或手动下载。",
+            )
+            return
+
+        internal = os.path.join(app_dir, "_internal")
+        backup = internal + ".old"
+        batch_script = os.path.join(tempfile.gettempdir(), "update_shokax.bat")
+        with open(batch_script, "w", encoding="gbk") as f:
+            f.write("@echo off\n")
+            f.write("echo Waiting for application to close...\n")
+            f.write("timeout /t 2 /nobreak >nul\n")
+            # 旧的依赖目录整体移走，避免新旧版本的文件混在一起；不清理 exe 所在目录的其他文件
+            f.write(f'if exist "{backup}" rmdir /s /q "{backup}"\n')
+            f.write(f'if exist "{internal}" move /y "{internal}" "{backup}" >nul\n')
+            f.write(f'robocopy "{new_dir}" "{app_dir}" /E /MOVE /R:3 /W:1 /NFL /NDL /NJH /NJS >nul\n')
+            f.write("echo Update completed!\n")
+            f.write(f'start "" "{current_exe}"\n')
+            f.write(f'rmdir /s /q "{backup}" >nul 2>&1\n')
+            f.write(f'rmdir /s /q "{extract_dir}" >nul 2>&1\n')
+            f.write(f'del "{temp_file}" >nul 2>&1\n')
+            f.write('del "%~f0"\n')
+
+        subprocess.Popen(
+            ["cmd", "/c", batch_script],
+            creationflags=subprocess.CREATE_NO_WINDOW
+        )
+
+        from PySide6.QtWidgets import QApplication
+        QApplication.quit()